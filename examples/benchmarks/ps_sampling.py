@@ -0,0 +1,50 @@
+"""Compare the cost of sampling per-thread CPU usage with `ps -L` and with /proc.
+
+The ps listener used to spawn `ps -p <pid> -L` per sample, it now reads
+/proc/<pid>/task/*/stat. Run with `python ps_sampling.py [threads] [samples]`.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from radt.run.listeners.ps_listener import PSThread
+
+threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+samples = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+stop = threading.Event()
+for i in range(threads):
+    threading.Thread(target=stop.wait, name=f"worker_{i}", daemon=True).start()
+
+listener = PSThread(None)
+
+
+def measure(sample):
+    wall, cpu = time.perf_counter(), time.process_time()
+    children = os.times()
+    for _ in range(samples):
+        sample()
+    children = (os.times().children_user + os.times().children_system) - (
+        children.children_user + children.children_system
+    )
+    return (
+        (time.perf_counter() - wall) / samples * 1000,
+        (time.process_time() - cpu + children) / samples * 1000,
+    )
+
+
+def ps():
+    subprocess.run(
+        f"ps -p {os.getpid()} -L -o pid,tid,psr,pcpu,%mem".split(),
+        capture_output=True,
+    )
+
+
+for name, sample in [("ps -L", ps), ("/proc", listener.sample)]:
+    wall, cpu = measure(sample)
+    print(f"{name:>6}: {wall:.2f} ms wall, {cpu:.2f} ms CPU per sample")
+
+stop.set()
@@ -103,7 +103,7 @@ for epoch in range(20):  # loop over the dataset multiple times
     radt.log_metric("ML - epoch", epoch, epoch)
 
     running_loss = 0.0
-    for i, data in enumerate(trainloader, 0):
+    for i, data in enumerate(radt.wrap_loader(trainloader), 0):
         # get the inputs; data is a list of [inputs, labels]
         inputs, labels = data[0].to(device), data[1].to(device)
 
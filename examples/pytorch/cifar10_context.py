@@ -104,7 +104,7 @@ with radt.run.RADTBenchmark() as run:
         run.log_metric("ML - epoch", epoch, epoch)
 
         running_loss = 0.0
-        for i, data in enumerate(trainloader, 0):
+        for i, data in enumerate(run.wrap_loader(trainloader), 0):
             # get the inputs; data is a list of [inputs, labels]
             inputs, labels = data[0].to(device), data[1].to(device)
 
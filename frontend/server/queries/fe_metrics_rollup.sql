@@ -0,0 +1,30 @@
+SELECT radt_metric_rollups.run_uuid,
+    radt_metric_rollups.key,
+    radt_metric_rollups.sum / radt_metric_rollups.count AS value,
+    radt_metric_rollups.min,
+    radt_metric_rollups.max,
+    radt_metric_rollups.count,
+    (radt_metric_rollups.first_timestamp + radt_metric_rollups.last_timestamp) / 2 AS "timestamp",
+    radt_metric_rollups.step
+FROM radt_metric_rollups
+WHERE run_uuid IN ($IN_RUNS$)
+    AND key = $EQ_METRIC$
+    AND width = $EQ_WIDTH$
+UNION ALL
+-- points of running runs logged after the last rollup
+SELECT metrics.run_uuid,
+    metrics.key,
+    metrics.value,
+    metrics.value AS min,
+    metrics.value AS max,
+    1 AS count,
+    metrics."timestamp",
+    metrics.step
+FROM metrics
+    JOIN radt_rollup_watermarks ON radt_rollup_watermarks.run_uuid = metrics.run_uuid
+WHERE metrics.run_uuid IN ($IN_RUNS$)
+    AND metrics.key = $EQ_METRIC$
+    AND metrics."timestamp" > radt_rollup_watermarks.watermark
+    AND NOT metrics.is_nan
+ORDER BY run_uuid,
+    "timestamp";
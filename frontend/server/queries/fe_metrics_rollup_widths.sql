@@ -0,0 +1,9 @@
+SELECT radt_metric_rollups.run_uuid,
+    radt_metric_rollups.width,
+    COUNT(*) AS buckets
+FROM radt_metric_rollups
+WHERE run_uuid IN ($IN_RUNS$)
+    AND key = $EQ_METRIC$
+GROUP BY run_uuid,
+    width
+ORDER BY width;
@@ -19,6 +19,8 @@ const queries = {
   fe_runs: loadFile('fe_runs.sql'),
   fe_metrics_available: loadFile('fe_metrics_available.sql'),
   fe_metrics: loadFile('fe_metrics.sql'),
+  fe_metrics_rollup_widths: loadFile('fe_metrics_rollup_widths.sql'),
+  fe_metrics_rollup: loadFile('fe_metrics_rollup.sql'),
 };
 
 // validate required queries are present at startup (fail fast)
@@ -26,7 +28,9 @@ const required = [
   'fe_experiments',
   'fe_runs',
   'fe_metrics_available',
-  'fe_metrics'
+  'fe_metrics',
+  'fe_metrics_rollup_widths',
+  'fe_metrics_rollup'
 ];
 for (const key of required) {
   if (!queries[key]) {
@@ -149,6 +153,74 @@ app.get('/fe_metrics', async (req, res) => {
   }
 });
 
+// Runs with more buckets than this are served from a coarser rollup
+const DEFAULT_POINTS = 2000;
+
+// Placeholders for a list of runs followed by the metric (and width)
+const runReplacements = (runs) => ({
+  IN_RUNS: runs.map((_, i) => '$' + (i + 1)).join(','),
+  EQ_METRIC: '$' + (runs.length + 1),
+  EQ_WIDTH: '$' + (runs.length + 2)
+});
+
+// fe_metrics_rollup -> expects ?run_uuid=in(...)&key=eq.METRIC&points=N
+// Serves about N points per run from the rollup tables computed by `radt rollup`,
+// falling back to raw points for runs that have not been rolled up.
+app.get('/fe_metrics_rollup', async (req, res) => {
+  try {
+    const runs = parseInList(req.query.run_uuid);
+    if (runs.length === 0) return res.json([]);
+
+    const m = (req.query.key || '').match(/eq\.(.*)/);
+    if (!m) return res.status(400).json({ error: 'key' });
+    const metric = decodeURIComponent(m[1]);
+    const points = parseInt(req.query.points, 10) || DEFAULT_POINTS;
+
+    let widths = [];
+    try {
+      widths = await executeQuery('fe_metrics_rollup_widths', {
+        replacements: runReplacements(runs),
+        params: [...runs, metric]
+      });
+    } catch (err) {
+      // The rollup tables do not exist until `radt rollup` has run
+      console.warn('Rollups unavailable, serving raw metrics:', err.message);
+    }
+
+    // Pick the finest width at which no run has more buckets than requested
+    const buckets = new Map();
+    const rolledUp = new Set();
+    for (const row of widths) {
+      const width = Number(row.width);
+      buckets.set(width, Math.max(buckets.get(width) || 0, Number(row.buckets)));
+      rolledUp.add(row.run_uuid);
+    }
+    const sorted = [...buckets.keys()].sort((a, b) => a - b);
+    const width = sorted.find(w => buckets.get(w) <= points) ?? sorted[sorted.length - 1];
+
+    let rows = [];
+    const rolled = runs.filter(r => rolledUp.has(r));
+    if (rolled.length) {
+      rows = await executeQuery('fe_metrics_rollup', {
+        replacements: runReplacements(rolled),
+        params: [...rolled, metric, width]
+      });
+    }
+
+    const raw = runs.filter(r => !rolledUp.has(r));
+    if (raw.length) {
+      rows = rows.concat(await executeQuery('fe_metrics', {
+        replacements: runReplacements(raw),
+        params: [...raw, metric]
+      }));
+    }
+    res.json(rows);
+  } catch (err) {
+    console.error(err);
+    res.status(500).json({ error: 'internal' });
+  }
+});
+
 app.listen(port, () => {
   console.log(`API server listening on http://localhost:${port}`);
 });
@@ -8,9 +8,12 @@ const endpoints = {
     experiments: "fe_experiments",
     runs: "fe_runs",
     metrics: "fe_metrics_available",
-    data: "fe_metrics"
+    data: "fe_metrics_rollup"
 }
 
+// Points per run and chart, the API aggregates longer series into buckets
+const CHART_POINTS = 2000;
+
 export const HTTP = {
 
     fetchData: (endpoint, param = "") => {
@@ -101,7 +104,7 @@ export const HTTP = {
             runs.forEach(run => {
                 param = param + '"' + run.name + '",';
             });
-            param = param.substring(0, param.length - 1) + ")&key=eq." + encodeURIComponent(metric);
+            param = param.substring(0, param.length - 1) + ")&key=eq." + encodeURIComponent(metric) + "&points=" + CHART_POINTS;
             return new Promise((resolve) => {
                 HTTP.fetchData(endpoints.data, param).then((json) => {
                     let parsed = [];
@@ -112,6 +115,8 @@ export const HTTP = {
                             "step": data["step"],
                             "timestamp": data["timestamp"],
                             "value": data["value"],
+                            "min": data["min"] ?? data["value"],
+                            "max": data["max"] ?? data["value"],
                         })
                     })
                     resolve(parsed);
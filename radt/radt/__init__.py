@@ -3,4 +3,4 @@
 __version__ = "0.2.29"
 
 from .radt import cli, schedule_external
-from .run import log_metric, log_metrics
+from .run import log_metric, log_metrics, phase, step, wrap_iterator, wrap_loader
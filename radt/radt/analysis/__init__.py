@@ -0,0 +1 @@
+from .metrics import MetricCache, MetricFetcher, fetch_metrics
@@ -0,0 +1,327 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+from mlflow.entities import RunStatus
+from mlflow.tracking import MlflowClient
+
+from ..run.sqlstore import METRICS_TABLE
+
+DEFAULT_CACHE_DIR = Path("~/.cache/radt/metrics").expanduser()
+
+HISTORY_COLUMNS = ["step", "timestamp", "value"]
+
+# Points are ordered by time, ties are broken the same way for every source
+HISTORY_ORDER = ["timestamp", "step", "value"]
+
+
+class MetricCache:
+    """On-disk cache of metric histories, one pickle per run and key.
+
+    Histories of runs that had ended when they were fetched are complete and never
+    fetched again. Histories of running runs are extended with newer points on the
+    next fetch.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, run_id: str, key: str):
+        return self.directory / run_id / f"{quote(key, safe='')}.pkl"
+
+    def load(self, run_id: str, key: str):
+        """Load a cached history
+
+        Args:
+            run_id (str): Run ID
+            key (str): Metric key
+
+        Returns:
+            dict or None: History frame and whether it is complete, None if not cached
+        """
+        path = self._path(run_id, key)
+        if not path.is_file():
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception:
+            # A corrupt entry is refetched
+            return None
+
+    def save(self, run_id: str, key: str, history: pd.DataFrame, complete: bool):
+        """Store a history
+
+        Args:
+            run_id (str): Run ID
+            key (str): Metric key
+            history (pd.DataFrame): History with step, timestamp and value columns
+            complete (bool): Whether the run had ended when the history was fetched
+        """
+        path = self._path(run_id, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}")
+        pd.to_pickle({"history": history, "complete": complete}, temp)
+        temp.replace(path)
+
+
+def history_frame(rows):
+    """Build a history frame from metric entities or (step, timestamp, value) tuples
+
+    Args:
+        rows (iterable): Metrics
+
+    Returns:
+        pd.DataFrame: History sorted by timestamp
+    """
+    rows = [
+        (r.step, r.timestamp, r.value) if hasattr(r, "step") else tuple(r) for r in rows
+    ]
+    df = pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+    df = df.astype({"step": np.int64, "timestamp": np.int64, "value": np.float64})
+    return df.sort_values(HISTORY_ORDER, ignore_index=True)
+
+
+def merge_newer(cached: pd.DataFrame, history: pd.DataFrame):
+    """Add the points of a fetched history that are newer than a cached history
+
+    Points at the cached max timestamp are kept from both, duplicates are dropped.
+
+    Args:
+        cached (pd.DataFrame or None): Cached history
+        history (pd.DataFrame): Fetched history
+
+    Returns:
+        pd.DataFrame: Merged history
+    """
+    if cached is None or cached.empty:
+        return history
+    newer = history[history["timestamp"] >= cached["timestamp"].max()]
+    return (
+        pd.concat([cached, newer])
+        .drop_duplicates()
+        .sort_values(HISTORY_ORDER, ignore_index=True)
+    )
+
+
+def find_runs(client: MlflowClient, run_ids=None, experiment_ids=None):
+    """Look up runs by ID, or all runs in the given experiments
+
+    Args:
+        client (MlflowClient): Client to query with
+        run_ids (list, optional): Run IDs
+        experiment_ids (list, optional): Experiments to take all runs from
+
+    Returns:
+        list: Runs
+    """
+    runs = []
+    if experiment_ids:
+        page_token = None
+        while True:
+            page = client.search_runs(
+                [str(e) for e in experiment_ids],
+                max_results=1000,
+                page_token=page_token,
+            )
+            runs.extend(page)
+            page_token = page.token
+            if not page_token:
+                break
+    if run_ids:
+        known = {run.info.run_id for run in runs}
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            runs.extend(
+                pool.map(client.get_run, [r for r in run_ids if r not in known])
+            )
+    return runs
+
+
+class MetricFetcher:
+    """Fetches metric histories of many runs concurrently through the disk cache.
+
+    Uses the tracking server's REST API by default, which cannot filter on time, so
+    histories of running runs are downloaded in full. With `sql_uri`, histories are read
+    from the database behind the tracking server instead, one query per run, and only
+    points newer than the cache are transferred.
+    """
+
+    def __init__(
+        self,
+        client: MlflowClient = None,
+        cache_dir=DEFAULT_CACHE_DIR,
+        sql_uri: str = None,
+        max_workers: int = 16,
+    ):
+        self.client = client or MlflowClient()
+        self.cache = MetricCache(cache_dir) if cache_dir is not None else None
+        self.engine = sa.create_engine(sql_uri) if sql_uri else None
+        self.max_workers = max_workers
+
+    def _cached(self, run_id: str, key: str):
+        return self.cache.load(run_id, key) if self.cache is not None else None
+
+    def _save(self, run_id: str, key: str, history: pd.DataFrame, complete: bool):
+        if self.cache is not None:
+            self.cache.save(run_id, key, history, complete)
+
+    def fetch_rest(self, run, key: str):
+        """Fetch a single history through the REST API
+
+        Only histories of runs that had ended are served from the cache. Otherwise the
+        full history is downloaded and its points newer than the cache are added to it.
+
+        Args:
+            run (mlflow.entities.Run): Run
+            key (str): Metric key
+
+        Returns:
+            pd.DataFrame: History
+        """
+        complete = run.info.status != RunStatus.to_string(RunStatus.RUNNING)
+        cached = self._cached(run.info.run_id, key)
+        if cached and cached["complete"]:
+            return cached["history"]
+
+        history = merge_newer(
+            cached["history"] if cached else None,
+            history_frame(self.client.get_metric_history(run.info.run_id, key)),
+        )
+        self._save(run.info.run_id, key, history, complete)
+        return history
+
+    def fetch_sql(self, run, keys: list):
+        """Fetch the histories of a run from the database in a single query
+
+        Args:
+            run (mlflow.entities.Run): Run
+            keys (list): Metric keys
+
+        Returns:
+            dict: History per key
+        """
+        run_id = run.info.run_id
+        complete = run.info.status != RunStatus.to_string(RunStatus.RUNNING)
+
+        histories, stale = {}, {}
+        for key in keys:
+            cached = self._cached(run_id, key)
+            if cached and cached["complete"]:
+                histories[key] = cached["history"]
+            else:
+                stale[key] = cached["history"] if cached else None
+        if not stale:
+            return histories
+
+        # Points at the cached max timestamp are fetched again, duplicates are dropped below
+        known = [
+            h["timestamp"].max() for h in stale.values() if h is not None and len(h)
+        ]
+        since = min(known) if len(known) == len(stale) else None
+
+        m = METRICS_TABLE.c
+        query = sa.select(
+            m.key,
+            m.step,
+            m.timestamp,
+            sa.case((m.is_nan == sa.true(), sa.literal(float("nan"))), else_=m.value),
+        ).where(m.run_uuid == run_id, m.key.in_(list(stale)))
+        if since is not None:
+            query = query.where(m.timestamp >= int(since))
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(query).all()
+
+        fetched = {}
+        for key, step, timestamp, value in rows:
+            fetched.setdefault(key, []).append((step, timestamp, value))
+
+        for key, cached in stale.items():
+            history = merge_newer(cached, history_frame(fetched.get(key, [])))
+            self._save(run_id, key, history, complete)
+            histories[key] = history
+        return histories
+
+    def fetch(self, runs: list, keys=None):
+        """Fetch the histories of many runs and keys concurrently
+
+        Args:
+            runs (list): Runs
+            keys (list, optional): Metric keys, defaults to all keys of every run
+
+        Returns:
+            dict: History per (run ID, key)
+        """
+        wanted = {
+            run.info.run_id: [
+                k for k in (keys or run.data.metrics) if k in run.data.metrics
+            ]
+            for run in runs
+        }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            if self.engine is not None:
+                results = pool.map(
+                    lambda run: self.fetch_sql(run, wanted[run.info.run_id]), runs
+                )
+                return {
+                    (run.info.run_id, key): history
+                    for run, histories in zip(runs, results)
+                    for key, history in histories.items()
+                }
+
+            tasks = [(run, key) for run in runs for key in wanted[run.info.run_id]]
+            results = pool.map(lambda task: self.fetch_rest(*task), tasks)
+            return {
+                (run.info.run_id, key): history
+                for (run, key), history in zip(tasks, results)
+            }
+
+
+def fetch_metrics(
+    run_ids=None,
+    keys=None,
+    experiment_ids=None,
+    cache_dir=DEFAULT_CACHE_DIR,
+    sql_uri: str = None,
+    max_workers: int = 16,
+    client: MlflowClient = None,
+):
+    """Fetch metric histories of many runs as one tidy frame
+
+    Args:
+        run_ids (list, optional): Runs to fetch
+        keys (list, optional): Metric keys to fetch, defaults to all keys
+        experiment_ids (list, optional): Fetch all runs of these experiments
+        cache_dir (str or Path, optional): Cache directory, None to disable caching.
+            Defaults to ~/.cache/radt/metrics.
+        sql_uri (str, optional): Database of the tracking server to read from directly
+        max_workers (int, optional): Concurrent requests. Defaults to 16.
+        client (MlflowClient, optional): Client to query with
+
+    Returns:
+        pd.DataFrame: One row per point with run_id, run_name, key, step, timestamp,
+            value and time (seconds since the start of the run)
+    """
+    fetcher = MetricFetcher(client, cache_dir, sql_uri, max_workers)
+    runs = find_runs(fetcher.client, run_ids, experiment_ids)
+    histories = fetcher.fetch(runs, keys)
+
+    starts = {run.info.run_id: run.info.start_time for run in runs}
+    names = {run.info.run_id: run.info.run_name for run in runs}
+
+    frames = [
+        history.assign(run_id=run_id, run_name=names[run_id], key=key)
+        for (run_id, key), history in histories.items()
+        if len(history)
+    ]
+    columns = ["run_id", "run_name", "key", "step", "timestamp", "value", "time"]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.concat(frames, ignore_index=True)
+    df["time"] = (df["timestamp"] - df["run_id"].map(starts)) / 1000
+    return df[columns].sort_values(["run_id", "key", "timestamp"], ignore_index=True)
@@ -0,0 +1 @@
+from .compact import start_compact
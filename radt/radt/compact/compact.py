@@ -0,0 +1,260 @@
+import os
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+import pandas as pd
+import sqlalchemy as sa
+from mlflow.tracking import MlflowClient
+
+from ..run.sqlstore import (
+    METRICS_TABLE,
+    RUNS_TABLE,
+    TAGS_TABLE,
+    latest_rows,
+)
+
+# Tag on compacted runs, holding the bucket width in seconds
+COMPACTED_TAG = "radt.compacted"
+
+# Approximate storage of a metrics row besides its key: value, timestamp, step,
+# is_nan and run_uuid plus row overhead and the primary key index entry
+ROW_BYTES = 8 + 8 + 8 + 1 + 32 + 24 + 48
+
+
+def compactable_runs(connection, older_than: float, experiment_ids=None):
+    """Find runs that ended long enough ago and have not been compacted yet
+
+    Args:
+        connection (sa.Connection): Database connection
+        older_than (float): Minimum age in seconds since the end of the run
+        experiment_ids (list, optional): Only consider runs of these experiments
+
+    Returns:
+        list: Run IDs
+    """
+    r, t = RUNS_TABLE.c, TAGS_TABLE.c
+    cutoff = int((time.time() - older_than) * 1000)
+    compacted = sa.select(t.run_uuid).where(t.key == COMPACTED_TAG)
+    query = sa.select(r.run_uuid).where(
+        r.status != "RUNNING",
+        sa.func.coalesce(r.end_time, r.start_time) < cutoff,
+        r.run_uuid.not_in(compacted),
+    )
+    if experiment_ids:
+        query = query.where(r.experiment_id.in_([int(e) for e in experiment_ids]))
+    return connection.execute(query.order_by(r.start_time)).scalars().all()
+
+
+def _series_filter(run_id: str, prefix: str):
+    m = METRICS_TABLE.c
+    return sa.and_(m.run_uuid == run_id, m.key.startswith(prefix, autoescape=True))
+
+
+def estimate(connection, run_id: str, prefix: str, width: int):
+    """Count the rows of a run before and after compaction
+
+    Args:
+        connection (sa.Connection): Database connection
+        run_id (str): Run ID
+        prefix (str): Prefix of the keys to compact
+        width (int): Bucket width in milliseconds
+
+    Returns:
+        int: Rows now
+        int: Rows after compaction
+        int: Bytes taken up by the keys of the removed rows
+    """
+    m = METRICS_TABLE.c
+    rows, key_bytes = connection.execute(
+        sa.select(
+            sa.func.count(), sa.func.coalesce(sa.func.sum(sa.func.length(m.key)), 0)
+        ).where(_series_filter(run_id, prefix))
+    ).one()
+    buckets = connection.execute(
+        sa.select(sa.func.count()).select_from(
+            sa.select(m.key)
+            .where(_series_filter(run_id, prefix), m.is_nan == sa.false())
+            .group_by(m.key, m.timestamp // width)
+            .subquery()
+        )
+    ).scalar()
+    # The latest point of every key is kept as is
+    keys = connection.execute(
+        sa.select(sa.func.count(sa.distinct(m.key))).where(
+            _series_filter(run_id, prefix)
+        )
+    ).scalar()
+    after = min(rows, buckets + keys)
+    removed_key_bytes = key_bytes * (rows - after) // rows if rows else 0
+    return rows, after, removed_key_bytes
+
+
+def downsample(raw: pd.DataFrame, width: int):
+    """Average the points of every key per time bucket
+
+    The latest point of every key (by step, timestamp and value, like latest_metrics)
+    is kept unchanged so that the run's final values stay the same.
+
+    Args:
+        raw (pd.DataFrame): Metric rows of a run
+        width (int): Bucket width in milliseconds
+
+    Returns:
+        pd.DataFrame: Downsampled metric rows
+    """
+    values = raw[~raw["is_nan"].astype(bool)]
+    buckets = (
+        values.assign(bucket=values["timestamp"] // width)
+        .groupby(["run_uuid", "key", "bucket"], as_index=False)
+        .agg(
+            value=("value", "mean"),
+            timestamp=("timestamp", "min"),
+            step=("step", "max"),
+        )
+        .drop(columns="bucket")
+        .assign(is_nan=False)
+    )
+    latest = pd.DataFrame(latest_rows(raw.to_dict("records")), columns=raw.columns)
+    return (
+        pd.concat([buckets, latest], ignore_index=True)
+        .drop_duplicates(["key", "timestamp", "step", "value", "is_nan"])
+        .reset_index(drop=True)
+    )
+
+
+def archive(client: MlflowClient, run_id: str, raw: pd.DataFrame, width: int):
+    """Upload the raw series of a run as a compressed Parquet artifact
+
+    Args:
+        client (MlflowClient): Client of the tracking server
+        run_id (str): Run ID
+        raw (pd.DataFrame): Metric rows
+        width (int): Bucket width in milliseconds
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / f"raw_metrics_{width / 1000:g}s.parquet"
+        raw.drop(columns="run_uuid").to_parquet(path, compression="zstd", index=False)
+        client.log_artifact(run_id, str(path), "radt")
+
+
+def compact_run(connection, run_id: str, prefix: str, width: int, client=None):
+    """Replace the raw series of a run with downsampled ones
+
+    Runs that were compacted before are left as they are.
+
+    Args:
+        connection (sa.Connection): Database connection within a transaction
+        run_id (str): Run ID
+        prefix (str): Prefix of the keys to compact
+        width (int): Bucket width in milliseconds
+        client (MlflowClient, optional): Archive the raw series through this client
+
+    Returns:
+        int: Rows before
+        int: Rows after
+    """
+    m, t = METRICS_TABLE.c, TAGS_TABLE.c
+    compacted_before = connection.execute(
+        sa.select(t.value).where(t.run_uuid == run_id, t.key == COMPACTED_TAG)
+    ).first()
+    if compacted_before is not None:
+        # E.g. by another `radt compact` since the run was found
+        rows = connection.execute(
+            sa.select(sa.func.count()).where(_series_filter(run_id, prefix))
+        ).scalar()
+        return rows, rows
+
+    raw = pd.DataFrame(
+        connection.execute(
+            sa.select(m.key, m.value, m.timestamp, m.step, m.is_nan, m.run_uuid).where(
+                _series_filter(run_id, prefix)
+            )
+        ).all(),
+        columns=["key", "value", "timestamp", "step", "is_nan", "run_uuid"],
+    )
+
+    if len(raw):
+        compacted = downsample(raw, width)
+        if client is not None:
+            archive(client, run_id, raw, width)
+
+        connection.execute(
+            sa.delete(METRICS_TABLE).where(_series_filter(run_id, prefix))
+        )
+        connection.execute(sa.insert(METRICS_TABLE), compacted.to_dict("records"))
+    else:
+        compacted = raw
+
+    connection.execute(
+        sa.insert(TAGS_TABLE).values(
+            key=COMPACTED_TAG, value=f"{width / 1000:g}", run_uuid=run_id
+        )
+    )
+    return len(raw), len(compacted)
+
+
+def format_bytes(size: float):
+    """Format a number of bytes
+
+    Args:
+        size (float): Number of bytes
+
+    Returns:
+        str: Formatted size
+    """
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def start_compact(args: Namespace):
+    """Downsample the hardware metrics of runs that ended a while ago
+
+    Args:
+        args (Namespace): Compact arguments
+    """
+    sql_uri = args.sql_uri or os.getenv("RADT_SQL_URI")
+    if not sql_uri:
+        raise ValueError(
+            "Pass the database of the tracking server with --sql_uri or RADT_SQL_URI"
+        )
+    if not args.prefix:
+        raise ValueError("A key prefix is required, e.g. system/")
+
+    engine = sa.create_engine(sql_uri)
+    width = int(args.width * 1000)
+    client = MlflowClient() if args.archive and not args.dry_run else None
+
+    with engine.connect() as connection:
+        runs = compactable_runs(connection, args.older_than * 86400, args.experiments)
+
+    total_before = total_after = total_bytes = 0
+    for run_id in runs:
+        # One transaction per run, so an interrupted compaction leaves every run intact
+        with engine.begin() as connection:
+            before, after, key_bytes = estimate(connection, run_id, args.prefix, width)
+            if not args.dry_run:
+                before, after = compact_run(
+                    connection, run_id, args.prefix, width, client
+                )
+
+        reclaimed = (before - after) * ROW_BYTES + key_bytes
+        total_before += before
+        total_after += after
+        total_bytes += reclaimed
+        print(
+            f"{'Would compact' if args.dry_run else 'Compacted'} {run_id}: "
+            f"{before} -> {after} rows (~{format_bytes(reclaimed)})"
+        )
+
+    print(
+        f"{'Dry run: ' if args.dry_run else ''}{len(runs)} run(s), "
+        f"{total_before} -> {total_after} '{args.prefix}' rows, "
+        f"~{format_bytes(total_bytes)} reclaimed"
+    )
+    if not args.dry_run and total_before != total_after:
+        print("Run VACUUM on the database to return the freed space to the system")
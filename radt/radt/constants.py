@@ -14,9 +14,19 @@ CSV_FORMAT = np.dtype(
         ("Listeners", str),
         ("File", str),
         ("Params", str),
+        ("TimeLimit", float),
+        ("EpochLimit", float),
     ]
 )
 
+# Runs stopped by their TimeLimit (wall-clock seconds) or EpochLimit
+TIME_LIMIT_STATUS = "TIMEOUT"
+EPOCH_LIMIT_STATUS = "EPOCH_LIMIT"
+LIMIT_TAG = "radt.limit"
+
+# Seconds between asking a run to terminate (SIGTERM) and killing it (SIGKILL)
+LIMIT_GRACE_PERIOD = 30
+
 COMMAND = (
     "mlflow run {Filepath} --env-manager={Envmanager} "
     "-P letter={Letter} "
@@ -26,8 +36,6 @@ COMMAND = (
     '-P params="-" '
 )
 
-RUN_LISTENERS = ["ps", "smi", "dcgmi", "top", "iostat", "free", "macmon"]
-
 WORKLOAD_LISTENERS = {
     "nsys": "nsys profile --capture-range nvtx --nvtx-capture profile --cuda-memory-usage=true --capture-range-end repeat -o nsys_{Experiment}_{Workload}_{Letter} -f true -w true -x true -t cuda,nvtx ",
     "nsysraw": "nsys profile --cuda-memory-usage true -o nsys_{Experiment}_{Workload}_{Letter} -f true -w true -x true -t cuda,nvtx ",
@@ -0,0 +1 @@
+from .rollup import start_rollup
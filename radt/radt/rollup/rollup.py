@@ -0,0 +1,205 @@
+import os
+import time
+from argparse import Namespace
+
+import sqlalchemy as sa
+
+from ..run.sqlstore import METRICS_TABLE, RUNS_TABLE
+
+# Bucket widths in seconds, from detailed to coarse
+DEFAULT_WIDTHS = (1, 10, 60, 600)
+
+# Metrics are flushed every few seconds and may arrive late, buckets this far
+# before the last rollup are recomputed
+LATENESS_MS = 60_000
+
+metadata = sa.MetaData()
+
+ROLLUPS_TABLE = sa.Table(
+    "radt_metric_rollups",
+    metadata,
+    sa.Column("run_uuid", sa.String(32), primary_key=True),
+    sa.Column("key", sa.String(250), primary_key=True),
+    sa.Column("width", sa.BigInteger, primary_key=True),
+    sa.Column("bucket", sa.BigInteger, primary_key=True),
+    sa.Column("count", sa.BigInteger, nullable=False),
+    sa.Column("sum", sa.Float(precision=53), nullable=False),
+    sa.Column("min", sa.Float(precision=53), nullable=False),
+    sa.Column("max", sa.Float(precision=53), nullable=False),
+    sa.Column("first_timestamp", sa.BigInteger, nullable=False),
+    sa.Column("last_timestamp", sa.BigInteger, nullable=False),
+    sa.Column("step", sa.BigInteger, nullable=False),
+)
+
+WATERMARKS_TABLE = sa.Table(
+    "radt_rollup_watermarks",
+    metadata,
+    sa.Column("run_uuid", sa.String(32), primary_key=True),
+    sa.Column("watermark", sa.BigInteger, nullable=False),
+    sa.Column("finished", sa.Boolean, nullable=False),
+)
+
+
+def pending_runs(connection, experiment_ids=None):
+    """Find runs whose rollups are missing or may be outdated
+
+    Args:
+        connection (sa.Connection): Database connection
+        experiment_ids (list, optional): Only consider runs of these experiments
+
+    Returns:
+        list: (run ID, status, watermark or None) per run
+    """
+    r, w = RUNS_TABLE.c, WATERMARKS_TABLE.c
+    query = (
+        sa.select(r.run_uuid, r.status, w.watermark)
+        .select_from(RUNS_TABLE.outerjoin(WATERMARKS_TABLE, r.run_uuid == w.run_uuid))
+        .where(sa.or_(w.finished.is_(None), w.finished == sa.false()))
+    )
+    if experiment_ids:
+        query = query.where(r.experiment_id.in_([int(e) for e in experiment_ids]))
+    return connection.execute(query).all()
+
+
+def rollup_run(connection, run_id: str, status: str, watermark, widths):
+    """Update the rollups of a run with the points logged since its watermark
+
+    Buckets from shortly before the watermark onwards are deleted and aggregated again,
+    so partially filled buckets and late points are accounted for.
+
+    Args:
+        connection (sa.Connection): Database connection within a transaction
+        run_id (str): Run ID
+        status (str): Run status
+        watermark (int or None): Latest timestamp covered by the rollups
+        widths (iterable): Bucket widths in seconds
+
+    Returns:
+        int: Number of buckets written, None if the run was up to date
+    """
+    m, rollups = METRICS_TABLE.c, ROLLUPS_TABLE.c
+    finished = status != "RUNNING"
+
+    latest = connection.execute(
+        sa.select(sa.func.max(m.timestamp)).where(m.run_uuid == run_id)
+    ).scalar()
+    if latest is None or (watermark is not None and latest <= watermark):
+        if finished or latest is None:
+            mark_watermark(connection, run_id, watermark or 0, finished)
+        return None
+
+    since = 0 if watermark is None else max(0, watermark - LATENESS_MS)
+    buckets = 0
+    for width in widths:
+        width = int(width * 1000)
+        start = since // width
+
+        connection.execute(
+            sa.delete(ROLLUPS_TABLE).where(
+                rollups.run_uuid == run_id,
+                rollups.width == width,
+                rollups.bucket >= start,
+            )
+        )
+
+        # NaN values are stored as 0 and would skew the aggregates
+        bucket = (m.timestamp // width).label("bucket")
+        aggregate = (
+            sa.select(
+                m.run_uuid,
+                m.key,
+                sa.literal(width, sa.BigInteger),
+                bucket,
+                sa.func.count(),
+                sa.func.sum(m.value),
+                sa.func.min(m.value),
+                sa.func.max(m.value),
+                sa.func.min(m.timestamp),
+                sa.func.max(m.timestamp),
+                sa.func.max(m.step),
+            )
+            .where(
+                m.run_uuid == run_id,
+                m.timestamp >= start * width,
+                m.is_nan == sa.false(),
+            )
+            .group_by(m.run_uuid, m.key, bucket)
+        )
+        result = connection.execute(
+            sa.insert(ROLLUPS_TABLE).from_select(
+                [c.name for c in ROLLUPS_TABLE.columns], aggregate
+            )
+        )
+        buckets += result.rowcount
+
+    mark_watermark(connection, run_id, latest, finished)
+    return buckets
+
+
+def mark_watermark(connection, run_id: str, watermark: int, finished: bool):
+    """Record up to which timestamp the rollups of a run are complete
+
+    Args:
+        connection (sa.Connection): Database connection within a transaction
+        run_id (str): Run ID
+        watermark (int): Latest timestamp covered by the rollups
+        finished (bool): Whether the run has ended, so its rollups are final
+    """
+    connection.execute(
+        sa.delete(WATERMARKS_TABLE).where(WATERMARKS_TABLE.c.run_uuid == run_id)
+    )
+    connection.execute(
+        sa.insert(WATERMARKS_TABLE).values(
+            run_uuid=run_id, watermark=int(watermark), finished=finished
+        )
+    )
+
+
+def rollup(engine, widths=DEFAULT_WIDTHS, experiment_ids=None):
+    """Bring the rollups of all runs up to date
+
+    Args:
+        engine (sa.Engine): Database of the tracking server
+        widths (iterable, optional): Bucket widths in seconds
+        experiment_ids (list, optional): Only roll up runs of these experiments
+
+    Returns:
+        int: Number of updated runs
+    """
+    metadata.create_all(engine)
+
+    with engine.connect() as connection:
+        runs = pending_runs(connection, experiment_ids)
+
+    updated = 0
+    for run_id, status, watermark in runs:
+        # One transaction per run keeps locks short on a live tracking database
+        with engine.begin() as connection:
+            buckets = rollup_run(connection, run_id, status, watermark, widths)
+        if buckets is not None:
+            updated += 1
+            print(f"Rolled up {run_id} ({status}): {buckets} bucket(s)")
+    return updated
+
+
+def start_rollup(args: Namespace):
+    """Compute rollups once, or repeatedly to follow running runs
+
+    Args:
+        args (Namespace): Rollup arguments
+    """
+    sql_uri = args.sql_uri or os.getenv("RADT_SQL_URI")
+    if not sql_uri:
+        raise ValueError(
+            "Pass the database of the tracking server with --sql_uri or RADT_SQL_URI"
+        )
+
+    engine = sa.create_engine(sql_uri)
+    widths = sorted({float(w) for w in args.widths.split(",")})
+
+    while True:
+        updated = rollup(engine, widths, args.experiments)
+        print(f"Updated rollups of {updated} run(s)")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
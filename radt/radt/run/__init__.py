@@ -1,2 +1,10 @@
 from .run import start_run
-from .benchmark import RADTBenchmark, log_metric, log_metrics
+from .benchmark import (
+    RADTBenchmark,
+    log_metric,
+    log_metrics,
+    phase,
+    step,
+    wrap_iterator,
+    wrap_loader,
+)
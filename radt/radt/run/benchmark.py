@@ -9,14 +9,28 @@ from mlflow.entities import Metric as MlflowMetric
 from collections import deque
 import multiprocessing
 import queue
+import signal
 
-from .listeners import listeners
+from .. import constants
+from .listeners import Listener, available_listeners, load_listener
+from .offline import ParquetMetricStore
+from .sqlstore import SQLMetricStore
+from .summary import SummaryTracker
+from .energy import EfficiencyTracker, EnergyTracker
+from .phases import NO_PHASE, Phase, PhaseRecorder, PhaseTracker
+from .steps import StepTimer
+from .loader import LoaderStats, TimedIterator, TimedLoader
+from .governor import OverheadGovernor, overhead_budget
 
 
 def dummy(*args, **kwargs):
     return
 
 
+class EpochLimitReached(SystemExit):
+    """Raised from log_metric/log_metrics to stop the workload at its epoch limit"""
+
+
 def execute_command(cmd: str):
     """Execute a command
 
@@ -46,11 +60,18 @@ def execute_command(cmd: str):
 
 class _MLFlowLogger(multiprocessing.Process):
     """
-    Background process that periodically flushes metrics from a queue to MLflow
+    Background process that periodically flushes metrics from a queue to MLflow,
+    to a local Parquet store in offline mode, or directly into MLflow's SQL database
     """
 
     def __init__(
-        self, run_id, buffers, lock=None, flush_interval=5.0, max_batch_size=1000
+        self,
+        run_id,
+        buffers,
+        lock=None,
+        flush_interval=5.0,
+        max_batch_size=1000,
+        trackers=None,
     ):
         super().__init__(daemon=True)
         self.run_id = run_id
@@ -62,7 +83,22 @@ class _MLFlowLogger(multiprocessing.Process):
         self._client = MlflowClient()
         self._max_batch_size = int(max_batch_size)
 
+        # Alternative metric stores bypass the tracking server
+        self._store = None
+        if offline_dir := os.getenv("RADT_OFFLINE_DIR"):
+            self._store = ParquetMetricStore(offline_dir)
+        elif sql_uri := os.getenv("RADT_SQL_URI"):
+            self._store = SQLMetricStore(sql_uri)
+
+        # Trackers see every flushed metric, they may log metrics of their own along
+        # the way and at the end
+        self._trackers = [SummaryTracker()] if trackers is None else list(trackers)
+
     def run(self):
+        # The scheduler stops runs by signalling their whole process group, the logger
+        # keeps flushing until the workload stops it
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
         # Periodically flush buffer until stopped
         while not self._stop_event.is_set():
             try:
@@ -82,6 +118,42 @@ class _MLFlowLogger(multiprocessing.Process):
             if not flushed_any:
                 break
 
+        try:
+            self._finish_trackers()
+        except Exception as e:
+            print(f"MLFlowLogger error while logging tracker metrics: {e}")
+
+    def _finish_trackers(self):
+        timestamp = int(time() * 1000)
+        metric_dicts = [m for t in self._trackers for m in t.finish(timestamp)]
+        if metric_dicts:
+            self._log_batch(metric_dicts)
+
+    def _update_trackers(self, metric_dicts):
+        tracked = []
+        for tracker in self._trackers:
+            try:
+                tracked.extend(tracker.update(metric_dicts) or [])
+            except Exception as e:
+                print(f"MLFlowLogger tracker error: {e}")
+        return tracked
+
+    def _log_batch(self, metric_dicts):
+        # alternative stores have no batch size limit
+        if self._store is not None:
+            self._store.log_batch(self.run_id, metric_dicts)
+            return
+        # convert to Mlflow Metric entities and send in chunks
+        for i in range(0, len(metric_dicts), self._max_batch_size):
+            batch_dicts = metric_dicts[i : i + self._max_batch_size]
+            batch_entities = [
+                MlflowMetric(d["key"], d["value"], d["timestamp"], d["step"])
+                for d in batch_dicts
+            ]
+            self._client._tracking_client.store.log_batch(
+                run_id=self.run_id, metrics=batch_entities, params=[], tags=[]
+            )
+
     def _drain_queue(self):
         # Drain all currently queued items into a list without blocking.
         drained = []
@@ -115,17 +187,7 @@ class _MLFlowLogger(multiprocessing.Process):
         try:
             if not metric_dicts:
                 return True
-            # convert to Mlflow Metric entities and send in chunks
-            for i in range(0, len(metric_dicts), self._max_batch_size):
-                batch_dicts = metric_dicts[i : i + self._max_batch_size]
-                batch_entities = [
-                    MlflowMetric(d["key"], d["value"], d["timestamp"], d["step"])
-                    for d in batch_dicts
-                ]
-                self._client._tracking_client.store.log_batch(
-                    run_id=self.run_id, metrics=batch_entities, params=[], tags=[]
-                )
-            return True
+            self._log_batch(metric_dicts)
         except Exception:
             # On failure, requeue the metrics at the front of the current write buffer
             for original in to_flush:
@@ -136,6 +198,11 @@ class _MLFlowLogger(multiprocessing.Process):
                     pass
             raise
 
+        # Only sent metrics are tracked, requeued ones are seen again on the next flush
+        if tracked := self._update_trackers(metric_dicts):
+            self._log_batch(tracked)
+        return True
+
     def terminate(self):
         self._stop_event.set()
         self.join()
@@ -169,6 +236,38 @@ def log_metrics(metrics, epoch=0):
     instance.log_metrics(metrics, epoch)
 
 
+def phase(name):
+    """Module-level phase, does nothing if radT is not present"""
+    if "RADT_PRESENT" not in os.environ:
+        return Phase(None, name)
+    instance = _get_benchmark_instance()
+    return instance.phase(name)
+
+
+def step(samples=None):
+    """Module-level step"""
+    if "RADT_PRESENT" not in os.environ:
+        return
+    instance = _get_benchmark_instance()
+    instance.step(samples)
+
+
+def wrap_loader(iterable, name="loader"):
+    """Module-level wrap_loader, returns the iterable itself if radT is not present"""
+    if "RADT_PRESENT" not in os.environ:
+        return iterable
+    instance = _get_benchmark_instance()
+    return instance.wrap_loader(iterable, name)
+
+
+def wrap_iterator(iterator, name="loader"):
+    """Module-level wrap_iterator, returns the iterator itself if radT is not present"""
+    if "RADT_PRESENT" not in os.environ:
+        return iterator
+    instance = _get_benchmark_instance()
+    return instance.wrap_iterator(iterator, name)
+
+
 class RADTBenchmark:
     """Context manager wrapper that returns the singleton"""
 
@@ -194,6 +293,9 @@ class _RADTBenchmark:
             run = mlflow.active_run()
         self.run_id = run.info.run_id
 
+        epoch_limit = os.getenv("RADT_EPOCH_LIMIT")
+        self._epoch_limit = float(epoch_limit) if epoch_limit else None
+
         # Queue for main process and listener logging
         self._buffer_main = multiprocessing.Queue()
         self._buffer_listeners = multiprocessing.Queue()
@@ -231,6 +333,9 @@ class _RADTBenchmark:
             att = getattr(mlflow, name)
 
         if "RADT_PRESENT" not in os.environ:
+            # Module-level versions that pass through without radT
+            if name in ("phase", "wrap_loader", "wrap_iterator"):
+                return globals()[name]
             if isinstance(att, types.MethodType) or isinstance(att, types.FunctionType):
                 return dummy
 
@@ -244,24 +349,69 @@ class _RADTBenchmark:
 
         self.processes = []
 
+        # Phase spans are attributed to listener samples by the listener logger
+        spans = multiprocessing.Queue()
+        active_phase = multiprocessing.RawValue("i", NO_PHASE)
+        self._phases = PhaseRecorder(spans, active_phase)
+
+        # Step times are summarised in the workload process and sent as metrics
+        self._steps = StepTimer(self._buffer_main)
+        self._loaders = {}
+
+        # Energy integrated by the listener logger, related to progress by the main logger
+        joules = multiprocessing.Value("d", 0.0)
+
         # main logger handles user-invoked log_metric/log_metrics
-        main_logger = _MLFlowLogger(self.run_id, self._buffer_main)
+        main_logger = _MLFlowLogger(
+            self.run_id,
+            self._buffer_main,
+            trackers=[SummaryTracker(), EfficiencyTracker(joules)],
+        )
         self.processes.append(main_logger)
 
         # listener logger accepts metrics from listeners
-        listener_logger = _MLFlowLogger(self.run_id, self._buffer_listeners)
+        listener_logger = _MLFlowLogger(
+            self.run_id,
+            self._buffer_listeners,
+            trackers=[
+                SummaryTracker(),
+                EnergyTracker(joules),
+                PhaseTracker(spans, active_phase),
+            ],
+        )
         self.processes.append(listener_logger)
 
-        # Spawn processes for enabled listeners
-        for listener_name, listener_class in listeners.items():
+        # Spawn processes for enabled listeners, only these are imported
+        for listener_name in available_listeners():
             listener_env_key = f"RADT_LISTENER_{listener_name.upper()}"
             if os.getenv(listener_env_key) == "True":
                 os.environ[listener_env_key] = "False"
+                listener_class = load_listener(listener_name)
                 inst = listener_class(self.run_id, self._buffer_listeners)
                 self.processes.append(inst)
 
+        # The governor attaches to the listeners before they start
+        self._governor = None
+        if (budget := overhead_budget()) is not None:
+            self._governor = OverheadGovernor(
+                self.run_id,
+                budget,
+                self.processes,
+                [self._buffer_main, self._buffer_listeners],
+            )
+
+        # Listeners leave radT's own processes out of the workload's process tree
+        helpers = multiprocessing.Array("i", len(self.processes))
         for process in self.processes:
+            if isinstance(process, Listener):
+                process.helpers = helpers
+
+        for i, process in enumerate(self.processes):
             process.start()
+            if isinstance(process, multiprocessing.Process):
+                helpers[i] = process.pid
+        if self._governor is not None:
+            self._governor.start()
 
         return self
 
@@ -272,15 +422,85 @@ class _RADTBenchmark:
         if "RADT_PRESENT" not in os.environ:
             return
 
+        self._phases.close()
+        self._steps.emit()
+        for loader in self._loaders.values():
+            loader.emit()
+        if self._steps.snapshots:
+            MlflowClient().log_text(
+                self.run_id, self._steps.report(), "radt/step_histograms.jsonl"
+            )
+
+        # Stop adjusting listeners before they are terminated
+        if self._governor is not None:
+            self._governor.terminate()
+
         # Terminate listeners before loggers so the logger can flush remaining items.
         for process in reversed(self.processes):
             process.terminate()
 
         mlflow.end_run()
 
+    def _check_epoch_limit(self, epoch):
+        """Stop the workload once an epoch beyond the limit is reached"""
+        if self._epoch_limit is None or int(epoch) < self._epoch_limit:
+            return
+
+        MlflowClient().set_tag(self.run_id, constants.LIMIT_TAG, "epoch")
+        print(f"RADT epoch limit of {self._epoch_limit:g} reached, stopping run")
+        raise EpochLimitReached(0)
+
+    def phase(self, name):
+        """
+        Mark a phase of the workload, such as data loading or checkpointing.
+        Listener samples are attributed to the innermost active phase.
+
+        Use as a context manager (`with run.phase("forward"):`) or as a decorator.
+        Phases that are entered often can be created once and reused.
+
+        :param name: Phase name (string), used in the `phase/<name>/...` metrics.
+        """
+        return Phase(self._phases, name)
+
+    def step(self, samples=None):
+        """
+        Mark the end of a training step. The time between steps is collected in a
+        histogram, its percentiles and the throughput are logged as `steps/...`
+        metrics every few seconds.
+
+        :param samples: Number of samples processed in the step (optional), to log
+                        the throughput in samples per second.
+        """
+        self._steps.step(samples)
+
+    def _loader_stats(self, name):
+        if name not in self._loaders:
+            self._loaders[name] = LoaderStats(self._buffer_main, name)
+        return self._loaders[name]
+
+    def wrap_loader(self, iterable, name="loader"):
+        """
+        Wrap an iterable of batches, such as a DataLoader, to measure how long the
+        training loop waits for input. Logs `loader/<name>/input-bound fraction` and
+        wait time percentiles every few seconds.
+
+        :param iterable: Iterable to wrap, it can be iterated over multiple times.
+        :param name: Name of the loader (string), loaders of the same name are combined.
+        """
+        return TimedLoader(iterable, self._loader_stats(name))
+
+    def wrap_iterator(self, iterator, name="loader"):
+        """
+        Like wrap_loader, for an iterator or generator that is iterated over once.
+
+        :param iterator: Iterator to wrap.
+        :param name: Name of the loader (string), loaders of the same name are combined.
+        """
+        return TimedIterator(iter(iterator), self._loader_stats(name))
+
     def log_metric(self, name, value, epoch=0):
         """
-        Log a metric. Terminates the run if epoch/time limit has been reached.
+        Log a metric. Terminates the run if the epoch limit has been reached.
 
         :param name: Metric name (string). This string may only contain alphanumerics, underscores
                     (_), dashes (-), periods (.), spaces ( ), and slashes (/).
@@ -293,6 +513,8 @@ class _RADTBenchmark:
         if "RADT_PRESENT" not in os.environ:
             return
 
+        self._check_epoch_limit(epoch)
+
         entry = {
             "key": name,
             "value": value,
@@ -303,7 +525,7 @@ class _RADTBenchmark:
 
     def log_metrics(self, metrics, epoch=0):
         """
-        Log multiple metrics. Terminates the run if epoch/time limit has been reached.
+        Log multiple metrics. Terminates the run if the epoch limit has been reached.
 
         :param name: Dict of metrics (string: float). Key-value pairs of metrics to be logged.
         :param epoch: Integer training step (epoch) at which was the metric calculated.
@@ -312,6 +534,8 @@ class _RADTBenchmark:
         if "RADT_PRESENT" not in os.environ:
             return
 
+        self._check_epoch_limit(epoch)
+
         entries = [
             {"key": k, "value": v, "timestamp": int(time() * 1000), "step": int(epoch)}
             for k, v in metrics.items()
@@ -0,0 +1,222 @@
+import math
+import os
+
+from .loader import LOADER_PREFIX
+from .steps import STEP_PREFIX
+
+ENERGY_PREFIX = "energy"
+ENERGY_KEY = f"{ENERGY_PREFIX}/Total Energy"
+POWER_KEY = f"{ENERGY_PREFIX}/Average Power"
+PER_EPOCH_KEY = f"{ENERGY_PREFIX}/Joules per Epoch"
+PER_SAMPLE_KEY = f"{ENERGY_PREFIX}/Joules per Sample"
+WORKLOAD_ENERGY_KEY = f"{ENERGY_PREFIX}/Workload Energy"
+
+# Listener metrics energy is derived from, by preference: (key, is counter, to joules)
+# Counter deltas assume a single GPU per DCGMI group
+ENERGY_SOURCES = (
+    ("system/DCGMI - Total Energy Consumption", True, 1e-3),  # mJ
+    ("system/SMI - Power Draw", False, 1.0),  # W
+    ("system/DCGMI - Power Usage", False, 1.0),  # W
+)
+
+# Metrics of radT itself that are not logged per epoch
+PROGRESS_EXCLUDE = (f"{ENERGY_PREFIX}/", f"{STEP_PREFIX}/", f"{LOADER_PREFIX}/")
+
+# User metric counting processed samples, its values are summed
+DEFAULT_SAMPLES_METRIC = "samples"
+
+
+class EnergySeries:
+    """Streaming energy of a power series (trapezoidal rule) or an energy counter"""
+
+    def __init__(self, counter: bool = False, scale: float = 1.0):
+        self.counter = counter
+        self.scale = scale
+        self.joules = 0.0
+        self.start = None
+        self.last = None
+
+    def add(self, value: float, timestamp: int):
+        # Listeners log -1 for readings they could not parse
+        if math.isnan(value) or value < 0:
+            return
+        if self.last is None:
+            self.start = timestamp
+            self.last = (timestamp, value)
+            return
+
+        last_timestamp, last_value = self.last
+        if timestamp <= last_timestamp:
+            return
+
+        if not self.counter:
+            seconds = (timestamp - last_timestamp) / 1000
+            self.joules += (last_value + value) / 2 * seconds * self.scale
+        elif value >= last_value:
+            # A decreasing counter was reset, counting restarts from its new value
+            self.joules += (value - last_value) * self.scale
+        self.last = (timestamp, value)
+
+    @property
+    def duration(self):
+        """Seconds between the first and last reading"""
+        return 0.0 if self.last is None else (self.last[0] - self.start) / 1000
+
+
+def replay_energy(readings, counter: bool = False, scale: float = 1.0):
+    """Compute the energy of a recorded power or counter trace
+
+    Args:
+        readings (iterable): (timestamp in milliseconds, value) pairs
+        counter (bool, optional): Whether the values are an energy counter
+        scale (float, optional): Factor converting the integrated values to joules
+
+    Returns:
+        float: Energy in joules
+        float: Duration in seconds
+    """
+    series = EnergySeries(counter, scale)
+    for timestamp, value in sorted(readings, key=lambda r: r[0]):
+        series.add(float(value), int(timestamp))
+    return series.joules, series.duration
+
+
+def workload_energy(energies: dict):
+    """Energy of a workload, counting devices shared by collocated runs once
+
+    Collocated runs on the same devices each measure the power of those devices, the
+    longest measurement per set of devices is kept.
+
+    Args:
+        energies (dict): Run energies in joules per set of devices
+
+    Returns:
+        float: Energy in joules
+    """
+    return sum(max(joules) for joules in energies.values() if joules)
+
+
+def _metric(key: str, value: float, timestamp: int, step: int = 0):
+    return {"key": key, "value": float(value), "timestamp": timestamp, "step": step}
+
+
+class EnergyTracker:
+    """Logger tracker that integrates the power readings of listeners into energy.
+
+    Logs the total energy and average power of the run as readings arrive, and shares
+    the energy with the `EfficiencyTracker` of the main logger through `joules`.
+    """
+
+    def __init__(self, joules=None):
+        self.joules = joules
+        self.series = {
+            key: EnergySeries(counter, scale) for key, counter, scale in ENERGY_SOURCES
+        }
+
+    def _source(self):
+        return next((s for s in self.series.values() if s.duration > 0), None)
+
+    def _metrics(self, timestamp: int):
+        source = self._source()
+        if source is None:
+            return []
+        if self.joules is not None:
+            self.joules.value = source.joules
+        return [
+            _metric(ENERGY_KEY, source.joules, timestamp),
+            _metric(POWER_KEY, source.joules / source.duration, timestamp),
+        ]
+
+    def update(self, metrics: list):
+        """Add logged metrics
+
+        Args:
+            metrics (list): Metric dicts with key, value, timestamp and step
+
+        Returns:
+            list: Metric dicts to log
+        """
+        readings = [m for m in metrics if m["key"] in self.series]
+        if not readings:
+            return []
+        for m in sorted(readings, key=lambda m: m["timestamp"]):
+            self.series[m["key"]].add(m["value"], m["timestamp"])
+        return self._metrics(max(m["timestamp"] for m in readings))
+
+    def finish(self, timestamp: int):
+        """Metrics to log at the end of the run
+
+        Args:
+            timestamp (int): Timestamp in milliseconds
+
+        Returns:
+            list: Metric dicts
+        """
+        return self._metrics(timestamp)
+
+
+class EfficiencyTracker:
+    """Logger tracker that relates the energy of the run to its training progress.
+
+    Progress is the number of epochs (the highest step logged, plus one) and the sum of
+    the values of the samples metric (`RADT_SAMPLES_METRIC`, "samples" by default).
+    Step times and loader waits are logged per training step or fetch rather than per
+    epoch and are ignored.
+    """
+
+    def __init__(self, joules, samples_metric: str = None):
+        self.joules = joules
+        self.samples_metric = samples_metric or os.getenv(
+            "RADT_SAMPLES_METRIC", DEFAULT_SAMPLES_METRIC
+        )
+        self.epochs = 0
+        self.samples = 0.0
+        self.logged = None
+
+    def _metrics(self, timestamp: int):
+        joules = self.joules.value
+        if not joules or self.logged == (joules, self.epochs, self.samples):
+            return []
+        self.logged = (joules, self.epochs, self.samples)
+
+        step = max(self.epochs - 1, 0)
+        metrics = []
+        if self.epochs:
+            metrics.append(
+                _metric(PER_EPOCH_KEY, joules / self.epochs, timestamp, step)
+            )
+        if self.samples:
+            metrics.append(
+                _metric(PER_SAMPLE_KEY, joules / self.samples, timestamp, step)
+            )
+        return metrics
+
+    def update(self, metrics: list):
+        """Add logged metrics
+
+        Args:
+            metrics (list): Metric dicts with key, value, timestamp and step
+
+        Returns:
+            list: Metric dicts to log
+        """
+        metrics = [m for m in metrics if not m["key"].startswith(PROGRESS_EXCLUDE)]
+        if not metrics:
+            return []
+        for m in metrics:
+            self.epochs = max(self.epochs, m["step"] + 1)
+            if m["key"] == self.samples_metric and not math.isnan(m["value"]):
+                self.samples += m["value"]
+        return self._metrics(max(m["timestamp"] for m in metrics))
+
+    def finish(self, timestamp: int):
+        """Metrics to log at the end of the run
+
+        Args:
+            timestamp (int): Timestamp in milliseconds
+
+        Returns:
+            list: Metric dicts
+        """
+        self.logged = None
+        return self._metrics(timestamp)
@@ -0,0 +1,271 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from mlflow.tracking import MlflowClient
+
+from .listeners import Listener
+from .listeners import _procfs
+
+GOVERNOR_PREFIX = "governor"
+GOVERNOR_INTERVAL = 5.0
+
+# Factor by which a listener is slowed down per adjustment, and at most
+SLOWDOWN_STEP = 2.0
+MAX_SLOWDOWN = 16.0
+
+# Queued metrics at which the loggers are considered to fall behind
+BACKLOG_LIMIT = 10000
+
+# Adjustments are undone one at a time, after this many intervals in which radT used
+# less than HEADROOM of its budget
+RESTORE_AFTER = 3
+HEADROOM = 0.5
+
+
+def overhead_budget():
+    """Overhead budget of the run
+
+    Returns:
+        float or None: Share of one CPU core the listeners may use, from
+            RADT_OVERHEAD_BUDGET in % of one core, None if not set
+    """
+    budget = os.getenv("RADT_OVERHEAD_BUDGET")
+    return float(budget) / 100 if budget else None
+
+
+def backlog(buffers: list):
+    """Number of queued metrics
+
+    Args:
+        buffers (list): multiprocessing.Queue instances
+
+    Returns:
+        int: Queued items, 0 where the platform cannot tell (macOS)
+    """
+    total = 0
+    for buffer in buffers:
+        try:
+            total += buffer.qsize()
+        except NotImplementedError:
+            pass
+    return total
+
+
+class OverheadGovernor(threading.Thread):
+    """Keeps the CPU usage of the listeners within a budget.
+
+    Every few seconds, the CPU time of the listener processes (with the tools they
+    spawn) and the listener threads is measured, together with the number of metrics
+    waiting in the loggers' queues. When the listeners use more than the budget or
+    the loggers fall behind, the most expensive listener is slowed down, or stopped
+    if it cannot be slowed down. Adjustments are undone one at a time once the
+    listeners have stayed well within the budget for a while. Every adjustment is
+    logged as `governor/<listener> Interval` (0 when stopped) and recorded in
+    `radt/governor.jsonl`.
+
+    The loggers and the governor cannot be adjusted, so their CPU usage is logged
+    separately and does not count towards the budget. The loggers' load follows the
+    volume of metrics, which the backlog limit keeps in check.
+    """
+
+    def __init__(self, run_id, budget: float, processes: list, buffers: list):
+        """Attaches to the listeners, which must not have started yet
+
+        Args:
+            run_id (str): Run ID
+            budget (float): Share of one CPU core the listeners may use
+            processes (list): Loggers and listeners, restarted listeners are appended
+            buffers (list): Queues of the main logger and the listener logger
+        """
+        super(OverheadGovernor, self).__init__(daemon=True)
+        self.run_id = run_id
+        self.budget = budget
+        self.processes = processes
+        self.buffers = buffers
+        self.events = []
+
+        self._root = os.getpid()
+        self._previous = {}
+        self._adjustments = []
+        self._disabled = set()
+        self._calm = 0
+        self._stopped = threading.Event()
+
+        for process in processes:
+            if isinstance(process, Listener) and process.adjustable:
+                process.slowdown = multiprocessing.RawValue("d", 1.0)
+
+    def _cpu(self, process):
+        """CPU seconds used by a process and its children, or a thread of this process
+
+        Returns:
+            dict: CPU seconds per (PID, TID, start time)
+        """
+        if isinstance(process, threading.Thread):
+            stat = _procfs.read_task_stat(self._root, process.native_id)
+            key = (self._root, process.native_id, stat and stat["starttime"])
+            return {key: stat["utime"] + stat["stime"]} if stat else {}
+
+        cpu = {}
+        if process.pid is None:
+            return cpu
+        for pid in _procfs.process_tree(process.pid):
+            if stat := _procfs.read_stat(pid):
+                cpu[(pid, None, stat["starttime"])] = stat["utime"] + stat["stime"]
+        return cpu
+
+    def measure(self, seconds: float):
+        """CPU usage since the previous measurement
+
+        Args:
+            seconds (float): Time since the previous measurement
+
+        Returns:
+            float, float, dict: Share of one core used by the listeners, by the
+                loggers and the governor, and per listener
+        """
+        current, usage = {}, {}
+        for process in [*self.processes, self]:
+            if process in self._disabled:
+                continue
+            cpu = self._cpu(process)
+            current.update(cpu)
+            usage[process] = (
+                sum(max(v - self._previous.get(k, 0.0), 0.0) for k, v in cpu.items())
+                / seconds
+            )
+        self._previous = current
+
+        listeners = {p: u for p, u in usage.items() if isinstance(p, Listener)}
+        listener_total = sum(listeners.values())
+        return listener_total, sum(usage.values()) - listener_total, listeners
+
+    def reduce(self, usage: dict):
+        """Slow down or stop the most expensive listener
+
+        Args:
+            usage (dict): Share of one core per listener
+
+        Returns:
+            tuple or None: Adjustment, None if only load that cannot be adjusted is left
+        """
+        for listener in sorted(usage, key=usage.get, reverse=True):
+            # Listeners that use no CPU would not bring the overhead down
+            if usage[listener] <= 0:
+                break
+            if listener.adjustable and listener.slowdown.value < MAX_SLOWDOWN:
+                listener.slowdown.value *= SLOWDOWN_STEP
+                return ("slow", listener)
+            if not listener.adjustable and not isinstance(listener, threading.Thread):
+                listener.terminate()
+                self._disabled.add(listener)
+                return ("stop", listener)
+        return None
+
+    def restore(self):
+        """Undo the latest adjustment
+
+        Returns:
+            tuple: Adjustment, with the restarted listener for stopped listeners
+        """
+        action, listener = self._adjustments.pop()
+        if action == "slow":
+            listener.slowdown.value /= SLOWDOWN_STEP
+            return ("speed up", listener)
+
+        self._disabled.discard(listener)
+        restarted = type(listener)(listener.run_id, self.buffers[1])
+        restarted.helpers = listener.helpers
+        self.processes.append(restarted)
+        restarted.start()
+        if listener.helpers is not None:
+            # The restarted listener takes the place of the stopped one
+            with listener.helpers.get_lock():
+                pids = listener.helpers[:]
+                if listener.pid in pids:
+                    listener.helpers[pids.index(listener.pid)] = restarted.pid
+        return ("restart", restarted)
+
+    def _record(self, action: str, listener, overhead: float, queued: int):
+        running = action != "stop"
+        interval = listener.sampling_interval() if running else 0.0
+        event = {
+            "timestamp": int(time.time() * 1000),
+            "listener": listener.listener_name,
+            "action": action,
+            "interval": interval,
+            "overhead": overhead,
+            "backlog": queued,
+        }
+        self.events.append(event)
+        self._log({f"{GOVERNOR_PREFIX}/{listener.listener_name} Interval": interval})
+        print(
+            f"RADT overhead governor: {action} {listener.listener_name} "
+            f"(overhead {overhead:.2%} of a core, budget {self.budget:.2%}, "
+            f"{queued} metrics queued)"
+        )
+
+    def _log(self, metrics: dict):
+        ts = int(time.time() * 1000)
+        for key, value in metrics.items():
+            self.buffers[0].put(
+                {"key": key, "value": value, "timestamp": ts, "step": 0}
+            )
+
+    def step(self, seconds: float):
+        """Measure and adjust once
+
+        Args:
+            seconds (float): Time since the previous step
+        """
+        overhead, loggers, usage = self.measure(seconds)
+        queued = backlog(self.buffers)
+        self._log(
+            {
+                f"{GOVERNOR_PREFIX}/Overhead Percentage": 100 * overhead,
+                f"{GOVERNOR_PREFIX}/Logger Overhead Percentage": 100 * loggers,
+                f"{GOVERNOR_PREFIX}/Backlog": queued,
+            }
+        )
+
+        if overhead > self.budget or queued > BACKLOG_LIMIT:
+            self._calm = 0
+            if adjustment := self.reduce(usage):
+                self._adjustments.append(adjustment)
+                self._record(*adjustment, overhead, queued)
+            return
+
+        calm = overhead < HEADROOM * self.budget and queued < BACKLOG_LIMIT / 10
+        self._calm = self._calm + 1 if calm else 0
+        if self._calm >= RESTORE_AFTER and self._adjustments:
+            self._calm = 0
+            self._record(*self.restore(), overhead, queued)
+
+    def run(self):
+        last = time.monotonic()
+        self.measure(1.0)
+        while not self._stopped.wait(GOVERNOR_INTERVAL):
+            now = time.monotonic()
+            try:
+                self.step(now - last)
+            except Exception as e:
+                print(f"RADT overhead governor error: {e}")
+            last = now
+
+    def terminate(self):
+        self._stopped.set()
+        self.join()
+
+        if not self.events:
+            return
+        try:
+            MlflowClient().log_text(
+                self.run_id,
+                "".join(json.dumps(e) + "\n" for e in self.events),
+                "radt/governor.jsonl",
+            )
+        except Exception as e:
+            print(f"RADT overhead governor could not upload its events: {e}")
@@ -1,26 +1,70 @@
-import os
+import functools
 import importlib
-import pkgutil
-
-__all__ = ["listeners"]
-
-_package_path = os.path.dirname(__file__)
-
-listeners = {}
-
-for finder, module_name, ispkg in pkgutil.iter_modules([_package_path]):
-    if module_name.startswith("_"):
-        continue
-    try:
-        module = importlib.import_module(f".{module_name}", __package__)
-    except Exception as e:
-        print(f"Error while trying to importing module: {e}")
-        # ignore modules that fail to import to avoid breaking package import
-        continue
-
-    for attr_name in dir(module):
-        attr = getattr(module, attr_name)
-        if isinstance(attr, type) and "Thread" in attr_name:
-            listeners[attr_name[:-6]] = attr
-            globals()[attr_name] = attr
-            __all__.append(attr_name)
+from importlib.metadata import entry_points
+
+from .base import Listener
+
+__all__ = ["ENTRY_POINT_GROUP", "Listener", "available_listeners", "load_listener"]
+
+# Entry point group of listeners, radT registers its own in the same way as other
+# packages, e.g. in pyproject.toml:
+#
+#   [project.entry-points."radt.listeners"]
+#   rocm = "radt_rocm:ROCmThread"
+ENTRY_POINT_GROUP = "radt.listeners"
+
+
+def _builtin(entry_point):
+    return entry_point.value.startswith(f"{__name__}.")
+
+
+def available_listeners():
+    """Listeners that can be enabled, without importing them
+
+    Returns:
+        dict: "module:attribute" per listener name, radT's own listeners first
+    """
+    return dict(_registry())
+
+
+@functools.lru_cache(maxsize=None)
+def _registry():
+    group = entry_points()
+    if hasattr(group, "select"):
+        group = group.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        group = group.get(ENTRY_POINT_GROUP, [])
+
+    # radT's own listeners come first and cannot be replaced by other packages
+    listeners = {}
+    for entry_point in sorted(group, key=lambda e: not _builtin(e)):
+        name = entry_point.name.lower()
+        if name in listeners:
+            if listeners[name] != entry_point.value:
+                print(f"Listener '{name}' of {entry_point.value} is already registered")
+            continue
+        listeners[name] = entry_point.value
+    return listeners
+
+
+def load_listener(name: str):
+    """Import a listener
+
+    Args:
+        name (str): Listener name
+
+    Raises:
+        ValueError: Listener unavailable or not a Listener
+
+    Returns:
+        type: Listener class
+    """
+    listeners = available_listeners()
+    if name not in listeners:
+        raise ValueError(f"Unavailable listener: {name}")
+
+    module_name, _, attribute = listeners[name].partition(":")
+    listener = getattr(importlib.import_module(module_name), attribute)
+    if not (isinstance(listener, type) and issubclass(listener, Listener)):
+        raise ValueError(f"{listeners[name]} is not a radt Listener")
+    return listener
@@ -0,0 +1,198 @@
+"""Readers for /proc and other pseudo-files, shared by the listeners"""
+
+import os
+
+PROC = "/proc"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+# Plain strings and os calls, pathlib is several times slower for these small reads
+def read_file(path: str):
+    """Read a pseudo-file
+
+    Args:
+        path (str): Path
+
+    Returns:
+        str or None: Contents, None if the file is missing or cannot be read
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode()
+    except OSError:
+        return None
+
+
+def _listdir(path: str):
+    try:
+        return os.listdir(path)
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        return []
+
+
+def parse_stat(text: str):
+    """Parse the contents of /proc/<pid>/stat or /proc/<pid>/task/<tid>/stat
+
+    Args:
+        text (str): File contents
+
+    Returns:
+        dict: comm, state, ppid, utime and stime (seconds), num_threads, starttime
+            (clock ticks after boot) and processor
+    """
+    # The command may contain spaces and parentheses, the fields after it do not
+    comm = text[text.index("(") + 1 : text.rindex(")")]
+    fields = text[text.rindex(")") + 2 :].split()
+    return {
+        "comm": comm,
+        "state": fields[0],
+        "ppid": int(fields[1]),
+        "utime": int(fields[11]) / CLOCK_TICKS,
+        "stime": int(fields[12]) / CLOCK_TICKS,
+        "num_threads": int(fields[17]),
+        "starttime": int(fields[19]),
+        "processor": int(fields[36]) if len(fields) > 36 else -1,
+    }
+
+
+def parse_keyed(text: str):
+    """Parse `key: value [kB]` files such as io, status and smaps_rollup
+
+    Args:
+        text (str): File contents
+
+    Returns:
+        dict: Integer values per key, kB values are converted to bytes
+    """
+    values = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        value = value.split()
+        if not value:
+            continue
+        try:
+            number = int(value[0])
+        except ValueError:
+            continue
+        values[key.strip()] = number * 1024 if value[-1] == "kB" else number
+    return values
+
+
+def read_stat(pid: int, proc: str = PROC):
+    """Read /proc/<pid>/stat
+
+    Returns:
+        dict or None: Parsed stat, None if the process does not exist
+    """
+    text = read_file(f"{proc}/{pid}/stat")
+    return parse_stat(text) if text else None
+
+
+def read_rss(pid: int, proc: str = PROC):
+    """Resident set size from /proc/<pid>/statm
+
+    Returns:
+        int or None: Bytes
+    """
+    text = read_file(f"{proc}/{pid}/statm")
+    return int(text.split()[1]) * PAGE_SIZE if text else None
+
+
+def read_smaps_rollup(pid: int, proc: str = PROC):
+    """Read /proc/<pid>/smaps_rollup (Linux 4.14+)
+
+    Returns:
+        dict or None: Bytes per field (Rss, Pss, Shared_Clean, ...)
+    """
+    text = read_file(f"{proc}/{pid}/smaps_rollup")
+    return parse_keyed(text) if text else None
+
+
+def read_io(pid: int, proc: str = PROC):
+    """Read /proc/<pid>/io, only readable for processes of the same user
+
+    Returns:
+        dict or None: rchar, wchar, read_bytes, write_bytes, ...
+    """
+    text = read_file(f"{proc}/{pid}/io")
+    return parse_keyed(text) if text else None
+
+
+def children(pid: int, proc: str = PROC):
+    """Child processes, from /proc/<pid>/task/<tid>/children
+
+    Returns:
+        list or None: Child PIDs, None if the kernel does not provide children files
+    """
+    pids = []
+    for tid in _listdir(f"{proc}/{pid}/task"):
+        path = f"{proc}/{pid}/task/{tid}/children"
+        text = read_file(path)
+        if text is None and not os.path.exists(path):
+            return None if os.path.exists(f"{proc}/{pid}") else pids
+        if text:
+            pids.extend(int(p) for p in text.split())
+    return pids
+
+
+def parents(proc: str = PROC):
+    """Parent PID of every process, by scanning /proc
+
+    Returns:
+        dict: Parent PID per PID
+    """
+    result = {}
+    for entry in _listdir(proc):
+        if entry.isdigit() and (stat := read_stat(int(entry), proc)):
+            result[int(entry)] = stat["ppid"]
+    return result
+
+
+def process_tree(root: int, proc: str = PROC, exclude=()):
+    """A process and all of its descendants
+
+    Args:
+        root (int): PID of the root process
+        proc (str, optional): Mount point of procfs
+        exclude (iterable, optional): PIDs to leave out, with their descendants
+
+    Returns:
+        list: PIDs, starting with the root
+    """
+    exclude = set(exclude)
+    tree, queue, by_parent = [], [root], None
+    while queue:
+        pid = queue.pop()
+        if pid in exclude:
+            continue
+        tree.append(pid)
+        found = children(pid, proc) if by_parent is None else None
+        if found is None:
+            # Without children files, fall back to a single scan of /proc
+            if by_parent is None:
+                by_parent = {}
+                for child, parent in parents(proc).items():
+                    by_parent.setdefault(parent, []).append(child)
+            found = by_parent.get(pid, [])
+        queue.extend(found)
+    return tree
+
+
+def tasks(pid: int, proc: str = PROC):
+    """Threads of a process
+
+    Returns:
+        list: Thread IDs
+    """
+    return [int(tid) for tid in _listdir(f"{proc}/{pid}/task")]
+
+
+def read_task_stat(pid: int, tid: int, proc: str = PROC):
+    """Read /proc/<pid>/task/<tid>/stat, its comm is the thread name
+
+    Returns:
+        dict or None: Parsed stat, None if the thread does not exist
+    """
+    text = read_file(f"{proc}/{pid}/task/{tid}/stat")
+    return parse_stat(text) if text else None
@@ -0,0 +1,85 @@
+import time
+
+import mlflow
+
+
+class Listener:
+    """Base class of run listeners.
+
+    A listener collects metrics while the workload runs and is enabled by name for a
+    run, e.g. `-l smi+top`. Subclasses also derive from `multiprocessing.Process` to
+    sample in a separate process, or from `threading.Thread` to sample inside the
+    workload process (these implement `terminate()` to stop). They are constructed
+    with `(run_id, mlflow_buffer=None, experiment_id=88)`.
+
+    Listeners, radT's own included, are registered in the `radt.listeners` entry point
+    group, modules are only imported when their listener is enabled.
+
+    Attributes:
+        listener_name (str): Name used to enable the listener
+        metrics (tuple): Metric keys the listener logs, `<...>` marks a variable part
+        interval (float): Default seconds between samples
+        cost (float): Estimated share of one CPU core used at the default interval
+        adjustable (bool): Whether the listener samples every `sampling_interval()`,
+            so the overhead governor can slow it down
+        slowdown (multiprocessing.RawValue): Factor applied to the interval, set by
+            the overhead governor before the listener starts
+        helpers (multiprocessing.Array): PIDs of radT's logger and listener
+            processes, set by the benchmark before the listener starts and filled in
+            once they have all started
+    """
+
+    listener_name = None
+    metrics = ()
+    interval = 1.0
+    cost = 0.01
+    adjustable = False
+    slowdown = None
+    helpers = None
+
+    def helper_pids(self):
+        """PIDs of radT's own processes, which are not part of the workload
+
+        The tools that these processes start are their descendants.
+
+        Returns:
+            set: PIDs
+        """
+        if self.helpers is None:
+            return set()
+        return {pid for pid in self.helpers[:] if pid}
+
+    def sampling_interval(self):
+        """Seconds until the next sample
+
+        Returns:
+            float: Default interval, slowed down by the overhead governor if needed
+        """
+        if self.slowdown is None:
+            return self.interval
+        return self.interval * self.slowdown.value
+
+    def _enqueue_metrics(self, metrics, timestamp_ms=None):
+        """Hand metrics to the listener logger, or log them directly without one
+
+        Args:
+            metrics (dict): Value per metric key
+            timestamp_ms (int, optional): Timestamp, defaults to now
+        """
+        if self.mlflow_buffer:
+            ts = (
+                int(timestamp_ms)
+                if timestamp_ms is not None
+                else int(time.time() * 1000)
+            )
+            entries = [
+                {"key": k, "value": v, "timestamp": ts, "step": 0}
+                for k, v in metrics.items()
+            ]
+            try:
+                for e in entries:
+                    self.mlflow_buffer.put(e)
+            except Exception:
+                mlflow.log_metrics(metrics)
+        else:
+            mlflow.log_metrics(metrics)
@@ -0,0 +1,218 @@
+import os
+import time
+from multiprocessing import Process
+
+import mlflow
+
+from ._procfs import PROC, read_file
+from .base import Listener
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+CGROUP_INTERVAL = 1.0
+
+
+def cgroup_dir(pid: int, proc: str = PROC, root: str = CGROUP_ROOT):
+    """cgroup v2 directory of a process
+
+    Args:
+        pid (int): PID
+        proc (str, optional): Mount point of procfs
+        root (str, optional): Mount point of cgroupfs
+
+    Returns:
+        str or None: Directory, None if the process is not in a cgroup v2 hierarchy
+    """
+    text = read_file(f"{proc}/{pid}/cgroup")
+    if not text:
+        return None
+    path = next((l[3:] for l in text.splitlines() if l.startswith("0::")), None)
+    if path is None:
+        return None
+
+    # The unified hierarchy is mounted separately on hybrid (v1 + v2) systems
+    for mount in (root, f"{root}/unified"):
+        if os.path.exists(f"{mount}/cgroup.controllers"):
+            return f"{mount}{path}".rstrip("/") or "/"
+    return None
+
+
+def parse_flat(text: str):
+    """Parse flat keyed files such as cpu.stat and memory.stat
+
+    Args:
+        text (str): File contents
+
+    Returns:
+        dict: Integer value per key
+    """
+    values = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().lstrip("-").isdigit():
+            values[key] = int(value)
+    return values
+
+
+def parse_io_stat(text: str):
+    """Parse io.stat, summing all devices
+
+    Args:
+        text (str): File contents, e.g. "8:0 rbytes=1 wbytes=2 rios=3 wios=4 ..."
+
+    Returns:
+        dict: Total per field
+    """
+    totals = {}
+    for line in text.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if value.isdigit():
+                totals[key] = totals.get(key, 0) + int(value)
+    return totals
+
+
+def parse_pressure(text: str):
+    """Parse a pressure stall information file
+
+    Args:
+        text (str): File contents, e.g. "some avg10=0.00 avg60=0.00 avg300=0.00 total=0"
+
+    Returns:
+        dict: Total stall time in microseconds for "some" and "full"
+    """
+    totals = {}
+    for line in text.splitlines():
+        kind, *fields = line.split()
+        for field in fields:
+            key, _, value = field.partition("=")
+            if key == "total":
+                totals[kind] = int(value)
+    return totals
+
+
+def read_cgroup(directory: str):
+    """Read the counters of a cgroup
+
+    Args:
+        directory (str): cgroup directory
+
+    Returns:
+        dict: Parsed files by name, files that are missing are left out
+    """
+    parsers = {
+        "cpu.stat": parse_flat,
+        "memory.stat": parse_flat,
+        "io.stat": parse_io_stat,
+        "cpu.pressure": parse_pressure,
+        "memory.pressure": parse_pressure,
+        "io.pressure": parse_pressure,
+        "memory.current": lambda text: int(text),
+        "memory.max": lambda text: None if text.strip() == "max" else int(text),
+    }
+    counters = {}
+    for name, parse in parsers.items():
+        text = read_file(f"{directory}/{name}")
+        if text is not None:
+            counters[name] = parse(text)
+    return counters
+
+
+def cgroup_metrics(current: dict, previous: dict, seconds: float):
+    """Metrics of a cgroup from two consecutive readings
+
+    Args:
+        current (dict): Current counters
+        previous (dict): Previous counters
+        seconds (float): Time between the readings
+
+    Returns:
+        dict: Metrics
+    """
+    m = {}
+    usec = seconds * 1e6
+
+    def delta(name, key):
+        return current[name].get(key, 0) - previous.get(name, {}).get(key, 0)
+
+    if "cpu.stat" in current:
+        m["system/CGROUP - CPU Utilization"] = (
+            100 * delta("cpu.stat", "usage_usec") / usec
+        )
+        if "throttled_usec" in current["cpu.stat"]:
+            m["system/CGROUP - CPU Throttled Percentage"] = (
+                100 * delta("cpu.stat", "throttled_usec") / usec
+            )
+            m["system/CGROUP - Throttled Periods"] = delta("cpu.stat", "nr_throttled")
+
+    if "memory.current" in current:
+        m["system/CGROUP - Memory GB"] = current["memory.current"] / 1e9
+    if current.get("memory.max") is not None:
+        m["system/CGROUP - Memory Limit GB"] = current["memory.max"] / 1e9
+    if "memory.stat" in current:
+        m["system/CGROUP - Anonymous Memory GB"] = (
+            current["memory.stat"].get("anon", 0) / 1e9
+        )
+        m["system/CGROUP - File Memory GB"] = (
+            current["memory.stat"].get("file", 0) / 1e9
+        )
+
+    if "io.stat" in current:
+        m["system/CGROUP - Read MB/s"] = delta("io.stat", "rbytes") / seconds / 1e6
+        m["system/CGROUP - Write MB/s"] = delta("io.stat", "wbytes") / seconds / 1e6
+
+    for resource, label in (("cpu", "CPU"), ("memory", "Memory"), ("io", "IO")):
+        name = f"{resource}.pressure"
+        for kind in current.get(name, {}):
+            m[f"system/CGROUP - {label} Pressure {kind.title()} Percentage"] = (
+                100 * delta(name, kind) / usec
+            )
+    return m
+
+
+class CgroupThread(Listener, Process):
+    """Resource usage, limits and pressure of the workload's cgroup (v2).
+
+    Inside containers and Slurm jobs, `free` and `top` report the whole host. This
+    listener reads the counters of the cgroup the workload runs in: CPU usage and
+    throttling, memory usage and limit, I/O, and the time tasks stalled on CPU, memory
+    and I/O (pressure stall information).
+    """
+
+    listener_name = "cgroup"
+    metrics = (
+        "system/CGROUP - CPU Utilization",
+        "system/CGROUP - CPU Throttled Percentage",
+        "system/CGROUP - Throttled Periods",
+        "system/CGROUP - Memory GB",
+        "system/CGROUP - Memory Limit GB",
+        "system/CGROUP - Anonymous Memory GB",
+        "system/CGROUP - File Memory GB",
+        "system/CGROUP - Read MB/s",
+        "system/CGROUP - Write MB/s",
+        "system/CGROUP - <CPU|Memory|IO> Pressure <Some|Full> Percentage",
+    )
+    interval = CGROUP_INTERVAL
+    cost = 0.001
+    adjustable = True
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
+        super(CgroupThread, self).__init__()
+        self.run_id = run_id
+        self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
+        self.root = os.getpid()
+
+    def run(self):
+        mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
+
+        directory = cgroup_dir(self.root)
+        if directory is None:
+            print("cgroup listener: the workload is not in a cgroup v2 hierarchy")
+            return
+
+        previous, last = read_cgroup(directory), time.monotonic()
+        while True:
+            time.sleep(self.sampling_interval())
+            current, now = read_cgroup(directory), time.monotonic()
+            self._enqueue_metrics(cgroup_metrics(current, previous, now - last))
+            previous, last = current, now
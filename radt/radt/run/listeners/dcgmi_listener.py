@@ -2,10 +2,11 @@ import io
 import mlflow
 import os
 import subprocess
-import time
 
 from multiprocessing import Process
 
+from .base import Listener
+
 
 DCGMI_GROUP_ID = os.getenv("RADT_DCGMI_GROUP")
 
@@ -31,7 +32,12 @@ METRIC_NAMES = [
 ]
 
 
-class DCGMIThread(Process):
+class DCGMIThread(Listener, Process):
+    listener_name = "dcgmi"
+    metrics = tuple(f"system/DCGMI - {metric}" for metric in METRIC_NAMES)
+    interval = 1.0
+    cost = 0.01
+
     def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
         super(DCGMIThread, self).__init__()
         self.run_id = run_id
@@ -84,18 +90,6 @@ class DCGMIThread(Process):
         ]
 
 
-    def _enqueue_metrics(self, metrics, timestamp_ms=None):
-        if self.mlflow_buffer:
-            ts = int(timestamp_ms) if timestamp_ms is not None else int(time.time() * 1000)
-            entries = [{"key": k, "value": v, "timestamp": ts, "step": 0} for k, v in metrics.items()]
-            try:
-                for e in entries:
-                    self.mlflow_buffer.put(e)
-            except Exception:
-                mlflow.log_metrics(metrics)
-        else:
-            mlflow.log_metrics(metrics)
-
     def _start_dcgm(self, idx):
         fields = ",".join(map(str, self.dcgm_fields[idx]))
         self.dcgm = subprocess.Popen(
@@ -1,30 +1,28 @@
 import io
 import mlflow
 import subprocess
-import time
 
 from multiprocessing import Process
 
+from .base import Listener
+
+
+class FreeThread(Listener, Process):
+    listener_name = "free"
+    metrics = (
+        "system/Free - Mem <Total|Used|Free|Shared|Buff/Cache|Available> GB",
+        "system/Free - Swap <Total|Used|Free> GB",
+        "system/Free - Total <Total|Used|Free> GB",
+    )
+    interval = 1.0
+    cost = 0.002
 
-class FreeThread(Process):
     def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
         super(FreeThread, self).__init__()
         self.run_id = run_id
         self.experiment_id = experiment_id
         self.mlflow_buffer = mlflow_buffer
 
-    def _enqueue_metrics(self, metrics, timestamp_ms=None):
-        if self.mlflow_buffer:
-            ts = int(timestamp_ms) if timestamp_ms is not None else int(time.time() * 1000)
-            entries = [{"key": k, "value": v, "timestamp": ts, "step": 0} for k, v in metrics.items()]
-            try:
-                for e in entries:
-                    self.mlflow_buffer.put(e)
-            except Exception:
-                mlflow.log_metrics(metrics)
-        else:
-            mlflow.log_metrics(metrics)
-
     def run(self):
         mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
 
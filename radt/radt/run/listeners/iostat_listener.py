@@ -1,30 +1,35 @@
 import mlflow
 import subprocess
 import io
-import time
 
 from multiprocessing import Process
 
+from .base import Listener
+
+
+class IOstatThread(Listener, Process):
+    listener_name = "iostat"
+    metrics = (
+        "system/iostat - <device> - tps",
+        "system/iostat - <device> - MB read/s",
+        "system/iostat - <device> - MB written/s",
+        "system/iostat - <device> - MB read",
+        "system/iostat - <device> - MB written",
+        "system/iostat - Total tps",
+        "system/iostat - Total MB read/s",
+        "system/iostat - Total MB written/s",
+        "system/iostat - Total MB read",
+        "system/iostat - Total MB written",
+    )
+    interval = 1.0
+    cost = 0.005
 
-class IOstatThread(Process):
     def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
         super(IOstatThread, self).__init__()
         self.run_id = run_id
         self.experiment_id = experiment_id
         self.mlflow_buffer = mlflow_buffer
 
-    def _enqueue_metrics(self, metrics, timestamp_ms=None):
-        if self.mlflow_buffer:
-            ts = int(timestamp_ms) if timestamp_ms is not None else int(time.time() * 1000)
-            entries = [{"key": k, "value": v, "timestamp": ts, "step": 0} for k, v in metrics.items()]
-            try:
-                for e in entries:
-                    self.mlflow_buffer.put(e)
-            except Exception:
-                mlflow.log_metrics(metrics)
-        else:
-            mlflow.log_metrics(metrics)
-
     def run(self):
         mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
 
@@ -5,12 +5,20 @@ import subprocess
 
 from multiprocessing import Process
 
+from .base import Listener
 
-class MacmonThread(Process):
-    def __init__(self, run_id, experiment_id=88):
+
+class MacmonThread(Listener, Process):
+    listener_name = "macmon"
+    metrics = ("system/macmon - <field>",)
+    interval = 1.0
+    cost = 0.01
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
         super(MacmonThread, self).__init__()
         self.run_id = run_id
         self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
 
     def run(self):
         mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
@@ -37,4 +45,4 @@ class MacmonThread(Process):
                     else:
                         m[f"system/macmon - {k.replace('_',' ').title()}"] = float(v)
 
-                mlflow.log_metrics(m)
+                self._enqueue_metrics(m)
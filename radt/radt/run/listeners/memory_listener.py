@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from mlflow.tracking import MlflowClient
+
+from . import _procfs
+from .base import Listener
+
+MEMORY_INTERVAL = 1.0
+
+# Frames per allocation traceback, 0 disables tracemalloc
+TRACEMALLOC_FRAMES = int(os.getenv("RADT_TRACEMALLOC", "0"))
+SNAPSHOT_INTERVAL = float(os.getenv("RADT_MEMORY_SNAPSHOT_INTERVAL", "60"))
+SNAPSHOT_TOP = int(os.getenv("RADT_MEMORY_TOP", "20"))
+
+# Maximum fraction of wall time spent on snapshots, longer snapshots are taken less often
+SNAPSHOT_OVERHEAD = float(os.getenv("RADT_MEMORY_OVERHEAD", "0.01"))
+
+
+# Whether this process traces allocations for the memory listener
+_tracing = False
+
+
+def _stop_tracing_in_child():
+    """Stop tracing in forked processes, only the workload process takes snapshots"""
+    global _tracing
+    if _tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _tracing = False
+
+
+# Listener processes and DataLoader workers are forked from the workload, they would
+# pay for tracing allocations that are never looked at
+os.register_at_fork(after_in_child=_stop_tracing_in_child)
+
+
+def uss(smaps: dict):
+    """Unique set size: memory that would be freed if the process exited
+
+    Args:
+        smaps (dict): Parsed smaps_rollup
+
+    Returns:
+        int: Bytes
+    """
+    return smaps.get("Private_Clean", 0) + smaps.get("Private_Dirty", 0)
+
+
+def top_differences(snapshot, previous, n: int):
+    """Allocation sites that grew the most since the previous snapshot
+
+    Args:
+        snapshot (tracemalloc.Snapshot): Current snapshot
+        previous (tracemalloc.Snapshot or None): Previous snapshot
+        n (int): Number of sites
+
+    Returns:
+        list: Sites with their traceback, size and count, and their change
+    """
+    if previous is None:
+        stats = snapshot.statistics("traceback")[:n]
+        differences = [(s.traceback, s.size, s.size, s.count, s.count) for s in stats]
+    else:
+        stats = snapshot.compare_to(previous, "traceback")[:n]
+        differences = [
+            (s.traceback, s.size, s.size_diff, s.count, s.count_diff) for s in stats
+        ]
+
+    return [
+        {
+            "traceback": [f"{frame.filename}:{frame.lineno}" for frame in traceback],
+            "size": size,
+            "size_diff": size_diff,
+            "count": count,
+            "count_diff": count_diff,
+        }
+        for traceback, size, size_diff, count, count_diff in differences
+    ]
+
+
+class MemoryThread(Listener, threading.Thread):
+    """Memory usage of the workload's process tree, with optional allocation tracking.
+
+    Runs as a thread inside the workload. Every second it logs the PSS, USS (private
+    memory) and swap of the process tree and the USS of the workload process itself.
+    With `RADT_TRACEMALLOC=<frames>`, it also traces Python allocations and takes a
+    snapshot every `RADT_MEMORY_SNAPSHOT_INTERVAL` seconds, keeping the allocation
+    sites that grew the most (`RADT_MEMORY_TOP`). Snapshots are spaced further apart
+    when they take more than `RADT_MEMORY_OVERHEAD` of the run's time. The snapshots
+    are uploaded as `radt/memory_snapshots.json` at the end of the run. Only the
+    workload process is traced, tracing stops in processes forked from it.
+    """
+
+    listener_name = "memory"
+    metrics = (
+        "system/MEMORY - PSS GB",
+        "system/MEMORY - USS GB",
+        "system/MEMORY - Swap GB",
+        "system/MEMORY - Workload USS GB",
+        "system/MEMORY - Traced MB",
+        "system/MEMORY - Tracemalloc MB",
+    )
+    interval = MEMORY_INTERVAL
+    cost = 0.005
+    adjustable = True
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
+        super(MemoryThread, self).__init__(daemon=True)
+        self.run_id = run_id
+        self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
+
+        self.root = os.getpid()
+        self.snapshots = []
+        self.snapshot_time = 0.0
+        self._previous = None
+        self._stopped = threading.Event()
+
+    def measure(self):
+        """Memory of the process tree
+
+        Returns:
+            dict: Metrics
+        """
+        pss = unique = swap = 0
+        workload = None
+        for pid in _procfs.process_tree(self.root):
+            smaps = _procfs.read_smaps_rollup(pid)
+            if smaps is None:
+                continue
+            pss += smaps.get("Pss", 0)
+            unique += uss(smaps)
+            swap += smaps.get("Swap", 0)
+            if pid == self.root:
+                workload = uss(smaps)
+
+        m = {
+            "system/MEMORY - PSS GB": pss / 1e9,
+            "system/MEMORY - USS GB": unique / 1e9,
+            "system/MEMORY - Swap GB": swap / 1e9,
+        }
+        if workload is not None:
+            m["system/MEMORY - Workload USS GB"] = workload / 1e9
+        if tracemalloc.is_tracing():
+            m["system/MEMORY - Traced MB"] = tracemalloc.get_traced_memory()[0] / 1e6
+            m["system/MEMORY - Tracemalloc MB"] = (
+                tracemalloc.get_tracemalloc_memory() / 1e6
+            )
+        return m
+
+    def snapshot(self):
+        """Take an allocation snapshot and keep the sites that grew the most"""
+        start = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        self.snapshots.append(
+            {
+                "timestamp": int(time.time() * 1000),
+                "traced": tracemalloc.get_traced_memory()[0],
+                "top": top_differences(snapshot, self._previous, SNAPSHOT_TOP),
+            }
+        )
+        self._previous = snapshot
+        self.snapshot_time += time.perf_counter() - start
+
+    def run(self):
+        started = time.perf_counter()
+        next_snapshot = started + SNAPSHOT_INTERVAL
+        while not self._stopped.wait(self.sampling_interval()):
+            self._enqueue_metrics(self.measure())
+
+            now = time.perf_counter()
+            if tracemalloc.is_tracing() and now >= next_snapshot:
+                self.snapshot()
+                # Respect the overhead cap over the run so far
+                wait = max(
+                    SNAPSHOT_INTERVAL,
+                    self.snapshot_time / SNAPSHOT_OVERHEAD - (now - started),
+                )
+                next_snapshot = time.perf_counter() + wait
+
+    def start(self):
+        global _tracing
+        if TRACEMALLOC_FRAMES and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracing = True
+        super().start()
+
+    def terminate(self):
+        global _tracing
+        self._stopped.set()
+        self.join()
+
+        if not tracemalloc.is_tracing():
+            return
+        try:
+            self.snapshot()
+            tracemalloc.stop()
+            _tracing = False
+            MlflowClient().log_text(
+                self.run_id,
+                json.dumps(
+                    {"frames": TRACEMALLOC_FRAMES, "snapshots": self.snapshots},
+                    separators=(",", ":"),
+                ),
+                "radt/memory_snapshots.json",
+            )
+        except Exception as e:
+            print(f"Memory listener could not upload its snapshots: {e}")
@@ -0,0 +1,221 @@
+import fnmatch
+import os
+import time
+from multiprocessing import Process
+
+import mlflow
+
+from ._procfs import PROC, _listdir, read_file
+from .base import Listener
+
+SYSFS = "/sys"
+NET_INTERVAL = 1.0
+
+# Comma separated glob patterns of the interfaces to log, e.g. "eth*,ib*,mlx5_*"
+NET_INTERFACES = os.getenv("RADT_NET_INTERFACES", "*")
+NET_EXCLUDE = ("lo",)
+
+# /proc/net/dev columns, receive followed by transmit
+_NET_DEV_FIELDS = ("bytes", "packets", "errs", "drop")
+
+# InfiniBand port counters, data is counted in units of 4 bytes
+_IB_COUNTERS = {
+    "port_rcv_data": ("rx", "bytes", 4),
+    "port_xmit_data": ("tx", "bytes", 4),
+    "port_rcv_packets": ("rx", "packets", 1),
+    "port_xmit_packets": ("tx", "packets", 1),
+    "port_rcv_errors": ("rx", "errs", 1),
+    "port_xmit_discards": ("tx", "drop", 1),
+}
+
+
+def interface_filter(patterns: str = NET_INTERFACES):
+    """Build a filter for interface names
+
+    Args:
+        patterns (str, optional): Comma separated glob patterns
+
+    Returns:
+        callable: Whether an interface should be logged, the loopback interface is
+            only logged when named explicitly
+    """
+    patterns = [p.strip() for p in patterns.split(",") if p.strip()]
+
+    def match(name: str):
+        if name in NET_EXCLUDE and name not in patterns:
+            return False
+        return any(fnmatch.fnmatchcase(name, p) for p in patterns)
+
+    return match
+
+
+def parse_net_dev(text: str):
+    """Parse /proc/net/dev
+
+    Args:
+        text (str): File contents
+
+    Returns:
+        dict: Per interface, {"rx": {...}, "tx": {...}} with bytes, packets, errs and
+            drop counters
+    """
+    interfaces = {}
+    for line in text.splitlines()[2:]:
+        name, _, values = line.partition(":")
+        values = values.split()
+        if len(values) < 16:
+            continue
+        interfaces[name.strip()] = {
+            "rx": dict(zip(_NET_DEV_FIELDS, map(int, values[0:4]))),
+            "tx": dict(zip(_NET_DEV_FIELDS, map(int, values[8:12]))),
+        }
+    return interfaces
+
+
+def read_infiniband(sysfs: str = SYSFS):
+    """Read the port counters of the InfiniBand (and RoCE) devices
+
+    Args:
+        sysfs (str, optional): Mount point of sysfs
+
+    Returns:
+        dict: Per "<device>:<port>", in the format of parse_net_dev
+    """
+    ports = {}
+    infiniband = f"{sysfs}/class/infiniband"
+    for device in sorted(_listdir(infiniband)):
+        for port in sorted(_listdir(f"{infiniband}/{device}/ports")):
+            counters = f"{infiniband}/{device}/ports/{port}/counters"
+            values = {"rx": {}, "tx": {}}
+            for counter, (direction, field, unit) in _IB_COUNTERS.items():
+                text = read_file(f"{counters}/{counter}")
+                if text is not None and text.strip().isdigit():
+                    values[direction][field] = int(text) * unit
+            if values["rx"] or values["tx"]:
+                ports[f"{device}:{port}"] = values
+    return ports
+
+
+def infiniband_backed(sysfs: str = SYSFS):
+    """Network interfaces on top of an InfiniBand or RoCE device, such as IPoIB
+
+    Args:
+        sysfs (str, optional): Mount point of sysfs
+
+    Returns:
+        dict: Set of InfiniBand devices per interface name
+    """
+    backed = {}
+    for name in _listdir(f"{sysfs}/class/net"):
+        if devices := _listdir(f"{sysfs}/class/net/{name}/device/infiniband"):
+            backed[name] = set(devices)
+    return backed
+
+
+def net_metrics(current: dict, previous: dict, seconds: float, backed=None):
+    """Throughput of every interface from two consecutive readings
+
+    Traffic of interfaces backed by an InfiniBand device is also counted by the
+    device's ports, these interfaces are left out of the totals when the ports are
+    read as well.
+
+    Args:
+        current (dict): Current counters per interface
+        previous (dict): Previous counters per interface
+        seconds (float): Time between the readings
+        backed (dict, optional): InfiniBand devices per interface, as returned by
+            `infiniband_backed`
+
+    Returns:
+        dict: Metrics
+    """
+    m = {}
+    totals = {"rx": 0.0, "tx": 0.0}
+    ports = {name.partition(":")[0] for name in current if ":" in name}
+    for name, counters in current.items():
+        if name not in previous:
+            continue
+        counted = not (backed or {}).get(name, set()) & ports
+        for direction, label in (("rx", "RX"), ("tx", "TX")):
+
+            # Counters restart when a driver is reloaded
+            def delta(field):
+                now = counters[direction].get(field, 0)
+                return max(now - previous[name][direction].get(field, 0), 0)
+
+            if "bytes" in counters[direction]:
+                throughput = delta("bytes") / seconds / 1e6
+                if counted:
+                    totals[direction] += throughput
+                m[f"system/NET - {name} {label} MB/s"] = throughput
+            if "packets" in counters[direction]:
+                m[f"system/NET - {name} {label} Packets/s"] = delta("packets") / seconds
+            if "errs" in counters[direction]:
+                m[f"system/NET - {name} {label} Errors"] = delta("errs")
+            if "drop" in counters[direction]:
+                m[f"system/NET - {name} {label} Drops"] = delta("drop")
+
+    if m:
+        m["system/NET - Total RX MB/s"] = totals["rx"]
+        m["system/NET - Total TX MB/s"] = totals["tx"]
+    return m
+
+
+class NetThread(Listener, Process):
+    """Network throughput of the host, per interface.
+
+    Reads /proc/net/dev and the port counters of InfiniBand devices every second and
+    logs the received and transmitted MB/s, packets/s, errors and drops of every
+    interface that matches `RADT_NET_INTERFACES` (comma separated glob patterns, all
+    interfaces but loopback by default). InfiniBand ports are named
+    `<device>:<port>`, e.g. `mlx5_0:1`. Traffic that bypasses the kernel (RDMA) only
+    shows up in the InfiniBand counters, the totals count the traffic of IPoIB and
+    RoCE interfaces through their InfiniBand ports only.
+    """
+
+    listener_name = "net"
+    metrics = (
+        "system/NET - <interface> <RX|TX> MB/s",
+        "system/NET - <interface> <RX|TX> Packets/s",
+        "system/NET - <interface> <RX|TX> Errors",
+        "system/NET - <interface> <RX|TX> Drops",
+        "system/NET - Total RX MB/s",
+        "system/NET - Total TX MB/s",
+    )
+    interval = NET_INTERVAL
+    cost = 0.001
+    adjustable = True
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
+        super(NetThread, self).__init__()
+        self.run_id = run_id
+        self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
+
+    def read(self, match):
+        """Read the counters of the selected interfaces
+
+        Args:
+            match (callable): Interface filter
+
+        Returns:
+            dict: Counters per interface
+        """
+        interfaces = parse_net_dev(read_file(f"{PROC}/net/dev") or "")
+        interfaces.update(read_infiniband())
+        return {name: counters for name, counters in interfaces.items() if match(name)}
+
+    def run(self):
+        mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
+
+        match = interface_filter()
+        backed = infiniband_backed()
+        previous, last = self.read(match), time.monotonic()
+        if not previous:
+            print(f"Net listener: no interfaces match '{NET_INTERFACES}'")
+
+        while True:
+            time.sleep(self.sampling_interval())
+            current, now = self.read(match), time.monotonic()
+            self._enqueue_metrics(net_metrics(current, previous, now - last, backed))
+            previous, last = current, now
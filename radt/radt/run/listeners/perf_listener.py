@@ -0,0 +1,234 @@
+import io
+import os
+import subprocess
+from multiprocessing import Process
+
+import mlflow
+
+from . import _procfs
+from .base import Listener
+
+PERF_INTERVAL_MS = 1000
+PERF_EVENTS = (
+    "cycles",
+    "instructions",
+    "cache-references",
+    "cache-misses",
+    "branches",
+    "branch-misses",
+)
+
+PARANOID = "/proc/sys/kernel/perf_event_paranoid"
+
+
+def event_modifier(paranoid: str = PARANOID):
+    """Event modifier allowed by perf_event_paranoid for an unprivileged user
+
+    Args:
+        paranoid (str, optional): Path of perf_event_paranoid
+
+    Returns:
+        str or None: "" to count user and kernel space, ":u" to count user space
+            only, None if unprivileged users may not use perf events at all
+    """
+    if os.geteuid() == 0:
+        return ""
+    text = _procfs.read_file(paranoid)
+    level = int(text) if text and text.strip().lstrip("-").isdigit() else 2
+    if level >= 3:
+        return None
+    return ":u" if level == 2 else ""
+
+
+def parse_line(line: str):
+    """Parse a line of `perf stat -I -x, --no-scale`
+
+    Args:
+        line (str): e.g. "1.001,123456,,cycles:u,1000231,50.00,,"
+
+    Returns:
+        tuple or None: Interval timestamp, event without modifiers, raw count (None
+            if the counter was not counted or is not supported) and the percentage of
+            the interval the counter was running. None for lines that are not counts.
+    """
+    fields = line.strip().split(",")
+    if len(fields) < 6 or line.startswith("#"):
+        return None
+    timestamp, value, _, event, _, running = fields[:6]
+    try:
+        timestamp = float(timestamp)
+    except ValueError:
+        return None
+    try:
+        return timestamp, event.split(":")[0], float(value), float(running or 0)
+    except ValueError:
+        return timestamp, event.split(":")[0], None, 0.0
+
+
+def scale(value: float, running: float):
+    """Estimate the count over the whole interval from the time it was running
+
+    Args:
+        value (float or None): Raw count
+        running (float): Percentage of the interval the counter was scheduled
+
+    Returns:
+        float or None: Estimated count, None if the counter never ran
+    """
+    if value is None or running <= 0:
+        return None
+    return value * 100 / running
+
+
+def derived_metrics(counts: dict, seconds: float):
+    """Ratios of one interval
+
+    Args:
+        counts (dict): Multiplexing-corrected count per event
+        seconds (float): Length of the interval
+
+    Returns:
+        dict: Metrics
+    """
+    m = {}
+
+    def ratio(key, numerator, denominator, factor=1):
+        if counts.get(numerator) is not None and counts.get(denominator):
+            m[key] = factor * counts[numerator] / counts[denominator]
+
+    ratio("system/PERF - IPC", "instructions", "cycles")
+    ratio(
+        "system/PERF - Cache Miss Percentage", "cache-misses", "cache-references", 100
+    )
+    ratio("system/PERF - Cache MPKI", "cache-misses", "instructions", 1000)
+    ratio("system/PERF - Branch Miss Percentage", "branch-misses", "branches", 100)
+    if counts.get("instructions") is not None:
+        m["system/PERF - GIPS"] = counts["instructions"] / seconds / 1e9
+    if counts.get("cycles") is not None:
+        m["system/PERF - GHz"] = counts["cycles"] / seconds / 1e9
+    return m
+
+
+class PerfThread(Listener, Process):
+    """Hardware performance counters of the workload's process tree.
+
+    Runs `perf stat` in counting mode, attached to the processes of the run without
+    radT's own, and logs the instructions per cycle, cache and branch miss rates every
+    second. perf is attached again when processes start or exit, e.g. DataLoader
+    workers. When there are more events than
+    hardware counters, the kernel multiplexes them; counts are scaled by the share of
+    the interval each counter ran, and the lowest share is logged as
+    `system/PERF - Counter Coverage Percentage`. With `perf_event_paranoid` at 2 only
+    user space is counted, at 3 or higher the listener is disabled unless run as root.
+    """
+
+    listener_name = "perf"
+    metrics = (
+        "system/PERF - IPC",
+        "system/PERF - Cache Miss Percentage",
+        "system/PERF - Cache MPKI",
+        "system/PERF - Branch Miss Percentage",
+        "system/PERF - GIPS",
+        "system/PERF - GHz",
+        "system/PERF - Counter Coverage Percentage",
+    )
+    interval = PERF_INTERVAL_MS / 1000
+    cost = 0.005
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
+        super(PerfThread, self).__init__()
+        self.run_id = run_id
+        self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
+        self.root = os.getpid()
+
+    def workload_pids(self):
+        """Processes of the workload's tree, without radT's own processes
+
+        Returns:
+            list: PIDs
+        """
+        helpers = self.helper_pids() | {self.pid}
+        return _procfs.process_tree(self.root, exclude=helpers)
+
+    def command(self, modifier: str, pids: list):
+        return [
+            "perf",
+            "stat",
+            "-I",
+            str(int(self.interval * 1000)),
+            "-x",
+            ",",
+            "--no-scale",
+            "-e",
+            ",".join(f"{event}{modifier}" for event in PERF_EVENTS),
+            "-p",
+            ",".join(map(str, pids)),
+        ]
+
+    def follow(self, perf, pids: set):
+        """Log the counts of a perf process until it ends or the workload's tree changes
+
+        Args:
+            perf (subprocess.Popen): perf stat attached to the workload's processes
+            pids (set): Processes perf is attached to
+
+        Returns:
+            bool: Whether perf has to be attached again
+        """
+        counts, coverage, interval, previous = {}, [], None, 0.0
+        for line in io.TextIOWrapper(perf.stderr, encoding="utf-8"):
+            if (parsed := parse_line(line)) is None:
+                if line.strip() and not line.startswith("#"):
+                    print(f"perf listener: {line.strip()}")  # e.g. permission errors
+                continue
+            timestamp, event, value, running = parsed
+
+            if interval is not None and timestamp != interval:
+                counts, coverage = {}, []
+            interval = timestamp
+
+            counts[event] = scale(value, running)
+            coverage.append(running)
+            if len(counts) == len(PERF_EVENTS):
+                m = derived_metrics(counts, timestamp - previous)
+                if scheduled := [r for r in coverage if r > 0]:
+                    m["system/PERF - Counter Coverage Percentage"] = min(scheduled)
+                self._enqueue_metrics(m)
+                previous = timestamp
+
+                # Counters inherited by processes started since perf attached only
+                # add up when those exit, so perf is attached to new processes
+                if set(self.workload_pids()) != pids:
+                    return True
+        return False
+
+    def run(self):
+        mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
+
+        modifier = event_modifier()
+        if modifier is None:
+            print(
+                "perf listener: perf_event_paranoid does not allow perf events, "
+                "set it to 2 or lower or run as root"
+            )
+            return
+
+        attach = True
+        while attach and _procfs.read_stat(self.root) is not None:
+            pids = self.workload_pids()
+            try:
+                perf = subprocess.Popen(
+                    self.command(modifier, pids),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                )
+            except FileNotFoundError:
+                print("perf listener: perf is not installed")
+                return
+
+            try:
+                attach = self.follow(perf, set(pids))
+            finally:
+                perf.terminate()
+                perf.wait()
@@ -0,0 +1,113 @@
+import os
+import time
+from multiprocessing import Process
+
+import mlflow
+
+from . import _procfs
+from .base import Listener
+
+PROCTREE_INTERVAL = 1.0
+
+
+class ProcTreeThread(Listener, Process):
+    """Accounts for the resources of the workload's own process tree.
+
+    Follows the workload process and all of its descendants (DataLoader workers,
+    subprocesses, radT's logger and listener processes) from /proc, so collocated runs
+    only report their own usage. CPU and I/O are computed from the deltas of the
+    processes between consecutive samples, usage of processes that exit in between
+    is not counted for that interval.
+    """
+
+    listener_name = "proctree"
+    metrics = (
+        "system/PROCTREE - Processes",
+        "system/PROCTREE - Threads",
+        "system/PROCTREE - CPU Utilization",
+        "system/PROCTREE - RSS GB",
+        "system/PROCTREE - PSS GB",
+        "system/PROCTREE - Read MB/s",
+        "system/PROCTREE - Write MB/s",
+    )
+    interval = PROCTREE_INTERVAL
+    cost = 0.005
+    adjustable = True
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
+        super(ProcTreeThread, self).__init__()
+        self.run_id = run_id
+        self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
+
+        # Listeners are created by the workload process
+        self.root = os.getpid()
+        self.previous = {}
+
+    def sample(self):
+        """Read the current state of every process in the tree
+
+        Returns:
+            dict: Per (PID, start time): CPU seconds, RSS, PSS and I/O bytes
+        """
+        processes = {}
+        for pid in _procfs.process_tree(self.root):
+            if pid == self.pid or (stat := _procfs.read_stat(pid)) is None:
+                continue
+            io = _procfs.read_io(pid) or {}
+            smaps = _procfs.read_smaps_rollup(pid) or {}
+            processes[(pid, stat["starttime"])] = {
+                "cpu": stat["utime"] + stat["stime"],
+                "threads": stat["num_threads"],
+                "rss": smaps.get("Rss", _procfs.read_rss(pid) or 0),
+                "pss": smaps.get("Pss"),
+                "read": io.get("read_bytes", 0),
+                "write": io.get("write_bytes", 0),
+            }
+        return processes
+
+    def measure(self, processes: dict, seconds: float):
+        """Metrics of the tree since the previous sample
+
+        Args:
+            processes (dict): Current sample
+            seconds (float): Time since the previous sample
+
+        Returns:
+            dict: Metrics
+        """
+
+        # Processes are identified by PID and start time, as PIDs may be reused.
+        # Processes that started since the previous sample count from zero.
+        def delta(field):
+            return sum(
+                max(p[field] - self.previous.get(key, {}).get(field, 0), 0)
+                for key, p in processes.items()
+            )
+
+        m = {
+            "system/PROCTREE - Processes": len(processes),
+            "system/PROCTREE - Threads": sum(p["threads"] for p in processes.values()),
+            "system/PROCTREE - CPU Utilization": 100 * delta("cpu") / seconds,
+            "system/PROCTREE - RSS GB": sum(p["rss"] for p in processes.values()) / 1e9,
+            "system/PROCTREE - Read MB/s": delta("read") / seconds / 1e6,
+            "system/PROCTREE - Write MB/s": delta("write") / seconds / 1e6,
+        }
+        if all(p["pss"] is not None for p in processes.values()):
+            m["system/PROCTREE - PSS GB"] = (
+                sum(p["pss"] for p in processes.values()) / 1e9
+            )
+        return m
+
+    def run(self):
+        mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
+
+        last = time.monotonic()
+        self.previous = self.sample()
+        while _procfs.read_stat(self.root) is not None:
+            time.sleep(self.sampling_interval())
+
+            processes = self.sample()
+            now = time.monotonic()
+            self._enqueue_metrics(self.measure(processes, now - last))
+            self.previous, last = processes, now
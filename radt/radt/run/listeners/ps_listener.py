@@ -1,58 +1,135 @@
-import mlflow
 import os
-import subprocess
+import re
 import time
-
 from multiprocessing import Process
 
+import mlflow
+
+from . import _procfs
+from .base import Listener
+
+PS_INTERVAL = 5.0
+
+# Thread groups logged individually, the remaining threads are summed as "other"
+PS_TOP_GROUPS = int(os.getenv("RADT_PS_TOP", "5"))
+
+# Numbering of threads of the same kind, e.g. "NCCL-Proxy 3", "omp_worker_12"
+_THREAD_NUMBER = re.compile(r"[\s_\-:/#.]+\d+$")
+
+# Characters that MLflow does not allow in metric keys
+_INVALID_KEY_CHARACTERS = re.compile(r"[^\w.\- /:]")
+
+
+def thread_group(name: str):
+    """Group name of a thread, its name without trailing numbering and usable in keys
+
+    Args:
+        name (str): Thread name (comm)
+
+    Returns:
+        str: Group name
+    """
+    name = _INVALID_KEY_CHARACTERS.sub("_", name.strip())
+    return _THREAD_NUMBER.sub("", name) or name
+
+
+def top_groups(usage: dict, n: int):
+    """Keep the n groups with the highest usage and sum the rest
+
+    Args:
+        usage (dict): Usage per group
+        n (int): Number of groups to keep
+
+    Returns:
+        dict: Usage of the top groups, plus "other" if any groups were left out
+    """
+    ranked = sorted(usage.items(), key=lambda item: item[1], reverse=True)
+    top = dict(ranked[:n])
+    if len(ranked) > n:
+        top["other"] = sum(value for _, value in ranked[n:])
+    return top
+
+
+class PSThread(Listener, Process):
+    """Per-thread CPU usage of the workload's processes, grouped by thread name.
+
+    Samples /proc/<pid>/task/<tid>/stat for every process in the workload's tree, so
+    no process is spawned per sample. radT's own logger and listener processes are
+    left out. Threads are grouped by name without numbering
+    (pin_memory, NCCL, OpenMP workers, ...), the busiest groups are logged as
+    `system/PS - CPU <group>` in % of one core.
+    """
+
+    listener_name = "ps"
+    metrics = (
+        "system/PS - CPU <group>",
+        "system/PS - CPU Total",
+        "system/PS - Threads",
+    )
+    interval = PS_INTERVAL
+    cost = 0.002
+    adjustable = True
 
-# This listener writes *a lot* of metrics and may affect performance!
-class PSThread(Process):
     def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
         super(PSThread, self).__init__()
         self.run_id = run_id
         self.experiment_id = experiment_id
         self.mlflow_buffer = mlflow_buffer
         self.parent_pid = os.getpid()
+        self.previous = {}
 
-    def _enqueue_metrics(self, metrics, timestamp_ms=None):
-        if self.mlflow_buffer:
-            ts = int(timestamp_ms) if timestamp_ms is not None else int(time.time() * 1000)
-            entries = [{"key": k, "value": v, "timestamp": ts, "step": 0} for k, v in metrics.items()]
-            try:
-                for e in entries:
-                    self.mlflow_buffer.put(e)
-            except Exception:
-                # fallback
-                for k, v in metrics.items():
-                    mlflow.log_metric(k, float(v))
-        else:
-            for k, v in metrics.items():
-                mlflow.log_metric(k, float(v))
+    def sample(self):
+        """Read the CPU time of every thread in the workload's process tree
 
-    def run(self):
-        mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
+        Returns:
+            dict: (group, CPU seconds) per (PID, TID, start time)
+        """
+        threads = {}
+        helpers = self.helper_pids() | {self.pid}
+        for pid in _procfs.process_tree(self.parent_pid, exclude=helpers):
+            for tid in _procfs.tasks(pid):
+                if stat := _procfs.read_task_stat(pid, tid):
+                    threads[(pid, tid, stat["starttime"])] = (
+                        thread_group(stat["comm"]),
+                        stat["utime"] + stat["stime"],
+                    )
+        return threads
+
+    def measure(self, threads: dict, seconds: float):
+        """CPU usage per thread group since the previous sample
+
+        Args:
+            threads (dict): Current sample
+            seconds (float): Time since the previous sample
 
-        while True:
-            output = (
-                subprocess.run(
-                    f"ps -p {self.parent_pid} -L -o pid,tid,psr,pcpu,%mem".split(),
-                    capture_output=True,
-                )
-                .stdout.decode()
-                .splitlines()
+        Returns:
+            dict: Metrics
+        """
+        usage = {}
+        for key, (group, cpu) in threads.items():
+            # Threads that started since the previous sample count from zero
+            before = self.previous.get(key, (group, 0.0))[1]
+            usage[group] = (
+                usage.get(group, 0.0) + max(cpu - before, 0.0) * 100 / seconds
             )
 
-            for line in output[1:]:
-                line = line.strip().split(" ")
-                line = [x for x in line if x.strip() != ""]
+        m = {
+            f"system/PS - CPU {group}": value
+            for group, value in top_groups(usage, PS_TOP_GROUPS).items()
+        }
+        m["system/PS - CPU Total"] = sum(usage.values())
+        m["system/PS - Threads"] = len(threads)
+        return m
+
+    def run(self):
+        mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
 
-                pid = line[0]
-                tid = line[1]
-                psr = line[2]
-                cpu = line[3]
-                mem = line[4]
+        last = time.monotonic()
+        self.previous = self.sample()
+        while _procfs.read_stat(self.parent_pid) is not None:
+            time.sleep(self.sampling_interval())
 
-                m = {f"system/PS - CPU {psr}": float(cpu), f"system/PS - MEM {psr}": float(mem)}
-                self._enqueue_metrics(m)
-            time.sleep(5)
+            threads = self.sample()
+            now = time.monotonic()
+            self._enqueue_metrics(self.measure(threads, now - last))
+            self.previous, last = threads, now
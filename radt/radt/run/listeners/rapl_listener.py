@@ -0,0 +1,228 @@
+import re
+import time
+from multiprocessing import Process
+
+import mlflow
+
+from ._procfs import _listdir, read_file
+from .base import Listener
+
+SYSFS = "/sys"
+RAPL_INTERVAL = 1.0
+
+_RAPL_DOMAIN = re.compile(r"^intel-rapl:\d+(:\d+)?$")
+_CPU = re.compile(r"^cpu\d+$")
+
+
+def _read_int(path: str):
+    text = read_file(path)
+    try:
+        return int(text) if text is not None else None
+    except ValueError:
+        return None
+
+
+def rapl_domains(sysfs: str = SYSFS):
+    """Find the RAPL energy counters
+
+    Args:
+        sysfs (str, optional): Mount point of sysfs
+
+    Returns:
+        dict: Per domain label (e.g. "package-0", "package-0 dram"): the directory of
+            the counter and its range in microjoules
+    """
+    powercap = f"{sysfs}/class/powercap"
+    directories = [d for d in sorted(_listdir(powercap)) if _RAPL_DOMAIN.match(d)]
+    names = {d: (read_file(f"{powercap}/{d}/name") or d).strip() for d in directories}
+
+    domains = {}
+    for d in directories:
+        # Subdomains (intel-rapl:0:1) are labelled with their package
+        parent = d.rsplit(":", 1)[0]
+        label = f"{names[parent]} {names[d]}" if parent in names else names[d]
+        domains[label] = {
+            "path": f"{powercap}/{d}",
+            "range": _read_int(f"{powercap}/{d}/max_energy_range_uj") or 0,
+        }
+    return domains
+
+
+def energy_delta(current: int, previous: int, energy_range: int):
+    """Energy between two readings of a counter that wraps around
+
+    Args:
+        current (int): Current reading in microjoules
+        previous (int): Previous reading in microjoules
+        energy_range (int): Value at which the counter wraps around to zero
+
+    Returns:
+        int: Microjoules
+    """
+    delta = current - previous
+    if delta < 0 and energy_range:
+        delta += energy_range + 1
+    return max(delta, 0)
+
+
+def read_frequencies(sysfs: str = SYSFS):
+    """Current and maximum frequency of every CPU
+
+    Args:
+        sysfs (str, optional): Mount point of sysfs
+
+    Returns:
+        list: (current, maximum) in kHz per CPU that has cpufreq
+    """
+    frequencies = []
+    cpus = f"{sysfs}/devices/system/cpu"
+    for cpu in filter(_CPU.match, sorted(_listdir(cpus))):
+        current = _read_int(f"{cpus}/{cpu}/cpufreq/scaling_cur_freq")
+        maximum = _read_int(f"{cpus}/{cpu}/cpufreq/cpuinfo_max_freq")
+        if current is not None and maximum:
+            frequencies.append((current, maximum))
+    return frequencies
+
+
+def read_throttle_count(sysfs: str = SYSFS):
+    """Number of thermal throttling events of all CPUs and packages since boot
+
+    Args:
+        sysfs (str, optional): Mount point of sysfs
+
+    Returns:
+        int or None: Events, None if the counters are not available
+    """
+    counts = []
+    cpus = f"{sysfs}/devices/system/cpu"
+    for cpu in filter(_CPU.match, sorted(_listdir(cpus))):
+        for counter in ("core_throttle_count", "package_throttle_count"):
+            value = _read_int(f"{cpus}/{cpu}/thermal_throttle/{counter}")
+            if value is not None:
+                counts.append(value)
+    return sum(counts) if counts else None
+
+
+def read_temperatures(sysfs: str = SYSFS):
+    """Highest temperature per thermal zone type
+
+    Args:
+        sysfs (str, optional): Mount point of sysfs
+
+    Returns:
+        dict: Degrees Celsius per type, e.g. x86_pkg_temp
+    """
+    temperatures = {}
+    thermal = f"{sysfs}/class/thermal"
+    for zone in sorted(_listdir(thermal)):
+        if not zone.startswith("thermal_zone"):
+            continue
+        temperature = _read_int(f"{thermal}/{zone}/temp")
+        kind = (read_file(f"{thermal}/{zone}/type") or zone).strip()
+        if temperature is not None:
+            temperatures[kind] = max(
+                temperatures.get(kind, -273.15), temperature / 1000
+            )
+    return temperatures
+
+
+class RAPLThread(Listener, Process):
+    """CPU energy (RAPL), frequency and temperature of the host.
+
+    Logs the power (W) and cumulative energy (J) of every RAPL domain (packages,
+    cores, DRAM), the CPU frequency relative to its maximum, thermal throttling
+    events and thermal zone temperatures. RAPL counters are often only readable by
+    root; unreadable domains are skipped.
+    """
+
+    listener_name = "rapl"
+    metrics = (
+        "system/RAPL - <domain> Power W",
+        "system/RAPL - <domain> Energy J",
+        "system/RAPL - CPU Frequency GHz",
+        "system/RAPL - CPU Frequency Ratio",
+        "system/RAPL - Thermal Throttle Events",
+        "system/RAPL - Temperature <zone> C",
+    )
+    interval = RAPL_INTERVAL
+    cost = 0.001
+    adjustable = True
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88, sysfs=SYSFS):
+        super(RAPLThread, self).__init__()
+        self.run_id = run_id
+        self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
+        self.sysfs = sysfs
+
+        self.domains = {}
+        self.joules = {}
+        self.previous = {}
+
+    def read(self):
+        """Read all counters
+
+        Returns:
+            dict: Energy per RAPL domain (µJ) and the thermal throttling count
+        """
+        energy = {
+            label: value
+            for label, domain in self.domains.items()
+            if (value := _read_int(f"{domain['path']}/energy_uj")) is not None
+        }
+        return {"energy": energy, "throttle": read_throttle_count(self.sysfs)}
+
+    def measure(self, current: dict, seconds: float):
+        """Metrics since the previous reading
+
+        Args:
+            current (dict): Current counters
+            seconds (float): Time since the previous reading
+
+        Returns:
+            dict: Metrics
+        """
+        m = {}
+        for label, value in current["energy"].items():
+            if label not in self.previous.get("energy", {}):
+                continue
+            delta = energy_delta(
+                value, self.previous["energy"][label], self.domains[label]["range"]
+            )
+            self.joules[label] = self.joules.get(label, 0.0) + delta / 1e6
+            m[f"system/RAPL - {label} Power W"] = delta / 1e6 / seconds
+            m[f"system/RAPL - {label} Energy J"] = self.joules[label]
+
+        if frequencies := read_frequencies(self.sysfs):
+            m["system/RAPL - CPU Frequency GHz"] = (
+                sum(c for c, _ in frequencies) / len(frequencies) / 1e6
+            )
+            m["system/RAPL - CPU Frequency Ratio"] = sum(
+                c / maximum for c, maximum in frequencies
+            ) / len(frequencies)
+
+        if (
+            current["throttle"] is not None
+            and self.previous.get("throttle") is not None
+        ):
+            m["system/RAPL - Thermal Throttle Events"] = max(
+                current["throttle"] - self.previous["throttle"], 0
+            )
+
+        for kind, temperature in read_temperatures(self.sysfs).items():
+            m[f"system/RAPL - Temperature {kind} C"] = temperature
+        return m
+
+    def run(self):
+        mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
+
+        self.domains = rapl_domains(self.sysfs)
+        self.previous, last = self.read(), time.monotonic()
+        if self.domains and not self.previous["energy"]:
+            print("RAPL listener: energy counters are not readable, run as root")
+
+        while True:
+            time.sleep(self.sampling_interval())
+            current, now = self.read(), time.monotonic()
+            self._enqueue_metrics(self.measure(current, now - last))
+            self.previous, last = current, now
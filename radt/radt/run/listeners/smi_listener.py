@@ -1,40 +1,34 @@
 import io
 import mlflow
 import subprocess
-import time
 
 from datetime import datetime
 from multiprocessing import Process
 
 import os
 
+from .base import Listener
+
+
+class SMIThread(Listener, Process):
+    listener_name = "smi"
+    metrics = (
+        "system/SMI - Power Draw",
+        "system/SMI - Timestamp",
+        "system/SMI - GPU Util",
+        "system/SMI - Mem Util",
+        "system/SMI - Mem Used",
+        "system/SMI - Performance State",
+    )
+    interval = 1.0
+    cost = 0.01
 
-class SMIThread(Process):
     def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
         super(SMIThread, self).__init__()
         self.run_id = run_id
         self.experiment_id = experiment_id
         self.mlflow_buffer = mlflow_buffer
 
-    def _enqueue_metrics(self, metrics, timestamp_ms=None):
-        if self.mlflow_buffer:
-            ts = (
-                int(timestamp_ms)
-                if timestamp_ms is not None
-                else int(time.time() * 1000)
-            )
-            entries = [
-                {"key": k, "value": v, "timestamp": ts, "step": 0}
-                for k, v in metrics.items()
-            ]
-            try:
-                for e in entries:
-                    self.mlflow_buffer.put(e)
-            except Exception:
-                mlflow.log_metrics(metrics)
-        else:
-            mlflow.log_metrics(metrics)
-
     def run(self):
         mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
 
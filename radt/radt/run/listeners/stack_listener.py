@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+import threading
+from collections import Counter
+
+from mlflow.tracking import MlflowClient
+
+from .base import Listener
+
+# Seconds between samples, 100 Hz by default like py-spy
+STACK_INTERVAL = float(os.getenv("RADT_STACK_INTERVAL", "0.01"))
+
+
+class StackThread(Listener, threading.Thread):
+    """Samples the Python stacks of all threads of the workload process.
+
+    Runs as a thread inside the workload, reading `sys._current_frames()`. Stacks are
+    aggregated in memory and uploaded at the end of the run as folded stacks
+    (`radt/stacks.folded`, for flamegraph.pl) and a speedscope profile
+    (`radt/profile.speedscope.json`, open at https://www.speedscope.app).
+    """
+
+    listener_name = "stack"
+    metrics = ()
+    interval = STACK_INTERVAL
+    cost = 0.02
+    adjustable = True
+
+    def __init__(self, run_id, mlflow_buffer=None, experiment_id=88):
+        super(StackThread, self).__init__(daemon=True)
+        self.run_id = run_id
+        self.experiment_id = experiment_id
+        self.mlflow_buffer = mlflow_buffer
+
+        self.stacks = Counter()
+        self.seconds = Counter()
+        self._frames = {}
+        self._stopped = threading.Event()
+
+    def _frame(self, code):
+        # Frames are identified by function, so samples at different lines aggregate
+        if code not in self._frames:
+            self._frames[code] = (
+                code.co_qualname if hasattr(code, "co_qualname") else code.co_name,
+                code.co_filename,
+                code.co_firstlineno,
+            )
+        return self._frames[code]
+
+    def sample(self, interval: float):
+        """Record the current stack of every other thread
+
+        Args:
+            interval (float): Seconds since the previous sample
+        """
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame(frame.f_code))
+                frame = frame.f_back
+            key = (names.get(ident, str(ident)), tuple(reversed(stack)))
+            self.stacks[key] += 1
+            self.seconds[key] += interval
+
+    def run(self):
+        interval = self.sampling_interval()
+        while not self._stopped.wait(interval):
+            self.sample(interval)
+            interval = self.sampling_interval()
+
+    def folded(self):
+        """Stacks in the folded format, one `thread;root;...;leaf count` line each
+
+        Returns:
+            str: Folded stacks
+        """
+        lines = []
+        for (thread, stack), count in self.stacks.most_common():
+            frames = [
+                f"{name} ({os.path.basename(file)}:{line})"
+                for name, file, line in stack
+            ]
+            lines.append(f"{';'.join([thread, *frames])} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self):
+        """Sampled speedscope profile with one profile per thread
+
+        Returns:
+            dict: Speedscope file contents
+        """
+        frames = {}
+        profiles = {}
+        for (thread, stack), seconds in self.seconds.items():
+            indices = [frames.setdefault(f, len(frames)) for f in stack]
+            profile = profiles.setdefault(thread, {"samples": [], "weights": []})
+            profile["samples"].append(indices)
+            profile["weights"].append(seconds)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"radT run {self.run_id}",
+            "exporter": "radt",
+            "shared": {
+                "frames": [
+                    {"name": name, "file": file, "line": line}
+                    for name, file, line in frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(profile["weights"]),
+                    **profile,
+                }
+                for thread, profile in profiles.items()
+            ],
+        }
+
+    def terminate(self):
+        self._stopped.set()
+        self.join()
+
+        if not self.stacks:
+            return
+        try:
+            client = MlflowClient()
+            client.log_text(self.run_id, self.folded(), "radt/stacks.folded")
+            client.log_text(
+                self.run_id,
+                json.dumps(self.speedscope()),
+                "radt/profile.speedscope.json",
+            )
+        except Exception as e:
+            print(f"Stack listener could not upload its profile: {e}")
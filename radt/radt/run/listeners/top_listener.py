@@ -1,11 +1,22 @@
 import io
 import mlflow
 import subprocess
-import time
 from multiprocessing import Process
 
+from .base import Listener
+
+
+class TOPThread(Listener, Process):
+    listener_name = "top"
+    metrics = (
+        "system/TOP - CPU Utilization",
+        "system/TOP - Memory Utilization",
+        "system/TOP - Memory Usage GB",
+        "system/TOP - Swap Memory GB",
+    )
+    interval = 1.0
+    cost = 0.02
 
-class TOPThread(Process):
     def __init__(
         self,
         run_id,
@@ -23,15 +34,6 @@ class TOPThread(Process):
 
         self.process_names = process_names
 
-    def _enqueue_metrics(self, metrics, timestamp_ms=None):
-        if self.mlflow_buffer:
-            ts = int(timestamp_ms) if timestamp_ms is not None else int(time.time() * 1000)
-            entries = [{"key": k, "value": v, "timestamp": ts, "step": 0} for k, v in metrics.items()]
-            for e in entries:
-                self.mlflow_buffer.put(e)
-        else:
-            mlflow.log_metrics(metrics)
-
     def run(self):
         mlflow.start_run(run_id=self.run_id).__enter__()  # attach to run
 
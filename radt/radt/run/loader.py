@@ -0,0 +1,119 @@
+import time
+
+from .steps import STEP_INTERVAL, STEP_PERCENTILES, StepHistogram
+
+LOADER_PREFIX = "loader"
+
+
+class LoaderStats:
+    """Time spent waiting for batches versus time spent between fetches.
+
+    Waits go into a histogram that is summarised once per interval, together with the
+    input-bound fraction: the share of time the training loop was waiting for input.
+    """
+
+    def __init__(self, buffer, name: str, interval: float = STEP_INTERVAL):
+        self._buffer = buffer
+        self.name = name
+        self._interval = interval
+
+        self.fetches = 0
+        self._histogram = StepHistogram()
+        self._compute = 0.0
+        self._last = None
+        self._started = None
+
+    def fetched(self, start: float, end: float):
+        """Record a fetch
+
+        Args:
+            start (float): perf_counter() time at which the batch was requested
+            end (float): perf_counter() time at which it was returned
+        """
+        if self._started is None:
+            self._started = start
+        if self._last is not None:
+            self._compute += start - self._last
+        self._histogram.add(end - start)
+        self._last = end
+        self.fetches += 1
+
+        if end - self._started >= self._interval:
+            self.emit()
+
+    def exhausted(self):
+        """The iterator ended, time until the next fetch is not part of the loop"""
+        self._last = None
+
+    def emit(self):
+        """Log the metrics of the current interval and start a new one"""
+        histogram = self._histogram
+        if histogram.count:
+            wait = histogram.total
+            values = {
+                "input-bound fraction": (
+                    wait / (wait + self._compute) if wait + self._compute else 0.0
+                ),
+                "wait mean": wait / histogram.count,
+                "wait max": histogram.max,
+            } | {f"wait p{q * 100:g}": histogram.quantile(q) for q in STEP_PERCENTILES}
+
+            timestamp = int(time.time() * 1000)
+            for name, value in values.items():
+                self._buffer.put(
+                    {
+                        "key": f"{LOADER_PREFIX}/{self.name}/{name}",
+                        "value": value,
+                        "timestamp": timestamp,
+                        "step": self.fetches,
+                    }
+                )
+
+        self._histogram = StepHistogram()
+        self._compute = 0.0
+        self._started = None
+
+
+class TimedIterator:
+    """Iterator that records how long every `__next__` of the wrapped iterator blocks"""
+
+    def __init__(self, iterator, stats: LoaderStats):
+        self._iterator = iterator
+        self._stats = stats
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            self._stats.exhausted()
+            raise
+        self._stats.fetched(start, time.perf_counter())
+        return item
+
+
+class TimedLoader:
+    """Iterable (e.g. a DataLoader) whose iterators are timed.
+
+    Other attributes, such as `len()` or `dataset`, are those of the wrapped iterable.
+    """
+
+    def __init__(self, iterable, stats: LoaderStats):
+        self._iterable = iterable
+        self._stats = stats
+
+    def __iter__(self):
+        self._stats.exhausted()
+        return TimedIterator(iter(self._iterable), self._stats)
+
+    def __len__(self):
+        return len(self._iterable)
+
+    def __getattr__(self, name):
+        # Only called for attributes missing here, _iterable is missing while unpickling
+        if name == "_iterable":
+            raise AttributeError(name)
+        return getattr(self._iterable, name)
@@ -0,0 +1,212 @@
+import json
+import os
+from pathlib import Path
+
+METRIC_COLUMNS = ("key", "value", "timestamp", "step")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Offline mode requires pyarrow, install it with `pip install pyarrow`"
+        ) from e
+    return pyarrow
+
+
+def offline_tracking_uri(directory):
+    """Tracking URI of the local MLflow store that holds runs, params, tags and artifacts
+
+    Args:
+        directory (str or Path): Offline directory
+
+    Returns:
+        str: SQLite tracking URI
+    """
+    return f"sqlite:///{(Path(directory).resolve() / 'mlflow.db').as_posix()}"
+
+
+def metrics_path(directory, run_id: str):
+    """Directory holding the Parquet metric partitions of a run
+
+    Args:
+        directory (str or Path): Offline directory
+        run_id (str): Run ID
+
+    Returns:
+        Path: Partition directory
+    """
+    return Path(directory) / "metrics" / f"run_id={run_id}"
+
+
+def experiments_path(directory):
+    """File mapping offline experiment IDs to the experiment IDs on the tracking server
+
+    Args:
+        directory (str or Path): Offline directory
+
+    Returns:
+        Path: JSON file
+    """
+    return Path(directory) / "experiments.json"
+
+
+def offline_experiments(directory):
+    """Experiments of the offline store and the tracking server experiments they belong to
+
+    Args:
+        directory (str or Path): Offline directory
+
+    Returns:
+        dict: Tracking server experiment ID per offline experiment ID
+    """
+    path = experiments_path(directory)
+    return json.loads(path.read_text()) if path.is_file() else {}
+
+
+def prepare_offline(directory, experiment_ids):
+    """Create the offline store and make sure the given experiments have a counterpart in it
+
+    The offline store assigns its own experiment IDs, the mapping back to the IDs
+    on the tracking server is kept in `experiments.json` for `radt sync`.
+
+    Args:
+        directory (str or Path): Offline directory
+        experiment_ids (iterable): Experiment IDs used by the schedule
+
+    Returns:
+        str: Tracking URI of the offline store
+    """
+    # Imported here as the SQL store pulls in sqlalchemy
+    from mlflow.store.tracking.sqlalchemy_store import SqlAlchemyStore
+
+    directory = Path(directory).resolve()
+    (directory / "artifacts").mkdir(parents=True, exist_ok=True)
+    uri = offline_tracking_uri(directory)
+    store = SqlAlchemyStore(uri, (directory / "artifacts").as_uri())
+
+    experiments = offline_experiments(directory)
+    known = set(experiments.values())
+    for experiment_id in sorted({str(e).strip() for e in experiment_ids} - known):
+        name = f"radt-offline-{experiment_id}"
+        experiment = store.get_experiment_by_name(name)
+        offline_id = (
+            experiment.experiment_id
+            if experiment
+            else store.create_experiment(
+                name,
+                artifact_location=(directory / "artifacts" / experiment_id).as_uri(),
+            )
+        )
+        experiments[offline_id] = experiment_id
+
+    path = experiments_path(directory)
+    temp = path.with_suffix(".tmp")
+    temp.write_text(json.dumps(experiments, indent=2))
+    temp.replace(path)
+    return uri
+
+
+def tracking_experiment_id(experiment_id) -> str:
+    """ID of the experiment that runs of the given experiment are tracked in
+
+    In offline mode (`RADT_OFFLINE_DIR` is set) this is the offline experiment
+    created by `prepare_offline`, otherwise the experiment itself.
+
+    Args:
+        experiment_id (str or int): Experiment ID on the tracking server
+
+    Returns:
+        str: Experiment ID to track runs in
+    """
+    experiment_id = str(experiment_id).strip()
+    directory = os.getenv("RADT_OFFLINE_DIR")
+    if not directory:
+        return experiment_id
+
+    for offline_id, server_id in offline_experiments(directory).items():
+        if server_id == experiment_id:
+            return offline_id
+    return experiment_id
+
+
+class ParquetMetricStore:
+    """Metric store that writes batches to Parquet files, partitioned per run.
+
+    Used by the loggers in offline mode (`radt --offline`), where no tracking server
+    is reachable. Every batch becomes a separate file, which `radt sync` uploads later.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._sequence = 0
+
+    def log_batch(self, run_id: str, metrics: list):
+        """Write a batch of metrics
+
+        Args:
+            run_id (str): Run ID
+            metrics (list): Metric dicts with key, value, timestamp and step
+        """
+        if not metrics:
+            return
+
+        pa = _pyarrow()
+        table = pa.table(
+            {
+                "key": pa.array([m["key"] for m in metrics], pa.string()),
+                "value": pa.array([m["value"] for m in metrics], pa.float64()),
+                "timestamp": pa.array([m["timestamp"] for m in metrics], pa.int64()),
+                "step": pa.array([m["step"] for m in metrics], pa.int64()),
+            }
+        )
+
+        path = metrics_path(self.directory, run_id)
+        path.mkdir(parents=True, exist_ok=True)
+        name = f"{os.getpid()}-{self._sequence:06}.parquet"
+        self._sequence += 1
+
+        # Write under a temporary name so readers never see partial files
+        pa.parquet.write_table(table, path / f".{name}")
+        os.replace(path / f".{name}", path / name)
+
+
+def read_metrics(directory, run_id: str):
+    """Read all offline metrics of a run
+
+    Args:
+        directory (str or Path): Offline directory
+        run_id (str): Run ID
+
+    Returns:
+        list: Metric dicts with key, value, timestamp and step
+    """
+    path = metrics_path(directory, run_id)
+    files = sorted(path.glob("*.parquet")) if path.is_dir() else []
+    if not files:
+        return []
+
+    pa = _pyarrow()
+    table = pa.concat_tables([pa.parquet.read_table(f) for f in files])
+    columns = [table.column(c).to_pylist() for c in METRIC_COLUMNS]
+    return [dict(zip(METRIC_COLUMNS, row)) for row in zip(*columns)]
+
+
+def latest_metrics(directory, run_id: str):
+    """Last logged value (highest step, then timestamp) of every offline metric of a run
+
+    Args:
+        directory (str or Path): Offline directory
+        run_id (str): Run ID
+
+    Returns:
+        dict: Value per metric key
+    """
+    latest = {}
+    for m in read_metrics(directory, run_id):
+        order = (m["step"], m["timestamp"])
+        if m["key"] not in latest or order >= latest[m["key"]][0]:
+            latest[m["key"]] = (order, m["value"])
+    return {key: value for key, (_, value) in latest.items()}
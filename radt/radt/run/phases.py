@@ -0,0 +1,265 @@
+import queue
+import time
+from contextlib import ContextDecorator
+
+import numpy as np
+
+from .energy import ENERGY_SOURCES
+from .summary import KeySummary
+
+PHASE_PREFIX = "phase"
+NO_PHASE = -1
+
+# Statistics of listener metrics logged per phase
+PHASE_STATISTICS = ("mean", "p95", "max")
+
+# Closed spans are kept this long after the timeline is known, for late samples
+SPAN_RETENTION_MS = 60_000
+
+
+class Phase(ContextDecorator):
+    """Context manager and decorator that records a span of a named phase.
+
+    Without a recorder (radT not present) it does nothing.
+    """
+
+    def __init__(self, recorder, name: str):
+        self._recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        if self._recorder is not None:
+            self._recorder.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        if self._recorder is not None:
+            self._recorder.exit()
+        return False
+
+
+class PhaseRecorder:
+    """Records phase spans of the workload process into preallocated arrays.
+
+    Spans are sent to the listener logger in batches, once the arrays are full or the
+    upload interval has passed. The innermost active phase is also published through
+    a shared value, so samples newer than the last batch can be attributed.
+    Phases are meant to be entered and exited from a single thread.
+    """
+
+    def __init__(self, spans, active, capacity: int = 4096, upload_interval=1.0):
+        self._spans = spans
+        self.active = active
+
+        self._names = {}
+        self._new_names = []
+        self._stack = []
+
+        self._starts = np.empty(capacity, dtype=np.int64)
+        self._ends = np.empty(capacity, dtype=np.int64)
+        self._ids = np.empty(capacity, dtype=np.int32)
+        self._depths = np.empty(capacity, dtype=np.int32)
+        self._count = 0
+
+        self._upload_interval = int(upload_interval * 1e9)
+        self._uploaded = time.time_ns()
+
+    def enter(self, name: str):
+        phase_id = self._names.get(name)
+        if phase_id is None:
+            phase_id = self._names[name] = len(self._names)
+            self._new_names.append(name)
+
+        self._stack.append((phase_id, time.time_ns()))
+        self.active.value = phase_id
+
+        # The logger has to know a phase before it can attribute samples to it
+        if self._new_names:
+            self.upload()
+
+    def exit(self):
+        phase_id, start = self._stack.pop()
+        end = time.time_ns()
+
+        i = self._count
+        self._starts[i] = start
+        self._ends[i] = end
+        self._ids[i] = phase_id
+        self._depths[i] = len(self._stack)
+        self._count = i + 1
+
+        self.active.value = self._stack[-1][0] if self._stack else NO_PHASE
+
+        if (
+            self._count == len(self._starts)
+            or end - self._uploaded > self._upload_interval
+        ):
+            self.upload(end)
+
+    def upload(self, now: int = None):
+        """Send the recorded spans to the logger
+
+        Args:
+            now (int, optional): Time in nanoseconds up to which spans are recorded
+        """
+        now = now or time.time_ns()
+        n = self._count
+        self._spans.put(
+            {
+                "names": self._new_names,
+                "starts": self._starts[:n] // 1_000_000,
+                "ends": self._ends[:n] // 1_000_000,
+                "ids": self._ids[:n].copy(),
+                "depths": self._depths[:n].copy(),
+                "open": [
+                    (phase_id, start // 1_000_000, depth)
+                    for depth, (phase_id, start) in enumerate(self._stack)
+                ],
+                "until": now // 1_000_000,
+            }
+        )
+        self._new_names = []
+        self._count = 0
+        self._uploaded = now
+
+    def close(self):
+        """End all open phases and send the remaining spans"""
+        while self._stack:
+            self.exit()
+        self.upload()
+
+
+class PhaseTracker:
+    """Logger tracker that attributes listener samples to the active phase.
+
+    At the end of the run every phase `p` gets `phase/p/time` (seconds, including
+    nested phases) and `phase/p/spans`, the mean, p95 and max of every listener metric
+    `k` while it was the innermost phase as `phase/p/k/mean`, and `phase/p/energy` (J)
+    when power was measured.
+    """
+
+    def __init__(self, spans, active):
+        self._spans = spans
+        self.active = active
+
+        self.names = []
+        self.until = 0
+        self.open = []
+        self.timeline = np.empty((0, 4), dtype=np.int64)
+
+        self.time = {}
+        self.counts = {}
+        self.summaries = {}
+
+    def _receive(self):
+        try:
+            while True:
+                batch = self._spans.get_nowait()
+                self.names.extend(batch["names"])
+
+                spans = np.column_stack(
+                    [batch["starts"], batch["ends"], batch["ids"], batch["depths"]]
+                ).astype(np.int64)
+                self.timeline = np.concatenate([self.timeline, spans])
+                for phase_id, duration in zip(
+                    batch["ids"], batch["ends"] - batch["starts"]
+                ):
+                    self.time[phase_id] = self.time.get(phase_id, 0) + int(duration)
+                    self.counts[phase_id] = self.counts.get(phase_id, 0) + 1
+
+                self.open = batch["open"]
+                self.until = batch["until"]
+        except queue.Empty:
+            pass
+
+        self.timeline = self.timeline[
+            self.timeline[:, 1] >= self.until - SPAN_RETENTION_MS
+        ]
+
+    def phase_at(self, timestamp: int):
+        """Innermost phase at a point in time
+
+        Args:
+            timestamp (int): Timestamp in milliseconds
+
+        Returns:
+            int: Phase ID, NO_PHASE if no phase was active
+        """
+        if timestamp > self.until:
+            return self.active.value
+
+        starts, ends, ids, depths = self.timeline.T
+        inside = np.flatnonzero((starts <= timestamp) & (timestamp < ends))
+        candidates = [(depths[i], starts[i], ids[i]) for i in inside]
+        candidates.extend(
+            (depth, start, phase_id)
+            for phase_id, start, depth in self.open
+            if start <= timestamp
+        )
+        return int(max(candidates)[2]) if candidates else NO_PHASE
+
+    def update(self, metrics: list):
+        """Add logged metrics
+
+        Args:
+            metrics (list): Metric dicts with key, value, timestamp and step
+        """
+        self._receive()
+
+        phases = {}
+        for m in metrics:
+            if m["timestamp"] not in phases:
+                phases[m["timestamp"]] = self.phase_at(m["timestamp"])
+            phase_id = phases[m["timestamp"]]
+            if phase_id == NO_PHASE or phase_id >= len(self.names):
+                continue
+
+            if (phase_id, m["key"]) not in self.summaries:
+                self.summaries[(phase_id, m["key"])] = KeySummary()
+            self.summaries[(phase_id, m["key"])].add(m["value"], m["timestamp"])
+
+    def finish(self, timestamp: int):
+        """Metrics to log at the end of the run
+
+        Args:
+            timestamp (int): Timestamp in milliseconds
+
+        Returns:
+            list: Metric dicts
+        """
+        self._receive()
+
+        values = {}
+        for phase_id, duration in self.time.items():
+            name = self.names[phase_id]
+            values[f"{name}/time"] = duration / 1000
+            values[f"{name}/spans"] = self.counts[phase_id]
+
+            power = next(
+                (
+                    self.summaries[(phase_id, key)]
+                    for key, counter, _ in ENERGY_SOURCES
+                    if not counter and (phase_id, key) in self.summaries
+                ),
+                None,
+            )
+            if power is not None and power.count:
+                values[f"{name}/energy"] = power.total / power.count * duration / 1000
+
+        for (phase_id, key), summary in self.summaries.items():
+            stats = summary.statistics()
+            for statistic in PHASE_STATISTICS:
+                if statistic in stats:
+                    values[f"{self.names[phase_id]}/{key}/{statistic}"] = stats[
+                        statistic
+                    ]
+
+        return [
+            {
+                "key": f"{PHASE_PREFIX}/{key}",
+                "value": float(value),
+                "timestamp": timestamp,
+                "step": 0,
+            }
+            for key, value in values.items()
+        ]
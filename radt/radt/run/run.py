@@ -2,16 +2,19 @@
 
 import os
 import runpy
+import signal
 import sys
 from pathlib import Path
 from time import sleep
 
 import mlflow
+from mlflow.entities import Param
+from mlflow.tracking import MlflowClient
 
 from .benchmark import RADTBenchmark
 
 
-def update_params_listing(command, params):
+def update_params_listing(command, params, **extra):
     # Log the parameters individually so they are filterable in MLFlow
     statements = {}
 
@@ -33,20 +36,32 @@ def update_params_listing(command, params):
     if key != "":
         statements[key.lstrip("-")] = " ".join(value)
 
-    run = mlflow.active_run()
+    # Any data-related argument is also exposed under a common "data" key
+    for k, v in list(statements.items()):
+        if "data" in k.lower():
+            statements.setdefault("data", v)
 
-    # Log parameter
-    for k, v in statements.items():
-        try:
-            mlflow.log_param(k, v)
-        except mlflow.exceptions.MlflowException as e:
-            print("Failed to log parameter:", k, v)
+    statements.update(extra)
 
-        if "data" in k.lower():
+    run_id = mlflow.active_run().info.run_id
+
+    # Log all parameters in a single request, falling back to individual
+    # requests so one rejected parameter does not discard the others
+    try:
+        MlflowClient().log_batch(
+            run_id, params=[Param(k, str(v)) for k, v in statements.items()]
+        )
+    except mlflow.exceptions.MlflowException:
+        for k, v in statements.items():
             try:
-                mlflow.log_param("data", v)
+                mlflow.log_param(k, v)
             except mlflow.exceptions.MlflowException as e:
-                print("Failed to log parameter:", "data", v)
+                print("Failed to log parameter:", k, v)
+
+
+def terminate(signum, frame):
+    """Stop the workload gracefully so the run is closed when radT terminates it"""
+    raise SystemExit(128 + signum)
 
 
 def start_run(args, listeners):
@@ -57,25 +72,32 @@ def start_run(args, listeners):
     os.environ["RADT_RUN_ID"] = RUN_ID
 
     passthrough = args.params
-    update_params_listing(args.command, args.params)
+    update_params_listing(
+        args.command,
+        args.params,
+        manual=os.getenv("RADT_MANUAL_MODE") == "True",
+    )
 
     sys.argv = [sys.argv[0]] + passthrough.split()
 
     # Clear MLproject file so next run may start
-    with open(Path("MLproject")) as file:
+    project_file = Path(os.getenv("RADT_PROJECT_FILE", "MLproject"))
+    with open(project_file) as file:
         mlflow.log_text(file.read() or "Direct mode - no contents", "MLproject")
-    Path("MLproject").unlink()
+    project_file.unlink()
 
     code = "run_path(progname, run_name='__main__')"
     globs = {"run_path": runpy.run_path, "progname": args.command}
 
-    mlflow.log_param("manual", os.getenv("RADT_MANUAL_MODE") == "True")
-
     # Print RUN_ID to initiate lock release
     print(f"RADT active in run with ID '{RUN_ID}'")
 
+    # The scheduler sends SIGTERM to the process group of the run when its time limit
+    # has been reached
+    signal.signal(signal.SIGTERM, terminate)
+
     # Wait for lock
-    while Path("radtlock").is_file():
+    while Path(os.getenv("RADT_LOCK_FILE", "radtlock")).is_file():
         sleep(0.1)
 
     if os.getenv("RADT_MANUAL_MODE") == "True":
@@ -0,0 +1,165 @@
+import math
+
+import sqlalchemy as sa
+
+# NaN is stored as 0 with is_nan set, infinities are clamped, as MLflow does
+_MAX_FLOAT = 1.7976931348623157e308
+
+# Tables of MLflow's SQL schema that radT reads and writes directly
+METRICS_TABLE = sa.table(
+    "metrics",
+    sa.column("key", sa.String),
+    sa.column("value", sa.Float),
+    sa.column("timestamp", sa.BigInteger),
+    sa.column("step", sa.BigInteger),
+    sa.column("is_nan", sa.Boolean),
+    sa.column("run_uuid", sa.String),
+)
+
+LATEST_METRICS_TABLE = sa.table(
+    "latest_metrics",
+    sa.column("key", sa.String),
+    sa.column("value", sa.Float),
+    sa.column("timestamp", sa.BigInteger),
+    sa.column("step", sa.BigInteger),
+    sa.column("is_nan", sa.Boolean),
+    sa.column("run_uuid", sa.String),
+)
+
+
+RUNS_TABLE = sa.table(
+    "runs",
+    sa.column("run_uuid", sa.String),
+    sa.column("experiment_id", sa.Integer),
+    sa.column("status", sa.String),
+    sa.column("start_time", sa.BigInteger),
+    sa.column("end_time", sa.BigInteger),
+)
+
+TAGS_TABLE = sa.table(
+    "tags",
+    sa.column("key", sa.String),
+    sa.column("value", sa.String),
+    sa.column("run_uuid", sa.String),
+)
+
+
+def sanitize_metric_value(value: float):
+    """Convert a metric value to its MLflow SQL representation
+
+    Args:
+        value (float): Metric value
+
+    Returns:
+        bool: Whether the value is NaN
+        float: Value to store
+    """
+    value = float(value)
+    if math.isnan(value):
+        return True, 0.0
+    if math.isinf(value):
+        return False, _MAX_FLOAT if value > 0 else -_MAX_FLOAT
+    return False, value
+
+
+def latest_rows(rows: list):
+    """Reduce metric rows to the most recent row per key
+
+    Recency is decided by (step, timestamp, value), like MLflow's SQL store.
+
+    Args:
+        rows (list): Metric rows
+
+    Returns:
+        list: Most recent row per key
+    """
+    latest = {}
+    for row in rows:
+        order = (row["step"], row["timestamp"], row["value"])
+        if row["key"] not in latest or order > latest[row["key"]][0]:
+            latest[row["key"]] = (order, row)
+    return [row for _, row in latest.values()]
+
+
+class SQLMetricStore:
+    """Metric store that inserts batches straight into the SQL database of an MLflow server.
+
+    Bypasses the REST API for high-volume metrics: a batch becomes one multi-row insert
+    into `metrics` plus one upsert into `latest_metrics`, in a single transaction.
+    The upsert only replaces rows that are older, so concurrent loggers of the same run
+    keep `latest_metrics` consistent. Supports PostgreSQL and SQLite databases.
+    """
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self._engine = None
+
+    @property
+    def engine(self):
+        # Created on first use, as engines must not be shared with forked processes
+        if self._engine is None:
+            self._engine = sa.create_engine(self.uri)
+            if self._engine.dialect.name not in ("postgresql", "sqlite"):
+                raise ValueError(
+                    f"Direct metric writes are not supported for {self._engine.dialect.name} databases"
+                )
+        return self._engine
+
+    def _insert(self):
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert
+
+    def log_batch(self, run_id: str, metrics: list):
+        """Write a batch of metrics
+
+        Args:
+            run_id (str): Run ID
+            metrics (list): Metric dicts with key, value, timestamp and step
+        """
+        if not metrics:
+            return
+
+        rows = []
+        for m in metrics:
+            is_nan, value = sanitize_metric_value(m["value"])
+            rows.append(
+                {
+                    "key": m["key"],
+                    "value": value,
+                    "timestamp": int(m["timestamp"]),
+                    "step": int(m["step"]),
+                    "is_nan": is_nan,
+                    "run_uuid": run_id,
+                }
+            )
+
+        insert = self._insert()
+
+        # Logging the same metric twice is a no-op, like in MLflow
+        metrics_statement = insert(METRICS_TABLE).on_conflict_do_nothing()
+
+        latest = insert(LATEST_METRICS_TABLE)
+        latest_statement = latest.on_conflict_do_update(
+            index_elements=["key", "run_uuid"],
+            set_={
+                "value": latest.excluded.value,
+                "timestamp": latest.excluded.timestamp,
+                "step": latest.excluded.step,
+                "is_nan": latest.excluded.is_nan,
+            },
+            where=sa.tuple_(
+                latest.excluded.step, latest.excluded.timestamp, latest.excluded.value
+            )
+            > sa.tuple_(
+                LATEST_METRICS_TABLE.c.step,
+                LATEST_METRICS_TABLE.c.timestamp,
+                LATEST_METRICS_TABLE.c.value,
+            ),
+        )
+
+        with self.engine.begin() as connection:
+            connection.execute(metrics_statement, rows)
+            connection.execute(latest_statement, latest_rows(rows))
@@ -0,0 +1,175 @@
+import json
+import math
+import time
+
+STEP_PREFIX = "steps"
+
+# Seconds between emitted snapshots
+STEP_INTERVAL = 10.0
+
+# Log-scaled buckets from 10 microseconds to 1000 seconds, 20 per decade (~6% wide)
+MIN_STEP_TIME = 1e-5
+BUCKETS_PER_DECADE = 20
+DECADES = 8
+
+STEP_PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class StepHistogram:
+    """Fixed-size histogram of step times with logarithmic buckets"""
+
+    size = BUCKETS_PER_DECADE * DECADES + 2
+
+    def __init__(self):
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def bucket(seconds: float):
+        """Bucket index of a step time, 0 and the last bucket catch the outliers"""
+        if seconds < MIN_STEP_TIME:
+            return 0
+        i = int(math.log10(seconds / MIN_STEP_TIME) * BUCKETS_PER_DECADE) + 1
+        return min(i, StepHistogram.size - 1)
+
+    @staticmethod
+    def bounds(i: int):
+        """Lower and upper bound of a bucket in seconds"""
+        lower = MIN_STEP_TIME * 10 ** ((i - 1) / BUCKETS_PER_DECADE) if i else 0.0
+        upper = MIN_STEP_TIME * 10 ** (i / BUCKETS_PER_DECADE)
+        return lower, upper if i < StepHistogram.size - 1 else math.inf
+
+    def add(self, seconds: float):
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float):
+        """Estimate a quantile as the geometric middle of its bucket
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Step time in seconds, None if the histogram is empty
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                break
+        lower, upper = self.bounds(i)
+        middle = math.sqrt(lower * upper) if 0 < lower and upper < math.inf else lower
+        return min(max(middle, self.min), self.max)
+
+    def snapshot(self):
+        """Non-empty buckets
+
+        Returns:
+            dict: Count per bucket index
+        """
+        return {i: c for i, c in enumerate(self.counts) if c}
+
+
+class StepTimer:
+    """Measures the time between training steps of the workload.
+
+    Step times go into a histogram that is summarised once per interval as percentile,
+    throughput and straggler metrics, so the cost does not grow with the step rate.
+    The histogram of every interval is kept and logged as an artifact at the end.
+    """
+
+    def __init__(self, buffer, interval: float = STEP_INTERVAL):
+        self._buffer = buffer
+        self._interval = interval
+
+        self.steps = 0
+        self.snapshots = []
+
+        self._histogram = StepHistogram()
+        self._samples = 0.0
+        self._last = None
+        self._started = None
+
+    def step(self, samples=None):
+        now = time.perf_counter()
+        if self._last is None:
+            self._started = now
+        else:
+            self._histogram.add(now - self._last)
+        self._last = now
+
+        self.steps += 1
+        if samples is not None:
+            self._samples += samples
+
+        if now - self._started >= self._interval:
+            self.emit(now)
+
+    def emit(self, now: float = None):
+        """Log the metrics of the current interval and start a new one
+
+        Args:
+            now (float, optional): perf_counter() time of the end of the interval
+        """
+        now = now or time.perf_counter()
+        histogram = self._histogram
+        elapsed = now - self._started if self._started is not None else 0.0
+
+        if histogram.count and elapsed > 0:
+            timestamp = int(time.time() * 1000)
+            values = {
+                f"p{q * 100:g}": histogram.quantile(q) for q in STEP_PERCENTILES
+            } | {
+                "mean": histogram.total / histogram.count,
+                "max": histogram.max,
+                "steps per second": histogram.count / elapsed,
+            }
+            if self._samples:
+                values["samples per second"] = self._samples / elapsed
+
+            for name, value in values.items():
+                self._buffer.put(
+                    {
+                        "key": f"{STEP_PREFIX}/{name}",
+                        "value": value,
+                        "timestamp": timestamp,
+                        "step": self.steps,
+                    }
+                )
+            self.snapshots.append(
+                {
+                    "timestamp": timestamp,
+                    "step": self.steps,
+                    "seconds": elapsed,
+                    "buckets": histogram.snapshot(),
+                }
+            )
+
+        self._histogram = StepHistogram()
+        self._samples = 0.0
+        self._started = now
+
+    def report(self):
+        """Histogram snapshots of all intervals as JSON lines
+
+        Returns:
+            str: One JSON object per interval, preceded by the bucket bounds in seconds
+        """
+        bounds = [StepHistogram.bounds(i) for i in range(StepHistogram.size)]
+        bounds = [
+            [lower, upper if upper < math.inf else None] for lower, upper in bounds
+        ]
+        lines = [json.dumps({"bounds": bounds})]
+        lines.extend(json.dumps(s) for s in self.snapshots)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,166 @@
+import math
+
+SUMMARY_PREFIX = "summary"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """Streaming quantile estimate with bounded relative error (DDSketch).
+
+    Values are counted in logarithmic buckets, so every estimate lies within
+    `relative_accuracy` of a value of the requested rank, with memory that only
+    depends on the range of the values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _index(self, value: float):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int):
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    def add(self, value: float):
+        self.count += 1
+        if value > self.min_value:
+            i = self._index(value)
+            self.positive[i] = self.positive.get(i, 0) + 1
+        elif value < -self.min_value:
+            i = self._index(-value)
+            self.negative[i] = self.negative.get(i, 0) + 1
+        else:
+            self.zeros += 1
+
+    def quantile(self, q: float):
+        """Estimate a quantile
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Estimated value, None if nothing has been added
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for i in sorted(self.negative, reverse=True):
+            seen += self.negative[i]
+            if seen > rank:
+                return -self._value(i)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for i in sorted(self.positive):
+            seen += self.positive[i]
+            if seen > rank:
+                return self._value(i)
+        return self._value(max(self.positive))
+
+
+class KeySummary:
+    """Running statistics of a single metric key"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+        # Time-weighted average: every value holds until the next one is logged
+        self.area = 0.0
+        self.duration = 0
+        self.last = None
+
+    def add(self, value: float, timestamp: int):
+        if math.isnan(value):
+            return
+
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.add(value)
+
+        if self.last is not None and timestamp > self.last[1]:
+            self.area += self.last[0] * (timestamp - self.last[1])
+            self.duration += timestamp - self.last[1]
+        if self.last is None or timestamp >= self.last[1]:
+            self.last = (value, timestamp)
+
+    def statistics(self):
+        """Summary statistics
+
+        Returns:
+            dict: Value per statistic name
+        """
+        if not self.count:
+            return {"count": 0}
+
+        stats = {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+        # Estimates are rounded to bucket values, which may lie just outside the range
+        for q in QUANTILES:
+            stats[f"p{q * 100:g}"] = min(
+                max(self.sketch.quantile(q), self.min), self.max
+            )
+        stats["twa"] = self.area / self.duration if self.duration else self.last[0]
+        return stats
+
+
+class SummaryTracker:
+    """Logger tracker that maintains streaming summaries of every key it sees.
+
+    At the end of the run every key `k` gets `summary/k/count`, `mean`, `min`, `max`,
+    `p50`, `p95`, `p99` and `twa` (time-weighted average) metrics, so runs can be
+    compared through their latest metrics only.
+    """
+
+    def __init__(self):
+        self.summaries = {}
+
+    def update(self, metrics: list):
+        """Add logged metrics
+
+        Args:
+            metrics (list): Metric dicts with key, value, timestamp and step
+        """
+        for m in metrics:
+            if m["key"].startswith(f"{SUMMARY_PREFIX}/"):
+                continue
+            if m["key"] not in self.summaries:
+                self.summaries[m["key"]] = KeySummary()
+            self.summaries[m["key"]].add(m["value"], m["timestamp"])
+
+    def finish(self, timestamp: int):
+        """Metrics to log at the end of the run
+
+        Args:
+            timestamp (int): Timestamp in milliseconds
+
+        Returns:
+            list: Metric dicts
+        """
+        return [
+            {
+                "key": f"{SUMMARY_PREFIX}/{key}/{name}",
+                "value": float(value),
+                "timestamp": timestamp,
+                "step": 0,
+            }
+            for key, summary in self.summaries.items()
+            for name, value in summary.statistics().items()
+        ]
@@ -1 +1,2 @@
 from .schedule import start_schedule
+from .worker import start_worker
@@ -0,0 +1,225 @@
+import heapq
+import math
+from pathlib import Path
+from statistics import median
+
+import pandas as pd
+from mlflow.tracking import MlflowClient
+
+from .. import constants
+
+
+def run_signature(row: pd.Series):
+    """Identify runs that execute the same code with the same arguments
+
+    Args:
+        row (pd.Series): Workload row
+
+    Returns:
+        tuple: Model (file name) and params of the run
+    """
+    params = row["Params"]
+    params = "" if pd.isna(params) else str(params)
+    return Path(str(row["File"])).name, params
+
+
+def time_limit(row: pd.Series):
+    """Time limit of a run
+
+    Args:
+        row (pd.Series): Workload row
+
+    Returns:
+        float: Limit in seconds, infinity without a limit
+    """
+    limit = pd.to_numeric(pd.Series([row.get("TimeLimit")]), errors="coerce")[0]
+    return math.inf if pd.isna(limit) else float(limit)
+
+
+def query_history(experiment_ids: list, models: set, client: MlflowClient = None):
+    """Collect durations of finished runs per signature
+
+    Runs that were stopped by a time or epoch limit did not run to completion and are
+    left out.
+
+    Args:
+        experiment_ids (list): Experiments to search in
+        models (set): Model (file) names to search for
+        client (MlflowClient, optional): Client to query with
+
+    Returns:
+        dict: Durations in seconds per (model, params) signature
+    """
+    client = client or MlflowClient()
+    history = {}
+    for model in models:
+        page_token = None
+        while True:
+            runs = client.search_runs(
+                experiment_ids,
+                filter_string=f"params.model = '{model}' and attributes.status = 'FINISHED'",
+                max_results=1000,
+                page_token=page_token,
+            )
+            for run in runs:
+                if not run.info.end_time or not run.info.start_time:
+                    continue
+                if constants.LIMIT_TAG in run.data.tags:
+                    continue
+                signature = (
+                    run.data.params.get("model"),
+                    run.data.params.get("params", ""),
+                )
+                history.setdefault(signature, []).append(
+                    (run.info.end_time - run.info.start_time) / 1000
+                )
+            page_token = runs.token
+            if not page_token:
+                break
+    return history
+
+
+def predict_durations(workloads: dict, client: MlflowClient = None):
+    """Predict the duration of workloads from previous runs with the same model and params
+
+    Collocated runs of a workload run together, so the workload takes as long as its longest run.
+    Runs with a time limit are predicted to take at most that limit. Epoch limits are
+    not taken into account, such runs are predicted to take as long as complete runs.
+
+    Args:
+        workloads (dict): Rows per unique workload identifier
+        client (MlflowClient, optional): Client to query with
+
+    Returns:
+        dict: Predicted duration in seconds (None if unknown) and number of matching
+            historical runs per workload
+    """
+    if not workloads:
+        return {}
+
+    df = pd.concat(workloads.values())
+    experiment_ids = [str(e).strip() for e in df["Experiment"].unique()]
+    signatures = {run_signature(row) for _, row in df.iterrows()}
+    history = query_history(
+        experiment_ids, {model for model, _ in signatures}, client=client
+    )
+
+    predictions = {}
+    for workload, df_workload in workloads.items():
+        durations, samples = [], 0
+        for _, row in df_workload.iterrows():
+            if past := history.get(run_signature(row)):
+                durations.append(min(median(past), time_limit(row)))
+                samples += len(past)
+            else:
+                durations.append(None)
+
+        if None in durations:
+            predictions[workload] = (None, samples)
+        else:
+            predictions[workload] = (max(durations), samples)
+    return predictions
+
+
+def fill_unknown(predictions: dict):
+    """Estimate workloads without history as the median of all known workloads
+
+    Args:
+        predictions (dict): Predictions as returned by `predict_durations`
+
+    Returns:
+        dict: Duration in seconds per workload
+    """
+    known = [d for d, _ in predictions.values() if d is not None]
+    default = median(known) if known else 0.0
+    return {w: (default if d is None else d) for w, (d, _) in predictions.items()}
+
+
+def simulate(order: list, durations: dict, workers: int = 1):
+    """Assign workloads in order to the first available worker (list scheduling)
+
+    Args:
+        order (list): Workloads in the order they are handed out
+        durations (dict): Duration in seconds per workload
+        workers (int, optional): Number of workloads that run concurrently. Defaults to 1.
+
+    Returns:
+        list: (workload, worker, start, end) per workload
+        float: Predicted makespan in seconds
+    """
+    lanes = [(0.0, i) for i in range(max(1, workers))]
+    timeline = []
+    for workload in order:
+        start, lane = heapq.heappop(lanes)
+        end = start + durations[workload]
+        timeline.append((workload, lane, start, end))
+        heapq.heappush(lanes, (end, lane))
+    return timeline, max([end for _, _, _, end in timeline], default=0.0)
+
+
+def lpt_order(durations: dict):
+    """Order workloads longest processing time (LPT) first
+
+    Handing out the longest workloads first keeps short workloads available to fill
+    the gaps at the end of the schedule, which bounds the makespan to 4/3 of optimal.
+
+    Args:
+        durations (dict): Duration in seconds per workload
+
+    Returns:
+        list: Workloads, longest first
+    """
+    return sorted(durations, key=lambda w: durations[w], reverse=True)
+
+
+def format_duration(seconds: float):
+    """Format seconds as h:mm:ss
+
+    Args:
+        seconds (float): Duration
+
+    Returns:
+        str: Formatted duration
+    """
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+
+def format_plan(predictions: dict, order: list, workers: int = 1, width: int = 40):
+    """Render the predicted schedule and timeline
+
+    Args:
+        predictions (dict): Predictions as returned by `predict_durations`
+        order (list): Workloads in the order they are handed out
+        workers (int, optional): Number of workloads that run concurrently. Defaults to 1.
+        width (int, optional): Width of the timeline bars. Defaults to 40.
+
+    Returns:
+        list: Lines to print
+    """
+    durations = fill_unknown(predictions)
+    timeline, makespan = simulate(order, durations, workers)
+    _, file_makespan = simulate(list(predictions), durations, workers)
+    scale = width / makespan if makespan else 0
+
+    lines = [
+        f"{'Workload':<16} {'Worker':>6} {'Start':>9} {'End':>9} {'History':>7}  Timeline"
+    ]
+    for workload, lane, start, end in timeline:
+        duration, samples = predictions[workload]
+        bar = " " * int(start * scale) + "#" * max(1, int((end - start) * scale))
+        lines.append(
+            f"{str(workload):<16} {lane:>6} {format_duration(start):>9} "
+            f"{format_duration(end):>9} {samples if duration is not None else '-':>7}  |{bar:<{width}}|"
+        )
+
+    unknown = [w for w, (d, _) in predictions.items() if d is None]
+    if unknown:
+        lines.append(
+            f"No history for {len(unknown)} workload(s), assumed {format_duration(durations[unknown[0]])} each"
+        )
+    lines.append(
+        f"Predicted makespan: {format_duration(makespan)} on {workers} worker(s) "
+        f"(file order: {format_duration(file_makespan)})"
+    )
+    return lines
@@ -1,12 +1,13 @@
 import os
 import random
 import shlex
+import signal
 import sys
 import time
+import uuid
 import yaml
 from argparse import Namespace
 from contextlib import ExitStack
-from itertools import product
 from pathlib import Path
 from queue import Empty, Queue
 from string import ascii_uppercase
@@ -19,10 +20,24 @@ import mlflow
 import numpy as np
 import pandas as pd
 
-from mlflow import log_params
+from mlflow.entities import Param, RunTag
 from mlflow.tracking import MlflowClient
 
 from .. import constants
+from ..run.energy import ENERGY_KEY, WORKLOAD_ENERGY_KEY, workload_energy
+from ..run.listeners import available_listeners
+from ..run.offline import latest_metrics, prepare_offline, tracking_experiment_id
+from .search import (
+    SEARCH_METHODS,
+    format_status,
+    grid_params,
+    halving_rungs,
+    hyperband_brackets,
+    parse_status,
+    rank,
+)
+from .planner import fill_unknown, format_plan, lpt_order, predict_durations
+from .workqueue import DONE, WorkloadQueue, parse_devices
 
 
 class ExecutionType(Enum):
@@ -158,6 +173,15 @@ def execute_workload(
     Returns:
         list: Run results to write back to df
     """
+    client = MlflowClient()
+    time_limits = {
+        letter: parse_limit(row.get("TimeLimit"))
+        for _, _, letter, _, _, _, _, _, row in defs
+    }
+    stopped = {}
+    experiment_ids = list(
+        {vars["MLFLOW_EXPERIMENT_ID"] for _, _, _, _, vars, _, _, _, _ in defs}
+    )
     run_ids = {}
 
     terminate = False
@@ -169,10 +193,20 @@ def execute_workload(
 
     start_time = time.time()
 
+    # Handshake files are unique per workload so that workloads sharing a directory
+    # (e.g. from several workers on a shared filesystem) do not interfere.
+    # MLflow requires the project file to be called MLproject.
+    token = uuid.uuid4().hex[:8]
+    lock_name = f"radtlock_{token}"
+    if execution_type == ExecutionType.MLFLOW:
+        project_name = "MLproject"
+    else:
+        project_name = f"MLproject_{token}"
+
     # Remove MLprojects
     for _, _, _, _, _, _, _, filepath, _ in defs:
-        while (Path(filepath) / "MLproject").is_file():
-            (Path(filepath) / "MLproject").unlink()
+        while (Path(filepath) / project_name).is_file():
+            (Path(filepath) / project_name).unlink()
             time.sleep(2)
 
     with ExitStack() as stack:
@@ -189,14 +223,16 @@ def execute_workload(
                 env = os.environ.copy()
                 for k, v in vars.items():
                     env[k] = str(v)
+                env["RADT_LOCK_FILE"] = lock_name
+                env["RADT_PROJECT_FILE"] = project_name
 
                 # Write run blocker
-                with open(Path(filepath) / "radtlock", "w") as lock:
+                with open(Path(filepath) / lock_name, "w") as lock:
                     lock.write("")
 
                 # Write mlflow mlproject
                 # This is used even when not using MLflow managed runs (as a blocker)
-                with open(Path(filepath) / "MLproject", "w") as project_file:
+                with open(Path(filepath) / project_name, "w") as project_file:
                     if execution_type == ExecutionType.MLFLOW:
                         project_file.write(param_def)
                     else:
@@ -211,6 +247,9 @@ def execute_workload(
                         bufsize=1,
                         env=env,
                         universal_newlines=True,
+                        # Own process group, so signals also reach the training
+                        # process when it runs under a wrapper (mlflow run, conda)
+                        start_new_session=True,
                         # shell=True,  # TODO: remove shell
                     )
                 )
@@ -227,26 +266,28 @@ def execute_workload(
                 time.sleep(3)
 
                 # Wait for MLproject to be cleared
-                while (Path(filepath) / "MLproject").is_file() or run_ids[
-                    letter
-                ] == False:
+                while (
+                    (Path(filepath) / project_name).is_file()
+                    or run_ids[letter] == False
+                ) and p.poll() is None:
                     process_output(popens, log_runs, log, run_ids)
                     time.sleep(2)
 
             # Group runs into workload children
             # And add experiment/workload to name
             parent_id = ""
-            for _, _, letter, run_name, _, _, _, filepath, _ in defs:
+            runs = get_runs(client, list(run_ids.values()), experiment_ids)
+            for _, _, letter, run_name, _, _, param_def, _, _ in defs:
                 if run_id := run_ids[letter]:
-                    client = MlflowClient()
-                    if run := client.get_run(run_id):
+                    if run := runs.get(run_id):
+                        params = []
 
                         # MLFlow: params are set, we grab workload name from there
                         if execution_type == ExecutionType.MLFLOW:
                             workload_name = run.data.params["workload"]
                         else:
                             # Direct: set the params in param_def
-                            log_params(param_def, run_id=run_id)
+                            params = [Param(k, str(v)) for k, v in param_def.items()]
                             workload_name = param_def["workload"]
 
                         run_name = (
@@ -254,29 +295,31 @@ def execute_workload(
                             if (str(run_name).strip() not in ("", "nan"))
                             else run.info.run_name
                         )
-                        client.set_tag(
-                            run_id,
-                            "mlflow.runName",
-                            f"({workload_name} {letter}) {run_name}",  # todo: rename this to be less ambigious with the other name
-                        )
+                        tags = [
+                            RunTag(
+                                "mlflow.runName",
+                                f"({workload_name} {letter}) {run_name}",  # todo: rename this to be less ambigious with the other name
+                            )
+                        ]
 
                         if not parent_id:
                             parent_id = run_id
 
                             # If using a group, parents should fall under that
                             if group_run_id:
-                                client.set_tag(
-                                    run_id, "mlflow.parentRunId", group_run_id
-                                )
+                                tags.append(RunTag("mlflow.parentRunId", group_run_id))
 
                         elif parent_id != run_id:
-                            client.set_tag(run_id, "mlflow.parentRunId", parent_id)
+                            tags.append(RunTag("mlflow.parentRunId", parent_id))
+
+                        client.log_batch(run_id, params=params, tags=tags)
 
             # Remove run blockers to start synchronised runs
             for _, _, _, _, _, _, _, filepath, _ in defs:
-                if (Path(filepath) / "radtlock").is_file():
-                    (Path(filepath) / "radtlock").unlink()
+                if (Path(filepath) / lock_name).is_file():
+                    (Path(filepath) / lock_name).unlink()
 
+            run_start_time = time.time()
             while True:
 
                 # Stop once all processes have finished
@@ -288,6 +331,7 @@ def execute_workload(
                     break
 
                 process_output(popens, log_runs, log, run_ids)
+                enforce_time_limits(popens, time_limits, run_start_time, stopped)
                 time.sleep(poll_interval)
 
         except KeyboardInterrupt:
@@ -295,6 +339,10 @@ def execute_workload(
                 sysprint("Interrupting runs... Please wait")
                 terminate = True
 
+                # Runs are not in the terminal's process group
+                for _, _, p, _, _ in popens:
+                    signal_run(p, signal.SIGINT)
+
                 time.sleep(1)
                 for colour, letter, p, q, t in popens:
                     last_update = time.time()
@@ -320,32 +368,42 @@ def execute_workload(
     sysprint("Sending logs to server.")
     results = []
 
+    runs = get_runs(client, list(run_ids.values()), experiment_ids)
+
     for id, _, letter, _, _, _, _, filepath, row in defs:
-        if run_id := run_ids[letter]:
-            client = MlflowClient()
-            if run := client.get_run(run_id):
-                results.append(
-                    (
-                        id,
-                        letter,
-                        returncodes[letter],
-                        run_id,
-                        run.info.run_name,
-                        run.info.status,
-                    )
+        if (run_id := run_ids[letter]) and (run := runs.get(run_id)):
+            status = run.info.status
+            if letter in stopped:
+                status = constants.TIME_LIMIT_STATUS
+                client.set_terminated(run_id, status="KILLED")
+                client.set_tag(run_id, constants.LIMIT_TAG, "time")
+            elif run.data.tags.get(constants.LIMIT_TAG) == "epoch":
+                status = constants.EPOCH_LIMIT_STATUS
+
+            results.append(
+                (
+                    id,
+                    letter,
+                    returncodes[letter],
+                    run_id,
+                    run.info.run_name,
+                    status,
                 )
-                client.log_text(run_id, "".join(log_runs[letter]), f"log_{run_id}.txt")
-                client.log_text(run_id, "".join(log), f"log_workload.txt")
-
-                if row["WorkloadListener"]:
-                    try:
-                        for file in Path(filepath).glob(
-                            f"{row['WorkloadListener'].split('-o ')[1].split()[0]}*.*-rep"
-                        ):
-                            client.log_artifact(run_id, str(file))
-                            file.unlink()
-                    except IndexError:
-                        pass
+            )
+            client.log_text(run_id, "".join(log_runs[letter]), f"log_{run_id}.txt")
+            client.log_text(run_id, "".join(log), f"log_workload.txt")
+
+            if row["WorkloadListener"]:
+                try:
+                    for file in Path(filepath).glob(
+                        f"{row['WorkloadListener'].split('-o ')[1].split()[0]}*.*-rep"
+                    ):
+                        client.log_artifact(run_id, str(file))
+                        file.unlink()
+                except IndexError:
+                    pass
+
+    log_workload_energy(client, defs, run_ids, runs, group_run_id)
 
     if terminate:
         sys.exit()
@@ -353,6 +411,116 @@ def execute_workload(
     return results
 
 
+def log_workload_energy(
+    client: MlflowClient, defs: list, run_ids: dict, runs: dict, group_run_id=None
+):
+    """Log the energy of a workload to its runs and group run
+
+    Args:
+        client (MlflowClient): Client to log with
+        defs (list): Workload definitions
+        run_ids (dict): Run IDs by letter
+        runs (dict): Finished runs by run ID
+        group_run_id (str, optional): Group run of the workload
+    """
+    energies = {}
+    for _, _, letter, _, _, _, _, _, row in defs:
+        run = runs.get(run_ids.get(letter))
+        if run is not None and ENERGY_KEY in run.data.metrics:
+            energies.setdefault(parse_devices(row["Devices"]), []).append(
+                run.data.metrics[ENERGY_KEY]
+            )
+    if not energies:
+        return
+
+    joules = workload_energy(energies)
+    sysprint(f"Workload energy: {joules / 1000:.2f} kJ")
+    for run_id in filter(None, [*run_ids.values(), group_run_id]):
+        try:
+            client.log_metric(run_id, WORKLOAD_ENERGY_KEY, joules)
+        except mlflow.exceptions.MlflowException as e:
+            sysprint(f"Could not log workload energy to {run_id}: {e}")
+
+
+def parse_limit(value):
+    """Parse a time or epoch limit
+
+    Args:
+        value (str, float, or None): Limit as written in the file
+
+    Returns:
+        float or None: Limit, None if there is no limit
+    """
+    if value is None or str(value).strip().lower() in ("", "-", "nan", "none"):
+        return None
+    return float(value)
+
+
+def signal_run(p: Popen, signum: int):
+    """Send a signal to a run and every process it started
+
+    Args:
+        p (Popen): Run, started in its own process group
+        signum (int): Signal to send
+    """
+    if p.poll() is not None:
+        return
+    try:
+        os.killpg(p.pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def enforce_time_limits(
+    popens: list, time_limits: dict, start_time: float, stopped: dict
+):
+    """Terminate runs that exceeded their time limit and kill those that do not stop in time
+
+    Args:
+        popens (list): Running processes
+        time_limits (dict): Time limit in seconds per run letter, None for no limit
+        start_time (float): Time at which the runs were released
+        stopped (dict): Time at which each run was asked to terminate, updated in place
+    """
+    now = time.time()
+    for colour, letter, p, _, _ in popens:
+        if (limit := time_limits.get(letter)) is None or p.poll() is not None:
+            continue
+
+        if letter not in stopped:
+            if now - start_time > limit:
+                print(runformat(colour, letter, f"TIME LIMIT OF {limit}s REACHED"))
+                signal_run(p, signal.SIGTERM)
+                stopped[letter] = now
+        elif now - stopped[letter] > constants.LIMIT_GRACE_PERIOD:
+            print(runformat(colour, letter, "DID NOT TERMINATE IN TIME, KILLING"))
+            signal_run(p, signal.SIGKILL)
+
+
+def get_runs(client: MlflowClient, run_ids: list, experiment_ids: list):
+    """Fetch several runs with a single search request
+
+    Args:
+        client (MlflowClient): Client to query with
+        run_ids (list): IDs of the runs to fetch, falsy entries are ignored
+        experiment_ids (list): Experiments the runs belong to
+
+    Returns:
+        dict: Runs by run ID
+    """
+    run_ids = [run_id for run_id in run_ids if run_id]
+    if not run_ids:
+        return {}
+
+    run_filter = ", ".join(f"'{run_id}'" for run_id in run_ids)
+    runs = client.search_runs(
+        experiment_ids,
+        filter_string=f"attributes.run_id IN ({run_filter})",
+        max_results=len(run_ids),
+    )
+    return {run.info.run_id: run for run in runs}
+
+
 def get_gpu_ids():
     """Get UUIDs of all gpus
 
@@ -469,6 +637,56 @@ def remove_mps():
     execute_command(["echo quit | nvidia-cuda-mps-control"], shell=True)
 
 
+def yaml_row(
+    raw_file_contents: dict, workload: str, params: str, epochs=None, status=""
+):
+    """Make a workload row for a YAML sweep
+
+    Args:
+        raw_file_contents (dict): Sweep definition
+        workload (str): Workload number
+        params (str): Params of the run
+        epochs (float, optional): Epoch limit of the run. Defaults to None.
+        status (str, optional): Status of the row. Defaults to "".
+
+    Returns:
+        dict: Row
+    """
+    return {
+        "Experiment": raw_file_contents["experiment"],
+        "Workload": workload,
+        "Name": raw_file_contents["name"],
+        "Status": status,
+        "Run": "",
+        "Devices": raw_file_contents["devices"],
+        "Collocation": raw_file_contents["collocation"],
+        "Listeners": raw_file_contents["listeners"],
+        "File": raw_file_contents["file"],
+        "Params": params,
+        "TimeLimit": parse_limit(raw_file_contents.get("time_limit")),
+        "EpochLimit": epochs,
+    }
+
+
+def yaml_finished_runs(raw_file_contents: dict):
+    """Collect the finished runs of a YAML sweep
+
+    Args:
+        raw_file_contents (dict): Sweep definition with status
+
+    Returns:
+        dict: Run ID per finished (params, epoch limit)
+    """
+    finished_runs = {}
+    for key, status in raw_file_contents.get("status", {}).items():
+        if (parsed := parse_status(status)) is None:
+            continue
+        state, run_id, params, epochs = parsed
+        if state in ("FINISHED", constants.EPOCH_LIMIT_STATUS):
+            finished_runs[(params, epochs)] = run_id
+    return finished_runs
+
+
 def determine_operating_mode(
     parsed_args: Namespace, file: Path, args_passthrough: list
 ):
@@ -510,6 +728,8 @@ def determine_operating_mode(
                 "Listeners": parsed_args.listeners,
                 "File": str(file),
                 "Params": params,
+                "TimeLimit": parse_limit(parsed_args.time_limit),
+                "EpochLimit": parse_limit(parsed_args.epoch_limit),
             }
         )
 
@@ -551,326 +771,679 @@ def determine_operating_mode(
             "parent", None
         ) or raw_file_contents.get("name", None)
 
-        keys = []
-        values = []
-        for k, v in raw_file_contents["parameters"].items():
-            keys.append(k)
-            values.append(v["values"])
-
-        combinations = product(*values)
-
-        if raw_file_contents["method"] == "random":
-            random.shuffle(combinations)
-
         if "status" not in raw_file_contents or not isinstance(
             raw_file_contents["status"], dict
         ):
             raw_file_contents["status"] = {}
 
-        finished_runs = []
-        max_status = -1
-        for key, status in raw_file_contents.get("status", {}).items():
-            if "FINISHED" in str(status).strip():
-                finished_runs.append(" ".join(status.split()[2:]).strip()[1:-1])
-            max_status = max(max_status, int(key))
+        # Search methods generate their rows per rung in `start_search`
+        if raw_file_contents["method"] in SEARCH_METHODS:
+            return df, raw_file_contents, yaml_group_name
 
-        for i, c in enumerate(combinations):
-            params = " ".join([f"--{k} {v}" for (k, v) in zip(keys, c)])
+        combinations = grid_params(raw_file_contents["parameters"])
 
-            workload = f"{(max_status+i+1):03}"
+        if raw_file_contents["method"] == "random":
+            random.shuffle(combinations)
 
-            new_row = {
-                "Experiment": raw_file_contents["experiment"],
-                "Workload": workload,
-                "Name": raw_file_contents["name"],
-                "Status": ("FINISHED" if params in finished_runs else ""),
-                "Run": "",
-                "Devices": raw_file_contents["devices"],
-                "Collocation": raw_file_contents["collocation"],
-                "Listeners": raw_file_contents["listeners"],
-                "File": raw_file_contents["file"],
-                "Params": params,
-            }
-            df.loc[len(df)] = new_row
+        epochs = parse_limit(raw_file_contents.get("epoch_limit"))
+        finished_runs = yaml_finished_runs(raw_file_contents)
+        max_status = max(map(int, raw_file_contents["status"]), default=-1)
+
+        for i, params in enumerate(combinations):
+            df.loc[len(df)] = yaml_row(
+                raw_file_contents,
+                f"{(max_status+i+1):03}",
+                params,
+                epochs,
+                status=("FINISHED" if (params, epochs) in finished_runs else ""),
+            )
 
     return df, raw_file_contents, yaml_group_name
 
 
-def start_schedule(
+def is_workload_finished(df_workload: pd.DataFrame, rerun: bool = False):
+    """Check whether every run of a workload has been finished already
+
+    Args:
+        df_workload (pd.DataFrame): Workload to check
+        rerun (bool, optional): Whether FAILED runs should be rerun. Defaults to False.
+
+    Returns:
+        bool: Whether the workload can be skipped
+    """
+    for id, row in df_workload.iterrows():
+        # Reruns FAILED and timed out workloads when --rerun is specified
+        status = str(row["Status"]).strip()
+        if not (
+            "FINISHED" in status
+            or constants.EPOCH_LIMIT_STATUS in status
+            or (
+                ("FAILED" in status or constants.TIME_LIMIT_STATUS in status)
+                and (not rerun)
+            )
+        ):
+            return False
+    return True
+
+
+def open_parent_run(group_name: str, experiment_id: str):
+    """Reuse or open the parent run that groups all workloads
+
+    Args:
+        group_name (str): Run ID of an existing parent run or name of a new one
+        experiment_id (str): Experiment to open a new parent run in
+
+    Returns:
+        str: Run ID of the parent run
+    """
+    try:
+        mlflow.get_run(group_name)
+        parent_run_id = group_name
+        c = mlflow.MlflowClient()
+        c.set_terminated(parent_run_id, status="FINISHED")
+        sysprint(f"Using existing parent run {parent_run_id}")
+    except mlflow.exceptions.MlflowException as e:
+        with mlflow.start_run(
+            run_name=group_name,
+            experiment_id=experiment_id,
+        ) as run:
+            sysprint(f"Opening new parent run {run.info.run_id}")
+            parent_run_id = run.info.run_id
+    return parent_run_id
+
+
+def run_workload(
     parsed_args: Namespace,
-    file: Path,
-    args_passthrough: list,
+    workload: str,
+    df_workload: pd.DataFrame,
     group_name: str | None = None,
+    parent_run_id: str | None = None,
 ):
-    """Schedule (execute) a .py or .csv file via RADT
+    """Set up the devices for a single workload and execute it
 
     Args:
         parsed_args (Namespace): Schedule arguments
-        file (Path): Path to file
-        args_passthrough (list): Run arguments
+        workload (str): Unique workload identifier
+        df_workload (pd.DataFrame): Rows of the workload
         group_name (str | None): Group name
+        parent_run_id (str | None): Run ID of the group run
+
+    Returns:
+        list: Run results to write back to the file
     """
-    df, raw_file_contents, yaml_group_name = determine_operating_mode(
-        parsed_args, file, args_passthrough
-    )
+    df_workload = df_workload.copy()
+    df_workload["Letter"] = "-"
+    df_workload["Number"] = -1
+
+    assigned = []
+    for i, row in df_workload.iterrows():
+        if row["Devices"] not in assigned:
+            assigned.append(row["Devices"])
+        letter = row["Devices"]
+        df_workload.loc[i, "Letter"] = letter
+        df_workload.loc[i, "Number"] = ascii_uppercase[
+            (df_workload["Letter"].value_counts()[letter] - 1)
+        ]
 
-    if group_name is None and yaml_group_name is not None:
-        group_name = yaml_group_name
+    letter_quants = df_workload["Letter"].value_counts()
+    for i, row in df_workload.iterrows():
+        if letter_quants[row["Letter"]] > 1:
+            df_workload.loc[i, "Letter"] = f'{row["Letter"]}_{row["Number"]}'
+        if str(row["Collocation"]).strip() not in ("-", "", "nan"):
+            df_workload.loc[i, "Letter"] = (
+                f'{df_workload.loc[i, "Letter"]}_{df_workload.loc[i, "Collocation"]}'
+            )
 
-    df["Workload_Unique"] = (
-        df["Experiment"].astype(str) + "+" + df["Workload"].astype(str)
+    # Set devices string and DCGMI group
+    try:
+        migedit.remove_mig_devices()
+    except FileNotFoundError:
+        # SMI not found, continue
+        pass
+
+    dev_table = df_workload["Devices"].astype(str).str.split("+").apply(frozenset)
+    mig_table, entity_table = dev_table.copy(), dev_table.copy()
+
+    for i, row in df_workload.iterrows():
+        remove_mps()
+
+        if "g" in str(row["Collocation"]):  # TODO: fix
+            result = migedit.make_mig_devices(
+                row["Devices"], [row["Collocation"]], remove_old=False
+            )
+            mig_table.loc[i] = frozenset([y for x in result for y in x[4]])
+            entity_table.loc[i] = frozenset([x[3] for x in result])
+
+    gpu_uuids = get_gpu_ids()
+    for i, v in mig_table.items():
+        s = set()
+        for device in v:
+            device = device.strip()
+            if device in gpu_uuids:
+                device = gpu_uuids[device]
+            s.add(device)
+        mig_table[i] = frozenset(s)
+
+    dcgmi_enabled, dcgmi_table = make_dcgm_groups(entity_table)
+
+    make_mps(df_workload, gpu_uuids)
+
+    workload_definitions = []
+
+    # Check if python or python3 is the correct command -- only when not using conda
+    if parsed_args.useconda:
+        python_command = "python"
+    else:
+        py_check = execute_command(
+            "command -v python || command -v python3", shell=True
+        )
+
+        # if ends on python3, use that
+        if py_check and py_check[-1].strip()[-7:] == "python3":
+            python_command = "python3"
+        else:
+            python_command = "python"
+
+    for i, (id, row) in enumerate(df_workload.iterrows()):
+        row = row.copy()
+        row["Filepath"] = str(Path(row["File"]).parent.absolute())
+        row["File"] = str(Path(row["File"]).name)
+        row["Envmanager"] = "conda" if parsed_args.useconda else "local"
+
+        # Workload Listener
+        listeners = row["Listeners"].split("+")
+        row["WorkloadListener"] = ""
+        listener_env_vars = {
+            f"RADT_LISTENER_{k.upper()}": "False" for k in available_listeners()
+        }
+
+        for listener in listeners:
+            if (k := listener.strip()) in constants.WORKLOAD_LISTENERS:
+                row["WorkloadListener"] = constants.WORKLOAD_LISTENERS[k].format(**row)
+                listeners.remove(listener)
+            else:
+                if k.upper() == "DCGMI" and not dcgmi_enabled:
+                    continue
+                listener_env_vars[f"RADT_LISTENER_{k.upper()}"] = "True"
+
+        listeners = "+".join(listeners)
+
+        # Determine the actual command to run
+        # This differs for CONDA mode (using mlflow wrapping) vs using a direct python command
+        if parsed_args.useconda:
+            # CONDA mode (using mlflow wrapping)
+            command = constants.COMMAND.format(**row).split() + [
+                "-P",
+                f"workload_listener={row['WorkloadListener']}",
+            ]
+            param_def = constants.MLPROJECT_CONTENTS.replace(
+                "<REPLACE_COMMAND>",
+                constants.MLFLOW_COMMAND.format(
+                    WorkloadListener=row["WorkloadListener"],
+                    Listeners=listeners,
+                    File=row["File"],
+                    Params=row["Params"] or '""',
+                    PythonCommand=python_command,
+                ),
+            ).replace(
+                "<REPLACE_ENV>",
+                "conda_env: conda.yaml" if parsed_args.useconda else "",
+            )
+        else:
+            # Direct mode (using direct python command)
+            command = shlex.split(
+                constants.DIRECT_COMMAND.format(
+                    Listeners=listeners,
+                    File=row["File"],
+                    Params=row["Params"] or '""',
+                    PythonCommand=python_command,
+                )
+            )
+            param_def = {
+                "letter": row["Letter"],
+                "workload": row["Workload"],
+                "listeners": listeners,
+                "params": row["Params"] or "",
+                "file": row["File"],
+                "workload_listener": row["WorkloadListener"],
+            }
+
+        workload_definitions.append(
+            (
+                id,
+                constants.COLOURS[i % 6],
+                row["Letter"],
+                row["Name"],
+                {
+                    "MLFLOW_EXPERIMENT_ID": tracking_experiment_id(row["Experiment"]),
+                    "CUDA_VISIBLE_DEVICES": ",".join(map(str, mig_table[id])),
+                    "RADT_DCGMI_GROUP": str(dcgmi_table[id]),
+                    "SMI_GPU_ID": str(row["Devices"]),
+                    "RADT_PRESENT": "True",
+                    "RADT_MANUAL_MODE": "True" if parsed_args.manual else "False",
+                    "PYTHONUNBUFFERED": "1" if not parsed_args.buffered else "",
+                    "RADT_EPOCH_LIMIT": str(parse_limit(row.get("EpochLimit")) or ""),
+                    "RADT_OVERHEAD_BUDGET": (
+                        str(parsed_args.overhead_budget)
+                        if parsed_args.overhead_budget is not None
+                        else ""
+                    ),
+                }
+                | ({"RADT_SQL_URI": parsed_args.sql_uri} if parsed_args.sql_uri else {})
+                | listener_env_vars,
+                command,
+                param_def,
+                row["Filepath"],
+                row,
+            )
+        )
+
+    execution_type = (
+        ExecutionType.MLFLOW if parsed_args.useconda else ExecutionType.DIRECT
     )
 
-    if group_name is not None:
+    # If group name is set, run in that group
+    if parent_run_id is not None:
+        sysprint(
+            f"RUNNING WORKLOAD: {workload} with group run '{group_name}' with ID {parent_run_id} in {execution_type.value} mode"
+        )
+        results = execute_workload(
+            workload_definitions,
+            group_run_id=parent_run_id,
+            execution_type=execution_type,
+            poll_interval=parsed_args.poll_interval,
+        )
         try:
-            mlflow.get_run(group_name)
-            parent_run_id = group_name
             c = mlflow.MlflowClient()
             c.set_terminated(parent_run_id, status="FINISHED")
-            sysprint(f"Using existing parent run {parent_run_id}")
         except mlflow.exceptions.MlflowException as e:
-            with mlflow.start_run(
-                run_name=group_name,
-                experiment_id=str(df.iloc[0]["Experiment"]),
-            ) as run:
-                sysprint(f"Opening new parent run {run.info.run_id}")
-                parent_run_id = run.info.run_id
+            pass
+    else:
+        # Format and run the row
+        sysprint(f"RUNNING WORKLOAD: {workload} in {execution_type.value} mode")
+        results = execute_workload(
+            workload_definitions,
+            execution_type=execution_type,
+            poll_interval=parsed_args.poll_interval,
+        )
 
-    for workload in df["Workload_Unique"].unique():
-        df_workload = df[df["Workload_Unique"] == workload].copy()
+    remove_mps()
 
-        df_workload["Letter"] = "-"
-        df_workload["Number"] = -1
+    return results
 
-        for i, (id, row) in enumerate(df_workload.iterrows()):
-            # Skip workloads that have been finished already
-            # Reruns FAILED workloads when --rerun is specified
-            if not (
-                "FINISHED" in str(row["Status"]).strip()
-                or ("FAILED" in str(row["Status"]).strip() and (not parsed_args.rerun))
-            ):
-                break
-        else:
-            sysprint(f"SKIPPING Workload: {workload}")
-            continue
 
-        assigned = []
-        for i, row in df_workload.iterrows():
-            if row["Devices"] not in assigned:
-                assigned.append(row["Devices"])
-            letter = row["Devices"]
-            df_workload.loc[i, "Letter"] = letter
-            df_workload.loc[i, "Number"] = ascii_uppercase[
-                (df_workload["Letter"].value_counts()[letter] - 1)
-            ]
+def write_results(
+    file: Path,
+    raw_file_contents,
+    df_workload: pd.DataFrame,
+    results: list,
+    parent_run_id: str | None = None,
+):
+    """Write the results of a workload back into the .csv or .yaml file
 
-        letter_quants = df_workload["Letter"].value_counts()
-        for i, row in df_workload.iterrows():
-            if letter_quants[row["Letter"]] > 1:
-                df_workload.loc[i, "Letter"] = f'{row["Letter"]}_{row["Number"]}'
-            if str(row["Collocation"]).strip() not in ("-", "", "nan"):
-                df_workload.loc[i, "Letter"] = (
-                    f'{df_workload.loc[i, "Letter"]}_{df_workload.loc[i, "Collocation"]}'
-                )
+    Args:
+        file (Path): Path to the file
+        raw_file_contents (pd.DataFrame or dict or None): Raw file contents
+        df_workload (pd.DataFrame): Rows of the workload
+        results (list): Run results as returned by `run_workload`
+        parent_run_id (str | None): Run ID of the group run
+    """
+    # Write if .csv
+    if isinstance(raw_file_contents, pd.DataFrame):
+        for id, letter, returncode, run_id, run_name, status in results:
+            raw_file_contents.loc[id, "Run"] = run_id
+            raw_file_contents.loc[id, "Status"] = f"{status} {run_name} ({letter})"
 
-        # Set devices string and DCGMI group
-        try:
-            migedit.remove_mig_devices()
-        except FileNotFoundError:
-            # SMI not found, continue
-            pass
+        # Write the result of the run to the csv
+        target = Path("result.csv")
+        raw_file_contents.to_csv(target, index=False)
+        file.unlink()
+        target.rename(file)
 
-        dev_table = df_workload["Devices"].astype(str).str.split("+").apply(frozenset)
-        mig_table, entity_table = dev_table.copy(), dev_table.copy()
+    # Write if .yaml
+    elif isinstance(raw_file_contents, dict):
+
+        if "status" not in raw_file_contents or not isinstance(
+            raw_file_contents["status"], dict
+        ):
+            raw_file_contents["status"] = {}
 
-        for i, row in df_workload.iterrows():
-            remove_mps()
+        raw_file_contents["parent"] = parent_run_id
 
-            if "g" in str(row["Collocation"]):  # TODO: fix
-                result = migedit.make_mig_devices(
-                    row["Devices"], [row["Collocation"]], remove_old=False
+        for id, letter, returncode, run_id, run_name, status in results:
+            raw_file_contents["status"][int(df_workload.loc[id, "Workload"])] = (
+                format_status(
+                    status,
+                    run_id,
+                    df_workload.loc[id, "Params"],
+                    parse_limit(df_workload.loc[id].get("EpochLimit")),
                 )
-                mig_table.loc[i] = frozenset([y for x in result for y in x[4]])
-                entity_table.loc[i] = frozenset([x[3] for x in result])
+            )
 
-        gpu_uuids = get_gpu_ids()
-        for i, v in mig_table.items():
-            s = set()
-            for device in v:
-                device = device.strip()
-                if device in gpu_uuids:
-                    device = gpu_uuids[device]
-                s.add(device)
-            mig_table[i] = frozenset(s)
+        # Write the result of the run to the yaml file
+        target = Path("result.yaml")
+        with open(target, "w") as f:
+            yaml.dump(raw_file_contents, f, sort_keys=False)
+        file.unlink()
+        target.rename(file)
 
-        dcgmi_enabled, dcgmi_table = make_dcgm_groups(entity_table)
 
-        make_mps(df_workload, gpu_uuids)
+def distribute_workloads(
+    parsed_args: Namespace,
+    workloads: dict,
+    file: Path,
+    raw_file_contents,
+    group_name: str | None = None,
+    parent_run_id: str | None = None,
+):
+    """Publish workloads to a shared queue and record the results reported by `radt worker` agents
 
-        workload_definitions = []
+    Args:
+        parsed_args (Namespace): Schedule arguments
+        workloads (dict): Rows per unique workload identifier
+        file (Path): Path to file
+        raw_file_contents (pd.DataFrame or dict or None): Raw file contents
+        group_name (str | None): Group name
+        parent_run_id (str | None): Run ID of the group run
+    """
+    workqueue = WorkloadQueue(parsed_args.queue)
+    source = str(file.absolute()) if isinstance(file, Path) else "dataframe"
+    options = {
+        "useconda": parsed_args.useconda,
+        "manual": parsed_args.manual,
+        "buffered": parsed_args.buffered,
+        "poll_interval": parsed_args.poll_interval,
+        # The URI holds database credentials, workers read it from their own
+        # RADT_SQL_URI instead of the shared queue
+        "direct_sql": bool(parsed_args.sql_uri),
+        "overhead_budget": parsed_args.overhead_budget,
+    }
+
+    published = {}
+    for workload, df_workload in workloads.items():
+        # Workers may run in another working directory
+        df_published = df_workload.copy()
+        df_published["File"] = df_published["File"].apply(
+            lambda f: str(Path(f).absolute())
+        )
+        devices = frozenset().union(*df_published["Devices"].apply(parse_devices))
 
-        # Check if python or python3 is the correct command -- only when not using conda
-        if parsed_args.useconda:
-            python_command = "python"
-        else:
-            py_check = execute_command(
-                "command -v python || command -v python3", shell=True
-            )
+        name = f"{source}#{workload}"
+        workqueue.publish(
+            name,
+            devices,
+            {
+                "workload": workload,
+                "rows": df_published.to_json(orient="split"),
+                "options": options,
+                "group_name": group_name,
+                "parent_run_id": parent_run_id,
+            },
+        )
+        published[name] = workload
+        sysprint(f"QUEUED WORKLOAD: {workload} on devices {'+'.join(sorted(devices))}")
+
+    sysprint(f"Waiting for workers on queue {parsed_args.queue}")
+    while published:
+        # Claims of workers that died without reporting back
+        for name, worker in workqueue.expire(parsed_args.lease_timeout):
+            if name in published:
+                sysprint(
+                    f"REQUEUED WORKLOAD: {published[name]}, worker {worker} stopped responding"
+                )
 
-            # if ends on python3, use that
-            if py_check and py_check[-1].strip()[-7:] == "python3":
-                python_command = "python3"
-            else:
-                python_command = "python"
-
-        for i, (id, row) in enumerate(df_workload.iterrows()):
-            row = row.copy()
-            row["Filepath"] = str(Path(row["File"]).parent.absolute())
-            row["File"] = str(Path(row["File"]).name)
-            row["Envmanager"] = "conda" if parsed_args.useconda else "local"
-
-            # Workload Listener
-            listeners = row["Listeners"].split("+")
-            row["WorkloadListener"] = ""
-            listener_env_vars = {k: "False" for k in constants.RUN_LISTENERS}
-
-            for listener in listeners:
-                if (k := listener.strip()) in constants.WORKLOAD_LISTENERS:
-                    row["WorkloadListener"] = constants.WORKLOAD_LISTENERS[k].format(
-                        **row
-                    )
-                    listeners.remove(listener)
-                else:
-                    if k.upper() == "DCGMI" and not dcgmi_enabled:
-                        continue
-                    listener_env_vars[f"RADT_LISTENER_{k.upper()}"] = "True"
-
-            listeners = "+".join(listeners)
-
-            # Determine the actual command to run
-            # This differs for CONDA mode (using mlflow wrapping) vs using a direct python command
-            if parsed_args.useconda:
-                # CONDA mode (using mlflow wrapping)
-                command = constants.COMMAND.format(**row).split() + [
-                    "-P",
-                    f"workload_listener={row['WorkloadListener']}",
-                ]
-                param_def = constants.MLPROJECT_CONTENTS.replace(
-                    "<REPLACE_COMMAND>",
-                    constants.MLFLOW_COMMAND.format(
-                        WorkloadListener=row["WorkloadListener"],
-                        Listeners=listeners,
-                        File=row["File"],
-                        Params=row["Params"] or '""',
-                        PythonCommand=python_command,
-                    ),
-                ).replace(
-                    "<REPLACE_ENV>",
-                    "conda_env: conda.yaml" if parsed_args.useconda else "",
+        for name, state, worker, results in workqueue.collect(published):
+            workload = published.pop(name)
+            if state == DONE:
+                sysprint(f"FINISHED WORKLOAD: {workload} on worker {worker}")
+                write_results(
+                    file,
+                    raw_file_contents,
+                    workloads[workload],
+                    [tuple(result) for result in results],
+                    parent_run_id,
                 )
             else:
-                # Direct mode (using direct python command)
-                command = shlex.split(
-                    constants.DIRECT_COMMAND.format(
-                        Listeners=listeners,
-                        File=row["File"],
-                        Params=row["Params"] or '""',
-                        PythonCommand=python_command,
-                    )
-                )
-                param_def = {
-                    "letter": row["Letter"],
-                    "workload": row["Workload"],
-                    "listeners": listeners,
-                    "params": row["Params"] or "",
-                    "file": row["File"],
-                    "workload_listener": row["WorkloadListener"],
-                }
+                sysprint(f"FAILED WORKLOAD: {workload} on worker {worker} ({results})")
 
-            workload_definitions.append(
-                (
-                    id,
-                    constants.COLOURS[i % 6],
-                    row["Letter"],
-                    row["Name"],
-                    {
-                        "MLFLOW_EXPERIMENT_ID": str(row["Experiment"]).strip(),
-                        "CUDA_VISIBLE_DEVICES": ",".join(map(str, mig_table[id])),
-                        "RADT_DCGMI_GROUP": str(dcgmi_table[id]),
-                        "SMI_GPU_ID": str(row["Devices"]),
-                        "RADT_PRESENT": "True",
-                        "RADT_MANUAL_MODE": "True" if parsed_args.manual else "False",
-                        "PYTHONUNBUFFERED": "1" if not parsed_args.buffered else "",
-                    }
-                    | listener_env_vars,
-                    command,
-                    param_def,
-                    row["Filepath"],
-                    row,
-                )
-            )
+        if published:
+            time.sleep(parsed_args.poll_interval)
+
+
+def schedule_dataframe(
+    parsed_args: Namespace,
+    df: pd.DataFrame,
+    file: Path,
+    raw_file_contents,
+    group_name: str | None = None,
+    parent_run_id: str | None = None,
+):
+    """Execute all unfinished workloads of a dataframe and record their results
+
+    Args:
+        parsed_args (Namespace): Schedule arguments
+        df (pd.DataFrame): Dataframe to run
+        file (Path): Path to file
+        raw_file_contents (pd.DataFrame or dict or None): Raw file contents
+        group_name (str | None): Group name
+        parent_run_id (str | None): Run ID of the group run
+    """
+    df["Workload_Unique"] = (
+        df["Experiment"].astype(str) + "+" + df["Workload"].astype(str)
+    )
 
-        execution_type = (
-            ExecutionType.MLFLOW if parsed_args.useconda else ExecutionType.DIRECT
+    workloads = {}
+    for workload in df["Workload_Unique"].unique():
+        df_workload = df[df["Workload_Unique"] == workload].copy()
+
+        # Skip workloads that have been finished already
+        if is_workload_finished(df_workload, parsed_args.rerun):
+            sysprint(f"SKIPPING Workload: {workload}")
+            continue
+
+        workloads[workload] = df_workload
+
+    if parsed_args.plan or parsed_args.order == "lpt":
+        predictions = predict_durations(workloads)
+        order = lpt_order(fill_unknown(predictions))
+
+        if parsed_args.plan:
+            for line in format_plan(predictions, order, parsed_args.workers):
+                sysprint(line)
+            return
+
+        workloads = {workload: workloads[workload] for workload in order}
+
+    if parsed_args.queue:
+        distribute_workloads(
+            parsed_args,
+            workloads,
+            file,
+            raw_file_contents,
+            group_name=group_name,
+            parent_run_id=parent_run_id,
+        )
+        return
+
+    for workload, df_workload in workloads.items():
+        results = run_workload(
+            parsed_args,
+            workload,
+            df_workload,
+            group_name=group_name,
+            parent_run_id=parent_run_id,
         )
+        write_results(file, raw_file_contents, df_workload, results, parent_run_id)
+
+
+def start_search(
+    parsed_args: Namespace,
+    file: Path,
+    raw_file_contents: dict,
+    group_name: str | None = None,
+    parent_run_id: str | None = None,
+):
+    """Run a successive halving or hyperband sweep from a .yaml file
+
+    All configs are first trained for a small epoch budget, after which only the best
+    1/eta by the target metric are trained again with an eta times larger budget.
+    Hyperband repeats this in brackets that start with fewer configs but larger budgets.
 
-        # If group name is set, run in that group
-        if group_name is not None:
+    Args:
+        parsed_args (Namespace): Schedule arguments
+        file (Path): Path to file
+        raw_file_contents (dict): Sweep definition with status
+        group_name (str | None): Group name
+        parent_run_id (str | None): Run ID of the group run
+    """
+    for key in ["metric", "max_epochs"]:
+        if key not in raw_file_contents:
+            raise ValueError(
+                f"YAML file must contain a '{key}' field for method '{raw_file_contents['method']}'"
+            )
+
+    metric = raw_file_contents["metric"]
+    mode = raw_file_contents.get("mode", "min")
+    if mode not in ("min", "max"):
+        raise ValueError("YAML field 'mode' must be either 'min' or 'max'")
+    eta = float(raw_file_contents.get("eta", 3))
+    min_epochs = float(raw_file_contents.get("min_epochs", 1))
+    max_epochs = float(raw_file_contents["max_epochs"])
+
+    configs = grid_params(raw_file_contents["parameters"])
+    if raw_file_contents["method"] == "hyperband":
+        # Seeded so that a resumed sweep samples the same configs
+        rng = random.Random(raw_file_contents.get("seed", 0))
+        brackets = [
+            (rng.sample(configs, n), epochs)
+            for n, epochs in hyperband_brackets(
+                len(configs), min_epochs, max_epochs, eta
+            )
+        ]
+    else:
+        brackets = [(configs, min_epochs)]
+
+    rungs = [
+        halving_rungs(len(candidates), epochs, max_epochs, eta)
+        for candidates, epochs in brackets
+    ]
+    budget = sum(n * epochs for bracket in rungs for n, epochs in bracket)
+    sysprint(
+        f"SEARCH: {len(configs)} configs, {budget:g} epochs in total "
+        f"(exhaustive grid: {len(configs) * max_epochs:g})"
+    )
+
+    client = MlflowClient()
+    for b, ((candidates, _), bracket) in enumerate(zip(brackets, rungs)):
+        for r, (n, epochs) in enumerate(bracket):
+            candidates = candidates[:n]
             sysprint(
-                f"RUNNING WORKLOAD: {workload} with group run '{group_name}' with ID {parent_run_id} in {execution_type.value} mode"
+                f"BRACKET {b} RUNG {r}: {len(candidates)} config(s) for {epochs:g} epoch(s)"
             )
-            results = execute_workload(
-                workload_definitions,
-                group_run_id=parent_run_id,
-                execution_type=execution_type,
-                poll_interval=parsed_args.poll_interval,
+            if parsed_args.plan:
+                continue
+
+            finished_runs = yaml_finished_runs(raw_file_contents)
+            max_status = max(map(int, raw_file_contents["status"]), default=-1)
+
+            df = pd.DataFrame(np.empty(0, dtype=constants.CSV_FORMAT))
+            for params in candidates:
+                df.loc[len(df)] = yaml_row(
+                    raw_file_contents,
+                    f"{(max_status+len(df)+1):03}",
+                    params,
+                    epochs,
+                    status=("FINISHED" if (params, epochs) in finished_runs else ""),
+                )
+
+            schedule_dataframe(
+                parsed_args, df, file, raw_file_contents, group_name, parent_run_id
             )
-            try:
-                c = mlflow.MlflowClient()
-                c.set_terminated(parent_run_id, status="FINISHED")
-            except mlflow.exceptions.MlflowException as e:
-                pass
-        else:
-            # Format and run the row
-            sysprint(f"RUNNING WORKLOAD: {workload} in {execution_type.value} mode")
-            results = execute_workload(
-                workload_definitions,
-                execution_type=execution_type,
-                poll_interval=parsed_args.poll_interval,
+
+            # Promote the best configs by their last logged value of the target metric
+            finished_runs = yaml_finished_runs(raw_file_contents)
+            run_ids = {p: finished_runs.get((p, epochs)) for p in candidates}
+            runs = get_runs(
+                client,
+                list(run_ids.values()),
+                [tracking_experiment_id(raw_file_contents["experiment"])],
             )
+            values = {
+                p: (runs[run_id].data.metrics.get(metric) if run_id in runs else None)
+                for p, run_id in run_ids.items()
+            }
+            if offline_dir := os.getenv("RADT_OFFLINE_DIR"):
+                # Offline metrics are not in the tracking store
+                values = {
+                    p: latest_metrics(offline_dir, run_id).get(metric, values[p])
+                    for p, run_id in run_ids.items()
+                }
+            candidates = rank(values, mode)
+            sysprint(f"BEST: {candidates[0]} with {metric} {values[candidates[0]]}")
 
-        remove_mps()
 
-        # Write if .csv
-        if isinstance(raw_file_contents, pd.DataFrame):
-            for id, letter, returncode, run_id, run_name, status in results:
-                raw_file_contents.loc[id, "Run"] = run_id
-                raw_file_contents.loc[id, "Status"] = f"{status} {run_name} ({letter})"
-
-            # Write the result of the run to the csv
-            target = Path("result.csv")
-            raw_file_contents.to_csv(target, index=False)
-            file.unlink()
-            target.rename(file)
-
-        # Write if .yaml
-        elif isinstance(raw_file_contents, dict):
-
-            if "status" not in raw_file_contents or not isinstance(
-                raw_file_contents["status"], dict
-            ):
-                raw_file_contents["status"] = {}
-
-            raw_file_contents["parent"] = parent_run_id
-
-            for id, letter, returncode, run_id, run_name, status in results:
-                raw_file_contents["status"][
-                    int(df_workload.loc[id, "Workload"])
-                ] = f"{status} {run_id} ({df_workload.loc[id, 'Params']})"
-
-            # Write the result of the run to the yaml file
-            target = Path("result.yaml")
-            with open(target, "w") as f:
-                yaml.dump(raw_file_contents, f)
-            file.unlink()
-            target.rename(file)
+def enable_offline(parsed_args: Namespace, df: pd.DataFrame, raw_file_contents):
+    """Redirect all tracking of this schedule to the local offline store
+
+    Args:
+        parsed_args (Namespace): Schedule arguments
+        df (pd.DataFrame): Workloads
+        raw_file_contents (dict or None): Sweep definition if scheduling a .yaml file
+    """
+    if parsed_args.queue:
+        raise ValueError("--offline cannot be combined with --queue")
+
+    if isinstance(raw_file_contents, dict):
+        experiment_ids = [raw_file_contents["experiment"]]
+    else:
+        experiment_ids = list(df["Experiment"].unique())
+
+    directory = Path(parsed_args.offline).resolve()
+    # Runs inherit the environment, so their runs and metrics end up offline too
+    os.environ["MLFLOW_TRACKING_URI"] = prepare_offline(directory, experiment_ids)
+    os.environ["RADT_OFFLINE_DIR"] = str(directory)
+    sysprint(f"OFFLINE: tracking to {directory}, upload with `radt sync {directory}`")
+
+
+def start_schedule(
+    parsed_args: Namespace,
+    file: Path,
+    args_passthrough: list,
+    group_name: str | None = None,
+):
+    """Schedule (execute) a .py or .csv file via RADT
+
+    Args:
+        parsed_args (Namespace): Schedule arguments
+        file (Path): Path to file
+        args_passthrough (list): Run arguments
+        group_name (str | None): Group name
+    """
+    df, raw_file_contents, yaml_group_name = determine_operating_mode(
+        parsed_args, file, args_passthrough
+    )
+
+    if group_name is None and yaml_group_name is not None:
+        group_name = yaml_group_name
+
+    if parsed_args.offline and not parsed_args.plan:
+        enable_offline(parsed_args, df, raw_file_contents)
+
+    parent_run_id = None
+    if group_name is not None and not parsed_args.plan:
+        if isinstance(raw_file_contents, dict):
+            experiment = raw_file_contents["experiment"]
+        else:
+            experiment = df.iloc[0]["Experiment"]
+        parent_run_id = open_parent_run(group_name, tracking_experiment_id(experiment))
+
+    if (
+        isinstance(raw_file_contents, dict)
+        and raw_file_contents["method"] in SEARCH_METHODS
+    ):
+        start_search(parsed_args, file, raw_file_contents, group_name, parent_run_id)
+        return
+
+    schedule_dataframe(
+        parsed_args, df, file, raw_file_contents, group_name, parent_run_id
+    )
@@ -0,0 +1,125 @@
+import math
+import re
+from itertools import product
+
+SEARCH_METHODS = ("halving", "hyperband")
+
+_STATUS_PATTERN = re.compile(r"^(\S+) (\S+) \((.*)\)(?: \[epochs (\S+)\])?$")
+
+
+def grid_params(parameters: dict):
+    """Expand the `parameters` of a YAML sweep into command line arguments
+
+    Args:
+        parameters (dict): Parameter names with their `values`
+
+    Returns:
+        list: Params string for every combination of values
+    """
+    keys = list(parameters)
+    values = [parameters[k]["values"] for k in keys]
+    return [
+        " ".join([f"--{k} {v}" for (k, v) in zip(keys, c)]) for c in product(*values)
+    ]
+
+
+def format_status(status: str, run_id: str, params: str, epochs=None):
+    """Format the status entry of a YAML sweep run
+
+    Args:
+        status (str): Run status
+        run_id (str): Run ID
+        params (str): Params of the run
+        epochs (float, optional): Epoch limit of the run. Defaults to None.
+
+    Returns:
+        str: Status entry
+    """
+    if epochs is None:
+        return f"{status} {run_id} ({params})"
+    return f"{status} {run_id} ({params}) [epochs {epochs:g}]"
+
+
+def parse_status(status: str):
+    """Parse the status entry of a YAML sweep run
+
+    Args:
+        status (str): Status entry as written by `format_status`
+
+    Returns:
+        tuple or None: Status, run ID, params and epoch limit (None if unlimited)
+    """
+    if not (match := _STATUS_PATTERN.match(str(status).strip())):
+        return None
+    state, run_id, params, epochs = match.groups()
+    return state, run_id, params, (float(epochs) if epochs else None)
+
+
+def halving_rungs(n_configs: int, min_epochs: float, max_epochs: float, eta: float):
+    """Successive halving: the number of configs and their epoch budget per rung
+
+    Every rung keeps the best 1/eta of the configs and trains them eta times longer,
+    until the maximum budget is reached.
+
+    Args:
+        n_configs (int): Number of configs in the first rung
+        min_epochs (float): Epoch budget of the first rung
+        max_epochs (float): Epoch budget of the last rung
+        eta (float): Reduction factor
+
+    Returns:
+        list: (number of configs, epochs) per rung
+    """
+    rungs = []
+    n, epochs = n_configs, min_epochs
+    while True:
+        epochs = min(math.ceil(epochs), max_epochs)
+        rungs.append((n, epochs))
+        if epochs >= max_epochs:
+            return rungs
+        n = max(1, math.floor(n / eta))
+        epochs *= eta
+
+
+def hyperband_brackets(
+    n_configs: int, min_epochs: float, max_epochs: float, eta: float
+):
+    """Hyperband: successive halving brackets that trade off configs against budget
+
+    Args:
+        n_configs (int): Number of available configs
+        min_epochs (float): Smallest epoch budget
+        max_epochs (float): Largest epoch budget
+        eta (float): Reduction factor
+
+    Returns:
+        list: (number of configs, epochs of the first rung) per bracket
+    """
+    s_max = math.floor(math.log(max_epochs / min_epochs, eta) + 1e-9)
+    return [
+        (
+            min(n_configs, math.ceil((s_max + 1) / (s + 1) * eta**s)),
+            max_epochs / eta**s,
+        )
+        for s in range(s_max, -1, -1)
+    ]
+
+
+def rank(values: dict, mode: str = "min"):
+    """Order configs from best to worst, configs without a value last
+
+    Args:
+        values (dict): Metric value (or None) per config
+        mode (str, optional): Whether lower ("min") or higher ("max") is better
+
+    Returns:
+        list: Configs from best to worst
+    """
+    sign = -1 if mode == "max" else 1
+    return sorted(
+        values,
+        key=lambda c: (
+            values[c] is None,
+            sign * values[c] if values[c] is not None else 0,
+        ),
+    )
@@ -0,0 +1,98 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from argparse import Namespace
+from io import StringIO
+
+import pandas as pd
+
+from .schedule import run_workload, sysprint
+from .workqueue import HEARTBEAT_INTERVAL, WorkloadQueue, parse_devices
+
+
+def _heartbeat(workqueue: WorkloadQueue, name: str, stopped: threading.Event):
+    """Renew the lease on the claims of a worker until stopped
+
+    Args:
+        workqueue (WorkloadQueue): Shared queue
+        name (str): Name of the worker
+        stopped (threading.Event): Set to stop
+    """
+    while not stopped.wait(HEARTBEAT_INTERVAL):
+        try:
+            workqueue.heartbeat(name)
+        except sqlite3.Error as e:
+            sysprint(f"Worker {name} could not renew its lease: {e}")
+
+
+def start_worker(args: Namespace):
+    """Claim and execute workloads from a shared queue until stopped
+
+    Args:
+        args (Namespace): Worker arguments
+    """
+    workqueue = WorkloadQueue(args.queue)
+    devices = parse_devices(args.devices)
+    name = args.name or f"{socket.gethostname()}:{'+'.join(sorted(devices))}"
+
+    # Workloads still claimed under our name were interrupted by a previous crash
+    if released := workqueue.release(name):
+        sysprint(f"Requeued {released} workload(s) previously claimed by {name}")
+
+    # Keeps our claims from being requeued by the coordinator while they run
+    stopped = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(workqueue, name, stopped), daemon=True
+    ).start()
+
+    sysprint(f"Worker {name} waiting for workloads on devices {args.devices}")
+    idle_since = time.time()
+    while True:
+        claimed = workqueue.claim(name, devices)
+
+        if claimed is None:
+            if args.idle_timeout and time.time() - idle_since > args.idle_timeout:
+                sysprint(f"Worker {name} idle for {args.idle_timeout}s, stopping")
+                stopped.set()
+                return
+            time.sleep(args.poll_interval)
+            continue
+
+        workload_name, payload = claimed
+        df_workload = pd.read_json(
+            StringIO(payload["rows"]), orient="split", dtype=False, convert_dates=False
+        )
+        # Direct database writes use the worker's own credentials
+        options = dict(payload["options"])
+        sql_uri = None
+        if options.pop("direct_sql", False):
+            if not (sql_uri := os.getenv("RADT_SQL_URI")):
+                sysprint("RADT_SQL_URI is not set, logging metrics through the server")
+        parsed_args = Namespace(**options, sql_uri=sql_uri, rerun=False, queue=None)
+
+        try:
+            results = run_workload(
+                parsed_args,
+                payload["workload"],
+                df_workload,
+                group_name=payload["group_name"],
+                parent_run_id=payload["parent_run_id"],
+            )
+        except (KeyboardInterrupt, SystemExit):
+            workqueue.fail(workload_name, name, f"Interrupted on worker {name}")
+            raise
+        except Exception as e:
+            sysprint(f"Workload {payload['workload']} failed: {e}")
+            reported = workqueue.fail(workload_name, name, repr(e))
+        else:
+            reported = workqueue.complete(workload_name, name, results)
+
+        # The coordinator requeued the workload after our lease expired
+        if not reported:
+            sysprint(
+                f"Lease on workload {payload['workload']} was lost, results discarded"
+            )
+
+        idle_since = time.time()
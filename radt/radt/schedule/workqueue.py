@@ -0,0 +1,252 @@
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+ERROR = "ERROR"
+
+# Workers renew the lease on their claims this often, the coordinator requeues claims
+# whose lease was not renewed within LEASE_TIMEOUT
+HEARTBEAT_INTERVAL = 30.0
+LEASE_TIMEOUT = 300.0
+
+
+def parse_devices(devices):
+    """Split a device string into a set of device ids
+
+    Args:
+        devices (str or int): Devices separated by +, e.g. 0, 1+2
+
+    Returns:
+        frozenset: Device ids
+    """
+    return frozenset(d.strip() for d in str(devices).split("+") if d.strip())
+
+
+class WorkloadQueue:
+    """Workload queue shared between a coordinator (`radt --queue`) and workers (`radt worker`).
+
+    The queue is a SQLite database. Place it on a filesystem that is shared by all nodes
+    and supports POSIX locks, as claims rely on SQLite's write lock to be exclusive.
+    Workers renew a lease on their claims with a heartbeat, claims of workers that stop
+    renewing it are requeued by the coordinator.
+    """
+
+    def __init__(self, path, timeout=60.0):
+        self.path = Path(path)
+        self.timeout = float(timeout)
+
+        with closing(self._connect()) as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS workloads (
+                    name TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    devices TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    worker TEXT,
+                    results TEXT,
+                    collected INTEGER NOT NULL DEFAULT 0,
+                    published REAL,
+                    claimed REAL,
+                    finished REAL,
+                    heartbeat REAL
+                )""")
+
+            # Queues created before leases were introduced
+            columns = [row[1] for row in con.execute("PRAGMA table_info(workloads)")]
+            if "heartbeat" not in columns:
+                con.execute("ALTER TABLE workloads ADD COLUMN heartbeat REAL")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def publish(self, name: str, devices, payload: dict):
+        """Add a workload to the queue, replacing any earlier entry that is not running
+
+        Args:
+            name (str): Unique name of the workload
+            devices (iterable): Device ids the workload requires
+            payload (dict): Everything a worker needs to run the workload
+        """
+        with closing(self._connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            position = con.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM workloads"
+            ).fetchone()[0]
+            con.execute(
+                """INSERT INTO workloads (name, position, devices, payload, state, published)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    position = excluded.position, devices = excluded.devices,
+                    payload = excluded.payload, state = excluded.state,
+                    worker = NULL, results = NULL, collected = 0,
+                    published = excluded.published, claimed = NULL, finished = NULL,
+                    heartbeat = NULL
+                WHERE workloads.state != ?""",
+                (
+                    name,
+                    position,
+                    "+".join(sorted(devices)),
+                    json.dumps(payload),
+                    QUEUED,
+                    time.time(),
+                    RUNNING,
+                ),
+            )
+            con.execute("COMMIT")
+
+    def claim(self, worker: str, devices):
+        """Claim the first queued workload that can run on the given devices
+
+        Args:
+            worker (str): Name of the claiming worker
+            devices (iterable): Device ids available to the worker
+
+        Returns:
+            tuple or None: Name and payload of the claimed workload, None if nothing fits
+        """
+        devices = frozenset(devices)
+        with closing(self._connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            for name, required, payload in con.execute(
+                "SELECT name, devices, payload FROM workloads WHERE state = ? ORDER BY position",
+                (QUEUED,),
+            ).fetchall():
+                if parse_devices(required) <= devices:
+                    now = time.time()
+                    con.execute(
+                        "UPDATE workloads SET state = ?, worker = ?, claimed = ?, heartbeat = ? WHERE name = ?",
+                        (RUNNING, worker, now, now, name),
+                    )
+                    con.execute("COMMIT")
+                    return name, json.loads(payload)
+            con.execute("COMMIT")
+        return None
+
+    def _finish(self, name: str, worker: str, state: str, results):
+        with closing(self._connect()) as con:
+            return (
+                con.execute(
+                    "UPDATE workloads SET state = ?, results = ?, finished = ? WHERE name = ? AND worker = ? AND state = ?",
+                    (
+                        state,
+                        json.dumps(results, default=int),
+                        time.time(),
+                        name,
+                        worker,
+                        RUNNING,
+                    ),
+                ).rowcount
+                > 0
+            )
+
+    def complete(self, name: str, worker: str, results: list):
+        """Report the run results of a finished workload
+
+        Args:
+            name (str): Name of the workload
+            worker (str): Name of the worker that claimed it
+            results (list): Run results as returned by `run_workload`
+
+        Returns:
+            bool: Whether the report was accepted, False if the lease was lost and the
+                workload requeued
+        """
+        return self._finish(name, worker, DONE, results)
+
+    def fail(self, name: str, worker: str, error: str):
+        """Report a workload that could not be executed
+
+        Args:
+            name (str): Name of the workload
+            worker (str): Name of the worker that claimed it
+            error (str): Description of the error
+
+        Returns:
+            bool: Whether the report was accepted, False if the lease was lost and the
+                workload requeued
+        """
+        return self._finish(name, worker, ERROR, error)
+
+    def heartbeat(self, worker: str):
+        """Renew the lease on all workloads claimed by a worker
+
+        Args:
+            worker (str): Name of the worker
+        """
+        with closing(self._connect()) as con:
+            con.execute(
+                "UPDATE workloads SET heartbeat = ? WHERE state = ? AND worker = ?",
+                (time.time(), RUNNING, worker),
+            )
+
+    def expire(self, lease_timeout: float = LEASE_TIMEOUT):
+        """Requeue all workloads whose worker has not renewed its lease in time
+
+        Args:
+            lease_timeout (float, optional): Seconds after the last heartbeat at which a
+                worker is considered dead
+
+        Returns:
+            list: (name, worker) of every requeued workload
+        """
+        deadline = time.time() - lease_timeout
+        with closing(self._connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            rows = con.execute(
+                "SELECT name, worker FROM workloads WHERE state = ? AND COALESCE(heartbeat, claimed) < ?",
+                (RUNNING, deadline),
+            ).fetchall()
+            con.executemany(
+                "UPDATE workloads SET state = ?, worker = NULL, claimed = NULL, heartbeat = NULL WHERE name = ?",
+                [(QUEUED, name) for name, _ in rows],
+            )
+            con.execute("COMMIT")
+        return rows
+
+    def release(self, worker: str):
+        """Requeue all workloads still claimed by a worker, e.g. after it crashed
+
+        Args:
+            worker (str): Name of the worker
+
+        Returns:
+            int: Number of requeued workloads
+        """
+        with closing(self._connect()) as con:
+            return con.execute(
+                "UPDATE workloads SET state = ?, worker = NULL, claimed = NULL, heartbeat = NULL WHERE state = ? AND worker = ?",
+                (QUEUED, RUNNING, worker),
+            ).rowcount
+
+    def collect(self, names=None):
+        """Fetch finished workloads that have not been collected before
+
+        Args:
+            names (iterable, optional): Only collect these workloads. Defaults to all.
+
+        Returns:
+            list: (name, state, worker, results) for every newly finished workload
+        """
+        with closing(self._connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            rows = con.execute(
+                "SELECT name, state, worker, results FROM workloads WHERE state IN (?, ?) AND collected = 0 ORDER BY finished",
+                (DONE, ERROR),
+            ).fetchall()
+            if names is not None:
+                names = set(names)
+                rows = [row for row in rows if row[0] in names]
+            con.executemany(
+                "UPDATE workloads SET collected = 1 WHERE name = ?",
+                [(name,) for name, _, _, _ in rows],
+            )
+            con.execute("COMMIT")
+        return [
+            (name, state, worker, json.loads(results))
+            for name, state, worker, results in rows
+        ]
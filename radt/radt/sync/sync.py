@@ -0,0 +1,274 @@
+import json
+import threading
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from mlflow.entities import Metric, Param, RunStatus
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+from mlflow.utils.file_utils import local_file_uri_to_path
+
+from ..run.offline import offline_experiments, offline_tracking_uri, read_metrics
+
+# Tag on uploaded runs with their ID in the offline store, as IDs cannot be chosen
+SYNC_TAG = "radt.offline_run_id"
+PARENT_TAG = "mlflow.parentRunId"
+
+# MLflow accepts at most 100 params and 1000 metrics per log_batch request
+MAX_PARAMS_PER_BATCH = 100
+MAX_METRICS_PER_BATCH = 1000
+
+
+def chunks(items: list, size: int):
+    """Split a list into chunks
+
+    Args:
+        items (list): Items to split
+        size (int): Maximum chunk size
+
+    Returns:
+        list: Chunks
+    """
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def offline_runs(client: MlflowClient):
+    """List all runs in the offline store
+
+    Args:
+        client (MlflowClient): Client of the offline store
+
+    Returns:
+        list: Runs
+    """
+    runs = []
+    for experiment in client.search_experiments():
+        page_token = None
+        while True:
+            page = client.search_runs(
+                [experiment.experiment_id], max_results=1000, page_token=page_token
+            )
+            runs.extend(page)
+            page_token = page.token
+            if not page_token:
+                break
+    return runs
+
+
+def run_metrics(client: MlflowClient, directory: Path, run):
+    """Collect all metrics of an offline run
+
+    Args:
+        client (MlflowClient): Client of the offline store
+        directory (Path): Offline directory
+        run (mlflow.entities.Run): Offline run
+
+    Returns:
+        list: Metric entities
+    """
+    # Metrics logged through mlflow directly end up in the store, radT's loggers write Parquet
+    metrics = [
+        m
+        for key in run.data.metrics
+        for m in client.get_metric_history(run.info.run_id, key)
+    ]
+    metrics.extend(
+        Metric(m["key"], m["value"], m["timestamp"], m["step"])
+        for m in read_metrics(directory, run.info.run_id)
+    )
+    return metrics
+
+
+class Synchroniser:
+    """Uploads runs from an offline directory to a tracking server.
+
+    Uploaded runs are recorded in `synced.json` in the offline directory,
+    so an interrupted sync can be resumed and newer runs added later. Runs are
+    also tagged with their offline ID, which finds uploads that were interrupted
+    before they were recorded.
+    """
+
+    def __init__(self, directory, tracking_uri=None, batch_size=MAX_METRICS_PER_BATCH):
+        self.directory = Path(directory).resolve()
+        if not (self.directory / "mlflow.db").is_file():
+            raise ValueError(f"{self.directory} is not a radT offline directory")
+
+        self.source = MlflowClient(offline_tracking_uri(self.directory))
+        self.target = MlflowClient(tracking_uri)
+        self.batch_size = min(int(batch_size), MAX_METRICS_PER_BATCH)
+
+        self.state_file = self.directory / "synced.json"
+        self.synced = (
+            json.loads(self.state_file.read_text()) if self.state_file.is_file() else {}
+        )
+        self.experiments = offline_experiments(self.directory)
+        self._experiments = {}
+        self._lock = threading.Lock()
+
+    def _record(self, offline_id: str, run_id: str):
+        with self._lock:
+            self.synced[offline_id] = run_id
+            temp = self.state_file.with_suffix(".tmp")
+            temp.write_text(json.dumps(self.synced, indent=2))
+            temp.replace(self.state_file)
+
+    def target_experiment(self, experiment_id: str):
+        """Find the experiment on the tracking server that offline runs are uploaded to
+
+        Uses the experiment the offline experiment was created for by `radt --offline`
+        if it exists, otherwise one with the same name.
+
+        Args:
+            experiment_id (str): Offline experiment ID
+
+        Returns:
+            str: Experiment ID on the tracking server
+        """
+        with self._lock:
+            if experiment_id in self._experiments:
+                return self._experiments[experiment_id]
+
+            try:
+                target_id = self.target.get_experiment(
+                    self.experiments[experiment_id]
+                ).experiment_id
+            except KeyError:
+                target_id = self._experiment_by_name(experiment_id)
+            except MlflowException:
+                target_id = self._experiment_by_name(experiment_id)
+
+            self._experiments[experiment_id] = target_id
+            return target_id
+
+    def _experiment_by_name(self, experiment_id: str):
+        name = self.source.get_experiment(experiment_id).name
+        experiment = self.target.get_experiment_by_name(name)
+        return (
+            experiment.experiment_id
+            if experiment
+            else self.target.create_experiment(name)
+        )
+
+    def previous_upload(self, experiment_id: str, offline_id: str):
+        """Find a run that an earlier sync uploaded but did not record
+
+        Args:
+            experiment_id (str): Experiment ID on the tracking server
+            offline_id (str): Offline run ID
+
+        Returns:
+            mlflow.entities.Run or None: Uploaded run
+        """
+        runs = self.target.search_runs(
+            [experiment_id], filter_string=f"tags.`{SYNC_TAG}` = '{offline_id}'"
+        )
+        return runs[0] if runs else None
+
+    def upload(self, run):
+        """Upload a single run with its params, tags, metrics and artifacts
+
+        Args:
+            run (mlflow.entities.Run): Offline run
+
+        Returns:
+            str: Run ID on the tracking server
+        """
+        offline_id = run.info.run_id
+        tags = dict(run.data.tags)
+        tags[SYNC_TAG] = offline_id
+        if PARENT_TAG in tags:
+            # Parents are uploaded first, runs whose parent is not offline keep the link as is
+            tags[PARENT_TAG] = self.synced.get(tags[PARENT_TAG], tags[PARENT_TAG])
+
+        experiment_id = self.target_experiment(run.info.experiment_id)
+        previous = self.previous_upload(experiment_id, offline_id)
+        if previous is not None:
+            if previous.info.status != RunStatus.to_string(RunStatus.RUNNING):
+                # Terminating is the last step of an upload, only recording it was lost
+                self._record(offline_id, previous.info.run_id)
+                print(f"Synced {offline_id} -> {previous.info.run_id} (resumed)")
+                return previous.info.run_id
+
+            # Partially uploaded, replace it as metrics cannot be uploaded twice
+            self.target.delete_run(previous.info.run_id)
+
+        run_id = self.target.create_run(
+            experiment_id,
+            start_time=run.info.start_time,
+            tags=tags,
+        ).info.run_id
+
+        params = [Param(k, v) for k, v in run.data.params.items()]
+        for batch in chunks(params, MAX_PARAMS_PER_BATCH):
+            self.target.log_batch(run_id, params=batch)
+
+        metrics = run_metrics(self.source, self.directory, run)
+        for batch in chunks(metrics, self.batch_size):
+            self.target.log_batch(run_id, metrics=batch)
+
+        artifacts = Path(local_file_uri_to_path(run.info.artifact_uri))
+        if artifacts.is_dir() and any(artifacts.iterdir()):
+            self.target.log_artifacts(run_id, str(artifacts))
+
+        self.target.set_terminated(
+            run_id, status=run.info.status, end_time=run.info.end_time
+        )
+
+        self._record(offline_id, run_id)
+        print(f"Synced {offline_id} -> {run_id} ({len(metrics)} metrics)")
+        return run_id
+
+    def sync(self, jobs: int = 4):
+        """Upload all finished offline runs that have not been synced before
+
+        Args:
+            jobs (int, optional): Number of runs to upload in parallel. Defaults to 4.
+
+        Returns:
+            int: Number of uploaded runs
+        """
+        runs = [
+            run
+            for run in offline_runs(self.source)
+            if run.info.run_id not in self.synced
+        ]
+
+        active = {
+            run.info.run_id
+            for run in runs
+            if run.info.status == RunStatus.to_string(RunStatus.RUNNING)
+        }
+        if active:
+            print(f"Skipping {len(active)} run(s) that are still running")
+        remaining = {
+            run.info.run_id: run for run in runs if run.info.run_id not in active
+        }
+
+        # Upload in waves so parent IDs are known before their children are created
+        uploaded = 0
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while remaining:
+                wave = [
+                    run
+                    for run in remaining.values()
+                    if run.data.tags.get(PARENT_TAG) not in remaining
+                ] or list(remaining.values())
+                for run in wave:
+                    del remaining[run.info.run_id]
+                uploaded += len(list(pool.map(self.upload, wave)))
+
+        return uploaded
+
+
+def start_sync(args: Namespace):
+    """Upload the runs of an offline directory to the tracking server
+
+    Args:
+        args (Namespace): Sync arguments
+    """
+    synchroniser = Synchroniser(args.directory, args.tracking_uri, args.batch_size)
+    uploaded = synchroniser.sync(args.jobs)
+    print(
+        f"Uploaded {uploaded} run(s), offline to online run IDs are listed in {synchroniser.state_file}"
+    )
@@ -0,0 +1,53 @@
+import collections
+import functools
+
+import mlflow
+import pytest
+from mlflow.store.tracking.sqlalchemy_store import SqlAlchemyStore
+
+# Tracking store methods that are one request each against a tracking server
+REQUESTS = (
+    "get_run",
+    "search_runs",
+    "log_param",
+    "log_metric",
+    "log_batch",
+    "set_tag",
+)
+
+
+@pytest.fixture
+def tracking(tmp_path, monkeypatch):
+    """Local SQLite tracking store
+
+    Returns:
+        str: Tracking URI
+    """
+    uri = f"sqlite:///{tmp_path / 'mlflow.db'}"
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", uri)
+    monkeypatch.setenv("MLFLOW_DISABLE_AGENT_HINT", "1")
+    mlflow.set_tracking_uri(uri)
+    yield uri
+    while mlflow.active_run():
+        mlflow.end_run()
+    mlflow.set_tracking_uri(None)
+
+
+@pytest.fixture
+def requests(tracking, monkeypatch):
+    """Count the calls to the tracking store, i.e. the round trips to a server
+
+    Returns:
+        collections.Counter: Calls per store method
+    """
+    counter = collections.Counter()
+
+    for name in REQUESTS:
+        method = getattr(SqlAlchemyStore, name)
+
+        def counted(self, *args, __name=name, __method=method, **kwargs):
+            counter[__name] += 1
+            return __method(self, *args, **kwargs)
+
+        monkeypatch.setattr(SqlAlchemyStore, name, functools.wraps(method)(counted))
+    return counter
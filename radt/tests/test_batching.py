@@ -0,0 +1,43 @@
+import mlflow
+from mlflow.tracking import MlflowClient
+
+from radt.run.run import update_params_listing
+from radt.schedule.schedule import get_runs
+
+
+def test_params_are_logged_in_one_request(requests):
+    params = "--lr 0.1 --epochs 3 --data-dir /data/imagenet --amp"
+    with mlflow.start_run() as run:
+        requests.clear()
+        update_params_listing("train.py", params, manual=False)
+        calls = dict(requests)
+
+    logged = MlflowClient().get_run(run.info.run_id).data.params
+    assert logged == {
+        "model": "train.py",
+        "params": params,
+        "lr": "0.1",
+        "epochs": "3",
+        "data-dir": "/data/imagenet",
+        "amp": "",
+        "data": "/data/imagenet",
+        "manual": "False",
+    }
+
+    # One request per parameter before batching
+    assert calls == {"log_batch": 1}
+    assert sum(calls.values()) < len(logged)
+
+
+def test_runs_are_fetched_in_one_request(requests):
+    client = MlflowClient()
+    experiment_id = client.create_experiment("workload")
+    run_ids = [client.create_run(experiment_id).info.run_id for _ in range(4)] + [""]
+
+    requests.clear()
+    runs = get_runs(client, run_ids, [experiment_id])
+
+    assert set(runs) == set(run_ids[:-1])
+
+    # One get_run request per run before batching
+    assert requests == {"search_runs": 1}
@@ -0,0 +1,78 @@
+import pytest
+
+from radt.run.listeners.cgroup_listener import cgroup_dir, cgroup_metrics, read_cgroup
+
+
+def _write(directory, files):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, text in files.items():
+        (directory / name).write_text(text)
+
+
+def _counters(usage, throttled, rbytes, stall):
+    return {
+        "cpu.stat": f"usage_usec {usage}\nuser_usec 0\nsystem_usec 0\n"
+        f"nr_periods 10\nnr_throttled {throttled // 1000}\n"
+        f"throttled_usec {throttled}\n",
+        "memory.current": "2000000000\n",
+        "memory.max": "8000000000\n",
+        "memory.stat": "anon 1500000000\nfile 500000000\nkernel 0\n",
+        "io.stat": f"8:0 rbytes={rbytes} wbytes=0 rios=1 wios=0\n"
+        f"8:16 rbytes={rbytes} wbytes=4000000 rios=1 wios=1\n",
+        "cpu.pressure": f"some avg10=0.00 avg60=0.00 avg300=0.00 total={stall}\n"
+        "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+        "memory.pressure": "some avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+        "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+    }
+
+
+@pytest.mark.parametrize("mount", ["", "unified"])
+def test_cgroup_dir(tmp_path, mount):
+    _write(tmp_path / "proc" / "42", {"cgroup": "1:cpu:/\n0::/slurm/job_7\n"})
+    root = tmp_path / "cgroup"
+    _write(root / mount, {"cgroup.controllers": "cpu memory io\n"})
+
+    directory = cgroup_dir(42, tmp_path / "proc", root)
+    assert directory == f"{root / mount}/slurm/job_7"
+
+
+def test_cgroup_dir_without_v2(tmp_path):
+    _write(tmp_path / "proc" / "42", {"cgroup": "1:cpu:/\n"})
+    assert cgroup_dir(42, tmp_path / "proc", tmp_path / "cgroup") is None
+
+
+def test_cgroup_metrics(tmp_path):
+    job = tmp_path / "job"
+    _write(job, _counters(usage=1_000_000, throttled=0, rbytes=0, stall=0))
+    previous = read_cgroup(job)
+
+    # Two cores busy for 2 s, throttled for 0.5 s, 2 MB/s read over two disks
+    _write(
+        job,
+        _counters(usage=5_000_000, throttled=500_000, rbytes=2_000_000, stall=200_000),
+    )
+    m = cgroup_metrics(read_cgroup(job), previous, 2.0)
+
+    assert m == pytest.approx(
+        {
+            "system/CGROUP - CPU Utilization": 200.0,
+            "system/CGROUP - CPU Throttled Percentage": 25.0,
+            "system/CGROUP - Throttled Periods": 500,
+            "system/CGROUP - Memory GB": 2.0,
+            "system/CGROUP - Memory Limit GB": 8.0,
+            "system/CGROUP - Anonymous Memory GB": 1.5,
+            "system/CGROUP - File Memory GB": 0.5,
+            "system/CGROUP - Read MB/s": 2.0,
+            "system/CGROUP - Write MB/s": 0.0,
+            "system/CGROUP - CPU Pressure Some Percentage": 10.0,
+            "system/CGROUP - CPU Pressure Full Percentage": 0.0,
+            "system/CGROUP - Memory Pressure Some Percentage": 0.0,
+            "system/CGROUP - Memory Pressure Full Percentage": 0.0,
+        }
+    )
+
+
+def test_cgroup_without_memory_limit(tmp_path):
+    _write(tmp_path, {"memory.max": "max\n", "memory.current": "1000000000\n"})
+    m = cgroup_metrics(read_cgroup(tmp_path), {}, 1.0)
+    assert m == {"system/CGROUP - Memory GB": 1.0}
@@ -0,0 +1,76 @@
+import math
+
+import sqlalchemy as sa
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+
+from radt.compact.compact import COMPACTED_TAG, compact_run, compactable_runs
+
+START = 1_700_000_000_000
+
+# (key, offset in ms, step, value)
+POINTS = [
+    ("system/cpu", 0, 0, 10.0),
+    ("system/cpu", 200, 1, 20.0),
+    ("system/cpu", 400, 2, float("nan")),
+    ("system/cpu", 1100, 3, 30.0),
+    ("system/cpu", 1900, 4, 50.0),
+    ("system/gpu", 500, 0, 7.0),
+    ("loss", 0, 0, 2.0),
+    ("loss", 100, 1, 1.0),
+]
+
+
+def _history(client, run_id, key):
+    return [
+        (m.timestamp - START, m.step, "nan" if math.isnan(m.value) else m.value)
+        for m in sorted(
+            client.get_metric_history(run_id, key), key=lambda m: m.timestamp
+        )
+    ]
+
+
+def test_compact_run(tracking):
+    client = MlflowClient()
+    run_id = client.create_run(
+        client.create_experiment("compact"), start_time=START
+    ).info.run_id
+    client.log_batch(
+        run_id,
+        metrics=[Metric(k, value, START + t, step) for k, t, step, value in POINTS],
+    )
+    client.set_terminated(run_id, end_time=START + 2000)
+    latest = client.get_run(run_id).data.metrics
+
+    engine = sa.create_engine(tracking)
+    with engine.connect() as connection:
+        assert compactable_runs(connection, 0) == [run_id]
+    with engine.begin() as connection:
+        assert compact_run(connection, run_id, "system/", 1000) == (6, 4)
+
+    # Buckets hold the mean of their points without NaN, at the first point's time
+    # and the last point's step, and the latest point of every key is kept as is
+    assert _history(client, run_id, "system/cpu") == [
+        (0, 1, 15.0),
+        (1100, 4, 40.0),
+        (1900, 4, 50.0),
+    ]
+    assert _history(client, run_id, "system/gpu") == [(500, 0, 7.0)]
+    assert client.get_run(run_id).data.metrics == latest
+
+    # Keys without the prefix are not touched
+    assert _history(client, run_id, "loss") == [(0, 0, 2.0), (100, 1, 1.0)]
+
+    assert client.get_run(run_id).data.tags[COMPACTED_TAG] == "1"
+    with engine.connect() as connection:
+        assert compactable_runs(connection, 0) == []
+
+    # Compacting again leaves the run as it is
+    with engine.begin() as connection:
+        assert compact_run(connection, run_id, "system/", 10_000) == (4, 4)
+    assert _history(client, run_id, "system/cpu") == [
+        (0, 1, 15.0),
+        (1100, 4, 40.0),
+        (1900, 4, 50.0),
+    ]
+    assert client.get_run(run_id).data.tags[COMPACTED_TAG] == "1"
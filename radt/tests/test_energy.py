@@ -0,0 +1,117 @@
+import multiprocessing
+import queue
+
+import pytest
+
+from radt.run.energy import (
+    ENERGY_KEY,
+    PER_EPOCH_KEY,
+    POWER_KEY,
+    EfficiencyTracker,
+    EnergyTracker,
+    replay_energy,
+    workload_energy,
+)
+from radt.run.loader import LoaderStats
+from radt.run.steps import StepTimer
+
+
+def _metric(key, value, timestamp, step=0):
+    return {"key": key, "value": value, "timestamp": timestamp, "step": step}
+
+
+def test_power_trace():
+    # 100 W for 5 s, then a linear ramp to 200 W over 2 s, out of order
+    trace = [(t * 1000, 100.0) for t in range(6)] + [(6000, 150.0), (7000, 200.0)]
+    joules, seconds = replay_energy(reversed(trace))
+    assert joules == pytest.approx(500 + 300)
+    assert seconds == 7.0
+
+
+def test_power_trace_skips_failed_readings():
+    trace = [(0, 100.0), (1000, -1.0), (2000, float("nan")), (3000, 100.0)]
+    assert replay_energy(trace) == (pytest.approx(300.0), 3.0)
+
+
+def test_counter_trace_with_reset():
+    # DCGMI energy counter in mJ, reset to 0 after 3 s
+    trace = [(0, 5000), (1000, 6000), (2000, 8000), (3000, 500), (4000, 1500)]
+    joules, seconds = replay_energy(trace, counter=True, scale=1e-3)
+    assert joules == pytest.approx(3.0 + 1.0)
+    assert seconds == 4.0
+
+
+def test_energy_tracker_prefers_counter():
+    joules = multiprocessing.Value("d", 0.0)
+    tracker = EnergyTracker(joules)
+    readings = [
+        _metric(key, value, t * 1000)
+        for t in range(3)
+        for key, value in (
+            ("system/SMI - Power Draw", 300.0),
+            ("system/DCGMI - Total Energy Consumption", 100_000.0 * t),
+        )
+    ]
+    logged = {m["key"]: m["value"] for m in tracker.update(readings)}
+    assert logged == {ENERGY_KEY: 200.0, POWER_KEY: 100.0}
+    assert joules.value == 200.0
+
+
+def test_efficiency_tracker():
+    joules = multiprocessing.Value("d", 600.0)
+    tracker = EfficiencyTracker(joules, samples_metric="samples")
+    tracker.update([_metric("loss", 1.0, 0, step) for step in range(3)])
+    logged = tracker.update([_metric("samples", 1200.0, 0, 2)])
+    assert {m["key"]: m["value"] for m in logged} == {
+        PER_EPOCH_KEY: 200.0,
+        "energy/Joules per Sample": 0.5,
+    }
+
+
+def _drain(buffer):
+    metrics = []
+    while not buffer.empty():
+        metrics.append(buffer.get())
+    return metrics
+
+
+def test_step_times_are_not_epochs():
+    joules = multiprocessing.Value("d", 600.0)
+    tracker = EfficiencyTracker(joules)
+    buffer = queue.Queue()
+    steps = StepTimer(buffer, interval=0.0)
+
+    # Two epochs of 50 training steps each
+    for epoch in range(2):
+        for _ in range(50):
+            steps.step()
+        buffer.put(_metric("loss", 1.0, 0, epoch))
+
+    metrics = _drain(buffer)
+    assert max(m["step"] for m in metrics if m["key"].startswith("steps/")) >= 50
+
+    logged = {m["key"]: m["value"] for m in tracker.update(metrics)}
+    assert logged == {PER_EPOCH_KEY: 300.0}
+
+
+def test_loader_fetches_are_not_epochs():
+    joules = multiprocessing.Value("d", 600.0)
+    tracker = EfficiencyTracker(joules)
+    buffer = queue.Queue()
+    loader = LoaderStats(buffer, "train", interval=0.0)
+
+    for epoch in range(3):
+        for fetch in range(40):
+            loader.fetched(fetch, fetch + 0.5)
+        buffer.put(_metric("loss", 1.0, 0, epoch))
+
+    metrics = _drain(buffer)
+    assert max(m["step"] for m in metrics if m["key"].startswith("loader/")) >= 40
+
+    logged = {m["key"]: m["value"] for m in tracker.update(metrics)}
+    assert logged == {PER_EPOCH_KEY: 200.0}
+
+
+def test_workload_energy_counts_shared_devices_once():
+    devices = {frozenset("0"): [100.0, 120.0], frozenset("1"): [50.0]}
+    assert workload_energy(devices) == 170.0
@@ -0,0 +1,77 @@
+import queue
+import threading
+
+import pytest
+
+from radt.run import governor
+from radt.run.governor import OverheadGovernor
+from radt.run.listeners import Listener
+
+
+class Logger:
+    pid = None
+
+
+class SlowListener(Listener, threading.Thread):
+    listener_name = "slow"
+    adjustable = True
+
+
+class FixedListener(Listener, threading.Thread):
+    listener_name = "fixed"
+
+
+def _governor(budget, monkeypatch):
+    logger, slow, fixed = Logger(), SlowListener(), FixedListener()
+    buffers = [queue.Queue(), queue.Queue()]
+    g = OverheadGovernor("run", budget, [logger, slow, fixed], buffers)
+
+    # CPU seconds used per second, the loggers are by far the most expensive
+    rates = {logger: 0.5, slow: 0.0, fixed: 0.0, g: 0.01}
+    used = dict.fromkeys(rates, 0.0)
+    monkeypatch.setattr(g, "_cpu", lambda p: {(id(p), None, 0): used[p]})
+
+    def step():
+        for p, rate in rates.items():
+            used[p] += rate
+        g.step(1.0)
+        metrics = {}
+        while not buffers[0].empty():
+            m = buffers[0].get()
+            metrics[m["key"]] = m["value"]
+        return metrics
+
+    g.measure(1.0)
+    return g, rates, step, slow, fixed
+
+
+def test_logger_overhead_is_not_reduced(monkeypatch):
+    g, rates, step, slow, fixed = _governor(0.01, monkeypatch)
+    rates[slow] = 0.004
+
+    metrics = step()
+    assert g.events == []
+    assert slow.slowdown.value == 1.0
+    assert metrics["governor/Overhead Percentage"] == pytest.approx(0.4)
+    assert metrics["governor/Logger Overhead Percentage"] == pytest.approx(51.0)
+
+
+def test_expensive_listener_is_slowed_down_and_restored(monkeypatch):
+    g, rates, step, slow, fixed = _governor(0.01, monkeypatch)
+
+    rates[slow] = 0.02
+    metrics = step()
+    assert [e["action"] for e in g.events] == ["slow"]
+    assert slow.slowdown.value == governor.SLOWDOWN_STEP
+    assert metrics["governor/slow Interval"] == governor.SLOWDOWN_STEP
+
+    # Only threads that cannot be adjusted are left, nothing more to reduce
+    rates[slow], rates[fixed] = 0.0, 0.02
+    step()
+    assert [e["action"] for e in g.events] == ["slow"]
+
+    rates[fixed] = 0.0
+    for _ in range(governor.RESTORE_AFTER):
+        step()
+    assert [e["action"] for e in g.events] == ["slow", "speed up"]
+    assert slow.slowdown.value == 1.0
@@ -0,0 +1,45 @@
+from importlib.metadata import EntryPoint, EntryPoints
+
+import pytest
+
+from radt.run import listeners
+from radt.run.listeners import ENTRY_POINT_GROUP, Listener
+
+
+@pytest.fixture
+def registry():
+    listeners._registry.cache_clear()
+    yield
+    listeners._registry.cache_clear()
+
+
+def test_builtin_listeners_are_registered(registry):
+    available = listeners.available_listeners()
+    assert {"ps", "smi", "top", "cgroup", "rapl", "perf", "net"} <= set(available)
+
+    for name in available:
+        listener = listeners.load_listener(name)
+        assert issubclass(listener, Listener)
+        assert listener.listener_name == name
+
+
+def test_other_packages_cannot_replace_builtin_listeners(registry, monkeypatch):
+    builtin = listeners.available_listeners()["smi"]
+    plugins = EntryPoints(
+        [
+            EntryPoint("rocm", "radt_rocm:ROCmThread", ENTRY_POINT_GROUP),
+            EntryPoint("SMI", "radt_rocm:SMIThread", ENTRY_POINT_GROUP),
+            EntryPoint("smi", builtin, ENTRY_POINT_GROUP),
+        ]
+    )
+    monkeypatch.setattr(listeners, "entry_points", lambda: plugins)
+    listeners._registry.cache_clear()
+
+    assert listeners.available_listeners() == {
+        "smi": builtin,
+        "rocm": "radt_rocm:ROCmThread",
+    }
+    with pytest.raises(ModuleNotFoundError):
+        listeners.load_listener("rocm")
+    with pytest.raises(ValueError):
+        listeners.load_listener("amd")
@@ -0,0 +1,39 @@
+import multiprocessing
+import tracemalloc
+
+from mlflow.tracking import MlflowClient
+
+from radt.run.listeners import memory_listener
+from radt.run.listeners.memory_listener import MemoryThread
+
+
+def _report_tracing(traced):
+    traced.value = tracemalloc.is_tracing()
+
+
+def test_tracing_stops_in_forked_processes(tmp_path, tracking, monkeypatch):
+    monkeypatch.setattr(memory_listener, "TRACEMALLOC_FRAMES", 1)
+    monkeypatch.setattr(MemoryThread, "interval", 0.05)
+    client = MlflowClient()
+    experiment_id = client.create_experiment("memory", tmp_path.as_uri())
+    run_id = client.create_run(experiment_id).info.run_id
+    listener = MemoryThread(run_id)
+    listener.start()
+    try:
+        assert tracemalloc.is_tracing()
+
+        # Like the listener processes and DataLoader workers started after it
+        traced = multiprocessing.Value("b", True)
+        child = multiprocessing.get_context("fork").Process(
+            target=_report_tracing, args=(traced,)
+        )
+        child.start()
+        child.join(timeout=10)
+        assert child.exitcode == 0
+        assert not traced.value
+
+        assert tracemalloc.is_tracing()
+    finally:
+        listener.terminate()
+    assert not tracemalloc.is_tracing()
+    assert client.list_artifacts(run_id, "radt")
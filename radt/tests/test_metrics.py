@@ -0,0 +1,105 @@
+import collections
+
+import pytest
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+
+from radt.analysis import MetricCache, MetricFetcher
+
+START = 1_700_000_000_000
+
+
+@pytest.fixture
+def client(tracking, monkeypatch):
+    """Client that counts its metric history requests
+
+    Returns:
+        MlflowClient: Client with a `calls` counter
+    """
+    client = MlflowClient(tracking)
+    client.calls = collections.Counter()
+    get_metric_history = client.get_metric_history
+
+    def counted(run_id, key):
+        client.calls[key] += 1
+        return get_metric_history(run_id, key)
+
+    monkeypatch.setattr(client, "get_metric_history", counted)
+    return client
+
+
+@pytest.fixture(params=["rest", "sql"])
+def fetcher(request, tmp_path, tracking, client):
+    sql_uri = tracking if request.param == "sql" else None
+    return MetricFetcher(client, tmp_path / "cache", sql_uri=sql_uri, max_workers=2)
+
+
+def _log(client, run_id, *points):
+    client.log_batch(
+        run_id, metrics=[Metric("loss", value, START + t, t) for t, value in points]
+    )
+
+
+def _fetch(fetcher, client, run_id):
+    run = client.get_run(run_id)
+    history = fetcher.fetch([run], ["loss"])[(run_id, "loss")]
+    return list(zip(history["step"], history["value"]))
+
+
+class _Unreachable:
+    def connect(self):
+        raise AssertionError("Histories were queried from the database")
+
+
+def _cache_only(fetcher, client):
+    """Make any further request of the fetcher fail the test"""
+    client.calls.clear()
+    if fetcher.engine is not None:
+        fetcher.engine = _Unreachable()
+
+
+@pytest.fixture
+def run_id(client):
+    experiment_id = client.create_experiment("metrics")
+    run_id = client.create_run(experiment_id, start_time=START).info.run_id
+    _log(client, run_id, (0, 2.0), (1, 1.5))
+    return run_id
+
+
+def test_finished_runs_are_served_from_the_cache(fetcher, client, run_id):
+    client.set_terminated(run_id, end_time=START + 10)
+
+    assert _fetch(fetcher, client, run_id) == [(0, 2.0), (1, 1.5)]
+    assert MetricCache(fetcher.cache.directory).load(run_id, "loss")["complete"]
+
+    _cache_only(fetcher, client)
+    assert _fetch(fetcher, client, run_id) == [(0, 2.0), (1, 1.5)]
+    assert not client.calls
+
+
+def test_stale_cache_is_extended(fetcher, client, run_id):
+    assert _fetch(fetcher, client, run_id) == [(0, 2.0), (1, 1.5)]
+    cached = fetcher.cache.load(run_id, "loss")
+    assert not cached["complete"]
+
+    _log(client, run_id, (2, 1.0), (3, 0.5))
+    assert _fetch(fetcher, client, run_id) == [(0, 2.0), (1, 1.5), (2, 1.0), (3, 0.5)]
+
+    # Cached points are kept as they were, newer points are appended
+    history = fetcher.cache.load(run_id, "loss")["history"]
+    assert history.iloc[:2].equals(cached["history"])
+    assert len(history) == 4
+
+
+def test_run_finishing_while_cached(fetcher, client, run_id):
+    assert _fetch(fetcher, client, run_id) == [(0, 2.0), (1, 1.5)]
+
+    _log(client, run_id, (2, 1.0))
+    client.set_terminated(run_id, end_time=START + 10)
+    assert _fetch(fetcher, client, run_id) == [(0, 2.0), (1, 1.5), (2, 1.0)]
+    assert fetcher.cache.load(run_id, "loss")["complete"]
+
+    # Once complete, the history is not fetched again
+    _cache_only(fetcher, client)
+    assert _fetch(fetcher, client, run_id) == [(0, 2.0), (1, 1.5), (2, 1.0)]
+    assert not client.calls
@@ -0,0 +1,72 @@
+import pytest
+
+from radt.run.listeners.net_listener import (
+    infiniband_backed,
+    interface_filter,
+    net_metrics,
+    parse_net_dev,
+    read_infiniband,
+)
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: {lo} 10 0 0 0 0 0 0 {lo} 10 0 0 0 0 0 0
+  eth0: {eth} 100 0 0 0 0 0 0 {eth} 100 0 0 0 0 0 0
+   ib0: {ib} 100 0 0 0 0 0 0 {ib} 100 0 0 0 0 0 0
+"""
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"{text}\n")
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    net = tmp_path / "class" / "net"
+    for name in ("lo", "eth0"):
+        (net / name).mkdir(parents=True)
+    # IPoIB on the PCI function of the HCA
+    (net / "ib0" / "device" / "infiniband" / "mlx5_0").mkdir(parents=True)
+    return tmp_path
+
+
+def _read(sysfs, eth, ib, port_words, match=interface_filter("*")):
+    """Counters as the listener reads them, port data is counted in 4 byte words"""
+    interfaces = parse_net_dev(NET_DEV.format(lo=0, eth=eth, ib=ib))
+    counters = sysfs / "class" / "infiniband" / "mlx5_0" / "ports" / "1" / "counters"
+    for counter in ("port_rcv_data", "port_xmit_data"):
+        _write(counters / counter, port_words)
+    interfaces.update(read_infiniband(sysfs))
+    return {name: c for name, c in interfaces.items() if match(name)}
+
+
+def test_ipoib_traffic_is_counted_once(sysfs):
+    backed = infiniband_backed(sysfs)
+    assert backed == {"ib0": {"mlx5_0"}}
+
+    previous = _read(sysfs, eth=0, ib=0, port_words=0)
+    # 1 MB/s over Ethernet, 10 MB/s over IPoIB, which the port counters see as well
+    # with 30 MB/s of RDMA traffic
+    current = _read(sysfs, eth=2_000_000, ib=20_000_000, port_words=20_000_000)
+    m = net_metrics(current, previous, 2.0, backed)
+
+    assert m["system/NET - eth0 RX MB/s"] == pytest.approx(1.0)
+    assert m["system/NET - ib0 RX MB/s"] == pytest.approx(10.0)
+    assert m["system/NET - mlx5_0:1 RX MB/s"] == pytest.approx(40.0)
+    assert m["system/NET - Total RX MB/s"] == pytest.approx(41.0)
+    assert m["system/NET - Total TX MB/s"] == pytest.approx(41.0)
+    assert "system/NET - lo RX MB/s" not in m
+
+
+def test_ipoib_counts_without_its_ports(sysfs):
+    # The InfiniBand ports are not logged, their traffic only shows up on ib0
+    match = interface_filter("eth*,ib*")
+    previous = _read(sysfs, eth=0, ib=0, port_words=0, match=match)
+    current = _read(
+        sysfs, eth=2_000_000, ib=20_000_000, port_words=20_000_000, match=match
+    )
+    m = net_metrics(current, previous, 2.0, infiniband_backed(sysfs))
+
+    assert "system/NET - mlx5_0:1 RX MB/s" not in m
+    assert m["system/NET - Total RX MB/s"] == pytest.approx(11.0)
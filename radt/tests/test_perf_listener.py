@@ -0,0 +1,75 @@
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from subprocess import PIPE, Popen
+
+from mlflow.tracking import MlflowClient
+
+from radt.run.listeners import _procfs
+from radt.run.listeners.perf_listener import PERF_EVENTS, PerfThread
+
+# Prints an interval of counts every 0.1 s like `perf stat -I -x,`, and records the
+# processes it was attached to
+FAKE_PERF = """#!{python}
+import sys, time
+open({log!r}, "a").write(sys.argv[-1] + "\\n")
+t = 0.0
+while True:
+    time.sleep(0.1)
+    t += 0.1
+    for event in {events!r}:
+        sys.stderr.write(f"{{t:.3f}},1000,,{{event}}:u,100,100.00,,\\n")
+    sys.stderr.flush()
+"""
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+    assert condition()
+
+
+def test_perf_follows_new_processes(tmp_path, tracking, monkeypatch):
+    log = tmp_path / "attached.txt"
+    perf = tmp_path / "perf"
+    perf.write_text(
+        FAKE_PERF.format(python=sys.executable, log=str(log), events=PERF_EVENTS)
+    )
+    perf.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    # A workload that starts worker processes when told to
+    workload = Popen(
+        ["sh", "-c", "read line; sleep 30 & sleep 30"],
+        stdin=PIPE,
+        start_new_session=True,
+    )
+    run_id = MlflowClient().create_run("0").info.run_id
+    metrics = queue.Queue()
+    listener = PerfThread(run_id, metrics)
+    listener.root = workload.pid
+
+    thread = threading.Thread(target=listener.run, daemon=True)
+    thread.start()
+    _wait_for(lambda: log.is_file())
+    workload.stdin.write(b"start\n")
+    workload.stdin.close()
+
+    _wait_for(lambda: len(log.read_text().split()[-1].split(",")) == 3)
+    final = set(_procfs.process_tree(workload.pid))
+    os.killpg(workload.pid, signal.SIGKILL)
+    workload.wait()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+
+    # perf was attached again to the processes that started later
+    attached = [set(map(int, line.split(","))) for line in log.read_text().split()]
+    assert attached[0] == {workload.pid}
+    assert attached[-1] == final
+
+    m = metrics.get_nowait()
+    assert m["key"].startswith("system/PERF - ")
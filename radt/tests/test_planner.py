@@ -0,0 +1,119 @@
+import pandas as pd
+import pytest
+from mlflow.tracking import MlflowClient
+
+from radt import constants
+from radt.schedule.planner import (
+    format_plan,
+    lpt_order,
+    predict_durations,
+    query_history,
+    simulate,
+)
+
+
+def _run(client, experiment_id, model, params, seconds, status="FINISHED", tags={}):
+    start = 1_700_000_000_000
+    run_id = client.create_run(experiment_id, start_time=start, tags=tags).info.run_id
+    client.log_param(run_id, "model", model)
+    client.log_param(run_id, "params", params)
+    client.set_terminated(run_id, status=status, end_time=start + int(seconds * 1000))
+    return run_id
+
+
+@pytest.fixture
+def history(tracking):
+    client = MlflowClient()
+    experiment_id = client.create_experiment("planner")
+    for seconds in (100, 120, 110):
+        _run(client, experiment_id, "train.py", "--lr 0.1", seconds)
+    _run(client, experiment_id, "train.py", "--lr 0.2", 300)
+    _run(client, experiment_id, "other.py", "", 50)
+
+    # Runs that did not complete do not count
+    _run(client, experiment_id, "train.py", "--lr 0.1", 5, status="KILLED")
+    _run(
+        client,
+        experiment_id,
+        "train.py",
+        "--lr 0.1",
+        10,
+        tags={constants.LIMIT_TAG: "epoch"},
+    )
+    return experiment_id
+
+
+def _workload(experiment_id, *rows):
+    return pd.DataFrame(
+        [
+            {"Experiment": experiment_id, "File": f"models/{f}", "Params": p, **extra}
+            for f, p, extra in rows
+        ]
+    )
+
+
+def test_query_history(history):
+    durations = query_history([history], {"train.py"})
+    # Runs with the same start time come back in any order
+    assert {signature: sorted(d) for signature, d in durations.items()} == {
+        ("train.py", "--lr 0.1"): [100.0, 110.0, 120.0],
+        ("train.py", "--lr 0.2"): [300.0],
+    }
+
+
+def test_predict_durations(history):
+    workloads = {
+        "a": _workload(history, ("train.py", "--lr 0.1", {})),
+        # Collocated runs take as long as the longest
+        "b": _workload(
+            history, ("train.py", "--lr 0.1", {}), ("train.py", "--lr 0.2", {})
+        ),
+        "c": _workload(history, ("train.py", "--lr 0.2", {"TimeLimit": 60})),
+        "d": _workload(history, ("new.py", None, {})),
+    }
+    assert predict_durations(workloads) == {
+        "a": (110.0, 3),
+        "b": (300.0, 4),
+        "c": (60.0, 1),
+        "d": (None, 0),
+    }
+
+
+def test_lpt_order_and_simulate():
+    durations = {"a": 1.0, "b": 1.0, "c": 1.0, "d": 3.0}
+    order = lpt_order(durations)
+    assert order == ["d", "a", "b", "c"]
+
+    timeline, makespan = simulate(order, durations, workers=2)
+    assert timeline == [
+        ("d", 0, 0.0, 3.0),
+        ("a", 1, 0.0, 1.0),
+        ("b", 1, 1.0, 2.0),
+        ("c", 1, 2.0, 3.0),
+    ]
+    assert makespan == 3.0
+
+    # In file order, the long workload starts last
+    assert simulate(list(durations), durations, workers=2)[1] == 4.0
+
+
+def test_format_plan():
+    predictions = {"a": (3600.0, 2), "b": (None, 0), "c": (1800.0, 1)}
+    lines = format_plan(predictions, ["a", "b", "c"], workers=2, width=8)
+
+    assert lines[0].split() == [
+        "Workload",
+        "Worker",
+        "Start",
+        "End",
+        "History",
+        "Timeline",
+    ]
+    assert lines[1].split()[:5] == ["a", "0", "0:00:00", "1:00:00", "2"]
+    assert lines[1].endswith("|######  |")
+    assert lines[2].split()[:5] == ["b", "1", "0:00:00", "0:45:00", "-"]
+    assert lines[3].split()[:5] == ["c", "1", "0:45:00", "1:15:00", "1"]
+    assert lines[4] == "No history for 1 workload(s), assumed 0:45:00 each"
+    assert lines[5] == (
+        "Predicted makespan: 1:15:00 on 2 worker(s) (file order: 1:15:00)"
+    )
@@ -0,0 +1,72 @@
+import functools
+import multiprocessing
+
+import pytest
+
+from radt.run.listeners import _procfs
+from radt.run.listeners.ps_listener import PSThread
+
+# PID: (parent, threads as (TID, name, CPU ticks))
+PROCESSES = {
+    100: (1, [(100, "python", 500), (101, "pin_memory", 50)]),
+    200: (100, [(200, "python", 80)]),  # logger
+    300: (100, [(300, "python", 10)]),  # this listener
+    400: (100, [(400, "python", 20)]),  # smi listener
+    410: (400, [(410, "nvidia-smi", 30)]),  # started by the smi listener
+    500: (100, [(500, "pt_data_worker", 200), (501, "pt_data_worker", 100)]),
+}
+
+
+def _stat(tid, name, ppid, ticks):
+    fields = ["S", ppid, *[0] * 9, ticks, 0, *[0] * 4, 1, 0, 12345, *[0] * 17]
+    return f"{tid} ({name}) {' '.join(map(str, fields))}\n"
+
+
+def _fake_proc(root):
+    for pid, (ppid, threads) in PROCESSES.items():
+        children = [child for child, (parent, _) in PROCESSES.items() if parent == pid]
+        for i, (tid, name, ticks) in enumerate(threads):
+            task = root / str(pid) / "task" / str(tid)
+            task.mkdir(parents=True)
+            (task / "stat").write_text(_stat(tid, name, ppid, ticks))
+            (task / "children").write_text(
+                " ".join(map(str, children)) if i == 0 else ""
+            )
+
+
+def test_helper_processes_are_left_out(tmp_path, monkeypatch):
+    _fake_proc(tmp_path)
+    for name in ("process_tree", "tasks", "read_task_stat"):
+        function = getattr(_procfs, name)
+        monkeypatch.setattr(_procfs, name, functools.partial(function, proc=tmp_path))
+
+    listener = PSThread("run")
+    listener.parent_pid = 100
+
+    # Without the benchmark's helper PIDs, every process in the tree counts
+    assert {(pid, tid) for pid, tid, _ in listener.sample()} == {
+        (pid, tid) for pid, (_, threads) in PROCESSES.items() for tid, _, _ in threads
+    }
+
+    # The logger and listeners are left out with the tools they started, DataLoader
+    # workers that started later are not
+    listener.helpers = multiprocessing.Array("i", [200, 300, 400, 0])
+    threads = listener.sample()
+    assert {(pid, tid) for pid, tid, _ in threads} == {
+        (100, 100),
+        (100, 101),
+        (500, 500),
+        (500, 501),
+    }
+
+    # CPU time since the start, over 10 s in % of a core
+    ticks = _procfs.CLOCK_TICKS
+    assert listener.measure(threads, 10.0) == pytest.approx(
+        {
+            "system/PS - CPU python": 500 / ticks * 10,
+            "system/PS - CPU pt_data_worker": 300 / ticks * 10,
+            "system/PS - CPU pin_memory": 50 / ticks * 10,
+            "system/PS - CPU Total": 850 / ticks * 10,
+            "system/PS - Threads": 4,
+        }
+    )
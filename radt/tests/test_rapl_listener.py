@@ -0,0 +1,82 @@
+import pytest
+
+from radt.run.listeners.rapl_listener import RAPLThread, energy_delta, rapl_domains
+
+RANGE = 262143328850
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"{text}\n")
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    powercap = tmp_path / "class" / "powercap"
+    for domain, name in (
+        ("intel-rapl:0", "package-0"),
+        ("intel-rapl:0:0", "core"),
+        ("intel-rapl:0:1", "dram"),
+    ):
+        _write(powercap / domain / "name", name)
+        _write(powercap / domain / "max_energy_range_uj", RANGE)
+        _write(powercap / domain / "energy_uj", 0)
+    # Other powercap drivers are not RAPL domains
+    _write(powercap / "dtpm" / "name", "dtpm")
+
+    cpus = tmp_path / "devices" / "system" / "cpu"
+    for cpu, current in (("cpu0", 2000000), ("cpu1", 3000000)):
+        _write(cpus / cpu / "cpufreq" / "scaling_cur_freq", current)
+        _write(cpus / cpu / "cpufreq" / "cpuinfo_max_freq", 4000000)
+        _write(cpus / cpu / "thermal_throttle" / "core_throttle_count", 0)
+        _write(cpus / cpu / "thermal_throttle" / "package_throttle_count", 0)
+
+    thermal = tmp_path / "class" / "thermal"
+    _write(thermal / "thermal_zone0" / "type", "x86_pkg_temp")
+    _write(thermal / "thermal_zone0" / "temp", 65000)
+    _write(thermal / "thermal_zone1" / "type", "x86_pkg_temp")
+    _write(thermal / "thermal_zone1" / "temp", 71000)
+    return tmp_path
+
+
+def test_rapl_domains(sysfs):
+    domains = rapl_domains(sysfs)
+    assert sorted(domains) == ["package-0", "package-0 core", "package-0 dram"]
+    assert domains["package-0"]["range"] == RANGE
+
+
+def test_energy_delta_wraps_around():
+    assert energy_delta(500, RANGE - 499, RANGE) == 1000
+    assert energy_delta(1500, 500, RANGE) == 1000
+
+
+def test_rapl_metrics(sysfs):
+    powercap = sysfs / "class" / "powercap"
+    _write(powercap / "intel-rapl:0:0" / "energy_uj", RANGE - 9_999_999)
+
+    listener = RAPLThread("run", sysfs=sysfs)
+    listener.domains = rapl_domains(sysfs)
+    listener.previous = listener.read()
+
+    # 100 J on the package in 2 s, 60 J on the cores, whose counter wraps around
+    _write(powercap / "intel-rapl:0" / "energy_uj", 100_000_000)
+    _write(powercap / "intel-rapl:0:0" / "energy_uj", 50_000_000)
+    _write(powercap / "intel-rapl:0:1" / "energy_uj", 10_000_000)
+    throttle = sysfs / "devices" / "system" / "cpu" / "cpu1" / "thermal_throttle"
+    _write(throttle / "core_throttle_count", 3)
+
+    m = listener.measure(listener.read(), 2.0)
+    assert m == pytest.approx(
+        {
+            "system/RAPL - package-0 Power W": 50.0,
+            "system/RAPL - package-0 Energy J": 100.0,
+            "system/RAPL - package-0 core Power W": 30.0,
+            "system/RAPL - package-0 core Energy J": 60.0,
+            "system/RAPL - package-0 dram Power W": 5.0,
+            "system/RAPL - package-0 dram Energy J": 10.0,
+            "system/RAPL - CPU Frequency GHz": 2.5,
+            "system/RAPL - CPU Frequency Ratio": 0.625,
+            "system/RAPL - Thermal Throttle Events": 3,
+            "system/RAPL - Temperature x86_pkg_temp C": 71.0,
+        }
+    )
@@ -0,0 +1,82 @@
+import sqlalchemy as sa
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+
+from radt.rollup.rollup import (
+    LATENESS_MS,
+    ROLLUPS_TABLE,
+    WATERMARKS_TABLE,
+    rollup,
+)
+
+START = 1_700_000_000_000
+
+
+def _log(client, run_id, *points):
+    client.log_batch(
+        run_id, metrics=[Metric("loss", value, START + t, 0) for t, value in points]
+    )
+
+
+def _buckets(engine, width):
+    """Mean, min, max and count per bucket, as the frontend serves them"""
+    r = ROLLUPS_TABLE.c
+    with engine.connect() as connection:
+        rows = connection.execute(
+            sa.select(r.bucket, r.sum, r.count, r.min, r.max)
+            .where(r.key == "loss", r.width == width * 1000)
+            .order_by(r.bucket)
+        ).all()
+    return {
+        bucket * width * 1000 - START: (total / count, low, high, count)
+        for bucket, total, count, low, high in rows
+    }
+
+
+def _watermark(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            sa.select(WATERMARKS_TABLE.c.watermark, WATERMARKS_TABLE.c.finished)
+        ).one()
+
+
+def test_rollup_run(tracking):
+    client = MlflowClient()
+    run_id = client.create_run(
+        client.create_experiment("rollup"), start_time=START
+    ).info.run_id
+    _log(client, run_id, (0, 1.0), (200, 3.0), (400, float("nan")), (1500, 5.0))
+
+    engine = sa.create_engine(tracking)
+    assert rollup(engine, widths=(1, 10)) == 1
+
+    # NaN points are left out of the count and aggregates
+    assert _buckets(engine, 1) == {0: (2.0, 1.0, 3.0, 2), 1000: (5.0, 5.0, 5.0, 1)}
+    assert _buckets(engine, 10) == {0: (3.0, 1.0, 5.0, 3)}
+    assert _watermark(engine) == (START + 1500, False)
+
+    # Nothing new, nothing to do
+    assert rollup(engine, widths=(1, 10)) == 0
+
+    # A point that arrives late, before the watermark but within LATENESS_MS of it,
+    # is picked up once newer points move the watermark on
+    assert 1500 - 100 < LATENESS_MS
+    _log(client, run_id, (100, 2.0), (2500, 9.0))
+    assert rollup(engine, widths=(1, 10)) == 1
+
+    assert _buckets(engine, 1) == {
+        0: (2.0, 1.0, 3.0, 3),
+        1000: (5.0, 5.0, 5.0, 1),
+        2000: (9.0, 9.0, 9.0, 1),
+    }
+    assert _buckets(engine, 10) == {0: (4.0, 1.0, 9.0, 5)}
+    assert _watermark(engine) == (START + 2500, False)
+
+    # Rollups of finished runs are final and not looked at again
+    client.set_terminated(run_id, end_time=START + 3000)
+    assert rollup(engine, widths=(1, 10)) == 0
+    assert _watermark(engine) == (START + 2500, True)
+
+    _log(client, run_id, (2800, 100.0))
+    assert rollup(engine, widths=(1, 10)) == 0
+    assert _buckets(engine, 10) == {0: (4.0, 1.0, 9.0, 5)}
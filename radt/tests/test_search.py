@@ -0,0 +1,91 @@
+from argparse import Namespace
+
+import pytest
+from mlflow.tracking import MlflowClient
+
+from radt.schedule import schedule
+from radt.schedule.search import (
+    format_status,
+    grid_params,
+    halving_rungs,
+    hyperband_brackets,
+    parse_status,
+    rank,
+)
+
+
+def test_halving_rungs():
+    assert halving_rungs(81, 1, 81, 3) == [(81, 1), (27, 3), (9, 9), (3, 27), (1, 81)]
+    # The last rung is capped at the maximum budget
+    assert halving_rungs(10, 1, 10, 3) == [(10, 1), (3, 3), (1, 9), (1, 10)]
+    assert halving_rungs(4, 2, 8, 2) == [(4, 2), (2, 4), (1, 8)]
+
+
+def test_hyperband_brackets():
+    assert hyperband_brackets(81, 1, 81, 3) == [
+        (81, 1),
+        (34, 3),
+        (15, 9),
+        (8, 27),
+        (5, 81),
+    ]
+    # Brackets never use more configs than available
+    assert [n for n, _ in hyperband_brackets(10, 1, 81, 3)] == [10, 10, 10, 8, 5]
+
+
+def test_rank_keeps_the_best():
+    values = {f"--lr {i}": float(i) for i in range(9)} | {"--lr x": None}
+    assert rank(values, "min")[:3] == ["--lr 0", "--lr 1", "--lr 2"]
+    assert rank(values, "max")[:3] == ["--lr 8", "--lr 7", "--lr 6"]
+    # Configs without a value are never promoted before ones with a value
+    assert rank(values, "min")[-1] == rank(values, "max")[-1] == "--lr x"
+
+
+@pytest.mark.parametrize("epochs", [None, 3.0, 0.5])
+def test_status_round_trip(epochs):
+    status = format_status("FINISHED", "abc123", "--lr 0.1 --batch 32", epochs)
+    assert parse_status(status) == ("FINISHED", "abc123", "--lr 0.1 --batch 32", epochs)
+    assert parse_status("QUEUED") is None
+
+
+def test_successive_halving_drops_the_worst(tracking, monkeypatch):
+    client = MlflowClient()
+    experiment_id = client.create_experiment("search")
+    sweep = {
+        "experiment": experiment_id,
+        "name": "sweep",
+        "devices": 0,
+        "collocation": "-",
+        "listeners": "none",
+        "file": "train.py",
+        "method": "halving",
+        "metric": "loss",
+        "mode": "min",
+        "min_epochs": 1,
+        "max_epochs": 9,
+        "eta": 3,
+        "parameters": {"lr": {"values": list(range(1, 10))}},
+        "status": {},
+    }
+
+    # Stands in for training: the loss is the learning rate divided by the epochs
+    rungs = []
+
+    def schedule_dataframe(parsed_args, df, file, raw_file_contents, *args):
+        rungs.append((df["EpochLimit"].iloc[0], sorted(df["Params"])))
+        for _, row in df.iterrows():
+            run_id = client.create_run(experiment_id).info.run_id
+            lr = float(row["Params"].split()[1])
+            client.log_metric(run_id, "loss", lr / row["EpochLimit"])
+            raw_file_contents["status"][int(row["Workload"])] = format_status(
+                "FINISHED", run_id, row["Params"], row["EpochLimit"]
+            )
+
+    monkeypatch.setattr(schedule, "schedule_dataframe", schedule_dataframe)
+    schedule.start_search(Namespace(plan=False), "sweep.yaml", sweep)
+
+    assert rungs == [
+        (1, sorted(grid_params(sweep["parameters"]))),
+        (3, ["--lr 1", "--lr 2", "--lr 3"]),
+        (9, ["--lr 1"]),
+    ]
@@ -0,0 +1,58 @@
+import math
+
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+
+from radt.run.sqlstore import SQLMetricStore
+
+BATCHES = [
+    [
+        {"key": "loss", "value": 2.0, "timestamp": 1000, "step": 0},
+        {"key": "loss", "value": 1.5, "timestamp": 1100, "step": 1},
+        {"key": "loss", "value": 1.5, "timestamp": 1100, "step": 1},
+        {"key": "system/GPU - Power W", "value": 250.0, "timestamp": 1000, "step": 0},
+        {"key": "grad", "value": float("nan"), "timestamp": 1000, "step": 0},
+        {"key": "scale", "value": float("inf"), "timestamp": 1000, "step": 0},
+    ],
+    # Older points than the latest ones do not replace them
+    [
+        {"key": "loss", "value": 3.0, "timestamp": 900, "step": 0},
+        {"key": "system/GPU - Power W", "value": 260.0, "timestamp": 2000, "step": 0},
+        {"key": "grad", "value": 0.5, "timestamp": 1100, "step": 1},
+    ],
+]
+
+
+def _history(client, run_id, key):
+    return sorted(
+        (m.step, m.timestamp, "nan" if math.isnan(m.value) else m.value)
+        for m in client.get_metric_history(run_id, key)
+    )
+
+
+def _latest(metrics):
+    return {k: "nan" if math.isnan(v) else v for k, v in metrics.items()}
+
+
+def test_batches_match_mlflow_logging(tracking):
+    client = MlflowClient()
+    experiment_id = client.create_experiment("sqlstore")
+    direct = client.create_run(experiment_id).info.run_id
+    reference = client.create_run(experiment_id).info.run_id
+
+    store = SQLMetricStore(tracking)
+    for batch in BATCHES:
+        store.log_batch(direct, batch)
+
+        # Same metrics through MLflow itself, which rejects exact duplicates in a batch
+        unique = {tuple(m.values()): m for m in batch}.values()
+        client.log_batch(reference, metrics=[Metric(**m) for m in unique])
+
+    for key in {m["key"] for batch in BATCHES for m in batch}:
+        assert _history(client, direct, key) == _history(client, reference, key)
+
+    latest = _latest(client.get_run(direct).data.metrics)
+    assert latest == _latest(client.get_run(reference).data.metrics)
+    assert latest["loss"] == 1.5
+    assert latest["system/GPU - Power W"] == 260.0
+    assert latest["grad"] == 0.5
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+
+from radt.run.offline import (
+    ParquetMetricStore,
+    offline_tracking_uri,
+    prepare_offline,
+    tracking_experiment_id,
+)
+from radt.sync.sync import SYNC_TAG, Synchroniser
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def offline(tmp_path, tracking, monkeypatch):
+    """Offline directory for experiment "2" of the tracking server, and one offline run
+
+    Returns:
+        tuple: Offline directory, tracking server experiment ID, offline run ID
+    """
+    server = MlflowClient(tracking)
+    for name in ("first", "second"):
+        experiment_id = server.create_experiment(name)
+
+    directory = tmp_path / "offline"
+    prepare_offline(directory, [experiment_id])
+    monkeypatch.setenv("RADT_OFFLINE_DIR", str(directory))
+
+    client = MlflowClient(offline_tracking_uri(directory))
+    run_id = client.create_run(
+        tracking_experiment_id(experiment_id),
+        start_time=1_700_000_000_000,
+        tags={"mlflow.runName": "offline"},
+    ).info.run_id
+    client.log_param(run_id, "lr", "0.1")
+    client.log_metric(run_id, "loss", 1.0, timestamp=1_700_000_000_000, step=0)
+    ParquetMetricStore(directory).log_batch(
+        run_id,
+        [
+            {"key": "system/cpu", "value": float(i), "timestamp": i, "step": 0}
+            for i in range(5)
+        ],
+    )
+    client.set_terminated(run_id, status="FINISHED", end_time=1_700_000_060_000)
+    return directory, experiment_id, run_id
+
+
+def _uploads(tracking, experiment_id):
+    return MlflowClient(tracking).search_runs([experiment_id])
+
+
+def test_prepare_offline_maps_experiments(tmp_path, tracking):
+    directory = tmp_path / "offline"
+    prepare_offline(directory, ["7", 3, " 7"])
+    experiments = json.loads((directory / "experiments.json").read_text())
+    assert sorted(experiments.values()) == ["3", "7"]
+
+    # The offline store keeps its own IDs, the server IDs only end up in the names
+    client = MlflowClient(offline_tracking_uri(directory))
+    for offline_id, server_id in experiments.items():
+        assert client.get_experiment(offline_id).name == f"radt-offline-{server_id}"
+
+    # Preparing again reuses the experiments
+    prepare_offline(directory, ["3", "8"])
+    again = json.loads((directory / "experiments.json").read_text())
+    assert {k: v for k, v in again.items() if v != "8"} == experiments
+    assert len(client.search_experiments()) == 4
+
+
+def test_tracking_experiment_id(tmp_path, monkeypatch):
+    directory = tmp_path / "offline"
+    prepare_offline(directory, ["5"])
+    assert tracking_experiment_id("5") == "5"
+
+    monkeypatch.setenv("RADT_OFFLINE_DIR", str(directory))
+    assert tracking_experiment_id(" 5") == "1"
+    assert tracking_experiment_id("6") == "6"
+
+
+def test_sync_round_trip(tracking, offline):
+    directory, experiment_id, offline_id = offline
+
+    assert Synchroniser(directory, tracking).sync(jobs=1) == 1
+
+    (run,) = _uploads(tracking, experiment_id)
+    assert run.data.tags[SYNC_TAG] == offline_id
+    assert run.data.params == {"lr": "0.1"}
+    assert run.info.status == "FINISHED"
+    assert run.info.end_time == 1_700_000_060_000
+
+    history = MlflowClient(tracking).get_metric_history(run.info.run_id, "system/cpu")
+    assert sorted(m.value for m in history) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert run.data.metrics["loss"] == 1.0
+
+    assert json.loads((directory / "synced.json").read_text()) == {
+        offline_id: run.info.run_id
+    }
+
+    # Synced runs are not uploaded again
+    assert Synchroniser(directory, tracking).sync(jobs=1) == 0
+    assert len(_uploads(tracking, experiment_id)) == 1
+
+
+def test_interrupted_sync_is_replaced(tracking, offline):
+    directory, experiment_id, offline_id = offline
+
+    # An upload that failed halfway, before it was recorded in synced.json
+    server = MlflowClient(tracking)
+    partial = server.create_run(experiment_id, tags={SYNC_TAG: offline_id})
+    server.log_batch(partial.info.run_id, metrics=[Metric("system/cpu", 0.0, 0, 0)])
+
+    assert Synchroniser(directory, tracking).sync(jobs=1) == 1
+
+    (run,) = _uploads(tracking, experiment_id)
+    assert run.info.run_id != partial.info.run_id
+    assert server.get_run(partial.info.run_id).info.lifecycle_stage == "deleted"
+    history = server.get_metric_history(run.info.run_id, "system/cpu")
+    assert len(history) == 5
+
+
+def test_unrecorded_sync_is_resumed(tracking, offline):
+    directory, experiment_id, offline_id = offline
+
+    Synchroniser(directory, tracking).sync(jobs=1)
+    (directory / "synced.json").unlink()
+
+    # The upload completed but was not recorded, it is picked up instead of duplicated
+    assert Synchroniser(directory, tracking).sync(jobs=1) == 1
+    (run,) = _uploads(tracking, experiment_id)
+    assert json.loads((directory / "synced.json").read_text()) == {
+        offline_id: run.info.run_id
+    }
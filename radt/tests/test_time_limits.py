@@ -0,0 +1,61 @@
+import sys
+import time
+from subprocess import Popen
+
+from radt import constants
+from radt.schedule.schedule import enforce_time_limits
+
+# Training process that records the signal it was stopped with
+TRAINING = """
+import signal, sys, time
+def stop(signum, frame):
+    open(sys.argv[1], "w").write(str(signum))
+    sys.exit(0)
+signal.signal(signal.SIGTERM, stop)
+time.sleep(60)
+"""
+
+
+def _wait(p, timeout=10.0):
+    deadline = time.time() + timeout
+    while p.poll() is None and time.time() < deadline:
+        time.sleep(0.05)
+    return p.poll()
+
+
+def test_time_limit_reaches_process_behind_wrapper(tmp_path):
+    stopped = tmp_path / "stopped"
+
+    # Like mlflow run, the wrapper does not forward SIGTERM to the training process
+    p = Popen(
+        [
+            "sh",
+            "-c",
+            f"trap '' TERM; {sys.executable} -c '{TRAINING}' {stopped}",
+        ],
+        start_new_session=True,
+    )
+    popens = [(None, "A", p, None, None)]
+    time.sleep(1.0)
+
+    stops = {}
+    enforce_time_limits(popens, {"A": 0.5}, time.time() - 1.0, stops)
+
+    assert "A" in stops
+    assert _wait(p) == 0
+    assert stopped.read_text() == "15"
+
+
+def test_time_limit_kills_after_grace_period(tmp_path, monkeypatch):
+    monkeypatch.setattr(constants, "LIMIT_GRACE_PERIOD", 0.0)
+    p = Popen(["sh", "-c", "trap '' TERM; sleep 60"], start_new_session=True)
+    popens = [(None, "A", p, None, None)]
+    time.sleep(0.5)
+
+    stops = {}
+    enforce_time_limits(popens, {"A": 0.0}, time.time() - 1.0, stops)
+    time.sleep(0.1)
+    assert p.poll() is None
+
+    enforce_time_limits(popens, {"A": 0.0}, time.time() - 1.0, stops)
+    assert _wait(p) == -9
@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import time
+from argparse import Namespace
+
+import pandas as pd
+
+from radt.schedule import schedule, worker
+from radt.schedule.workqueue import WorkloadQueue
+
+LEASE_TIMEOUT = 1.0
+
+
+def _start_worker(queue, devices, log, crash=False, delay=0.0):
+    """Worker process that runs workloads by logging them instead of training"""
+
+    def run_workload(parsed_args, workload, df_workload, **kwargs):
+        # Credentials come from the worker's environment, not the queue
+        assert parsed_args.sql_uri == os.environ["RADT_SQL_URI"]
+
+        with open(log, "a") as f:
+            f.write(f"{'crash' if crash else devices} {workload}\n")
+        if crash:
+            os._exit(1)
+
+        # Longer than the lease, the heartbeat must keep it alive
+        time.sleep(1.5 * LEASE_TIMEOUT)
+        return [
+            (i, "A", 0, f"run-{workload}", "", "FINISHED") for i in df_workload.index
+        ]
+
+    worker.run_workload = run_workload
+    worker.HEARTBEAT_INTERVAL = 0.1
+    time.sleep(delay)
+    worker.start_worker(
+        Namespace(
+            queue=queue, devices=devices, name="", poll_interval=0.05, idle_timeout=2.0
+        )
+    )
+
+
+def test_dead_worker_claims_are_requeued(tmp_path, monkeypatch, capsys):
+    queue, log = str(tmp_path / "queue.db"), tmp_path / "runs.txt"
+    log.touch()
+
+    written = {}
+    monkeypatch.setattr(
+        schedule,
+        "write_results",
+        lambda file, raw, df, results, parent: written.setdefault(
+            df["Workload"].iloc[0], results
+        ),
+    )
+
+    monkeypatch.setenv("RADT_SQL_URI", f"sqlite:///{tmp_path / 'worker.db'}")
+
+    # Fake devices: the crashing worker claims the first workload before the others
+    # start, and exits without reporting back
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_start_worker, args=(queue, "0+1", log, True)),
+        context.Process(target=_start_worker, args=(queue, "0", log, False, 1.0)),
+        context.Process(target=_start_worker, args=(queue, "1", log, False, 1.0)),
+    ]
+    for process in workers:
+        process.start()
+
+    workloads = {
+        w: pd.DataFrame({"Workload": [w], "File": ["train.py"], "Devices": [d]})
+        for w, d in (("w0", "0"), ("w1", "1"), ("w2", "0"), ("w3", "1"))
+    }
+    parsed_args = Namespace(
+        queue=queue,
+        useconda=False,
+        manual=False,
+        buffered=False,
+        poll_interval=0.05,
+        sql_uri="postgresql://radt:secret@db/mlflow",
+        overhead_budget=None,
+        lease_timeout=LEASE_TIMEOUT,
+    )
+    schedule.distribute_workloads(parsed_args, workloads, "dataframe", None)
+
+    for process in workers:
+        process.join(timeout=30)
+    assert [process.exitcode for process in workers] == [1, 0, 0]
+
+    runs = log.read_text().split()
+    crashed = runs[runs.index("crash") + 1]
+    assert f"REQUEUED WORKLOAD: {crashed}, worker" in capsys.readouterr().out
+
+    # Every workload ran to completion exactly once, on a device it asked for
+    assert sorted(runs[1::2]) == sorted([crashed, *workloads])
+    assert set(written) == set(workloads)
+    for w, df in workloads.items():
+        assert f"{df['Devices'].iloc[0]} {w}" in log.read_text()
+        assert written[w] == [(0, "A", 0, f"run-{w}", "", "FINISHED")]
+
+    assert not WorkloadQueue(queue).expire(0)
+    assert b"secret" not in (tmp_path / "queue.db").read_bytes()
+
+
+def test_late_report_after_lost_lease_is_discarded(tmp_path):
+    workqueue = WorkloadQueue(tmp_path / "queue.db")
+    workqueue.publish("w0", {"0"}, {"workload": "w0"})
+
+    assert workqueue.claim("slow", {"0"}) == ("w0", {"workload": "w0"})
+    assert workqueue.expire(0) == [("w0", "slow")]
+    assert workqueue.claim("fast", {"0"}) == ("w0", {"workload": "w0"})
+
+    # The first worker reports after its claim was handed to another worker
+    assert not workqueue.complete("w0", "slow", [["late"]])
+    assert not workqueue.fail("w0", "slow", "late")
+    assert workqueue.collect() == []
+
+    assert workqueue.complete("w0", "fast", [["on time"]])
+    assert workqueue.collect() == [("w0", "DONE", "fast", [["on time"]])]
+
+    # Reports of finished workloads are not accepted twice
+    assert not workqueue.fail("w0", "fast", "again")